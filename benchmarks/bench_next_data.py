@@ -0,0 +1,68 @@
+"""
+Compare extracting the embedded __NEXT_DATA__ json with a Soup against slicing it out of
+the raw html.
+
+Usage:
+    python benchmarks/bench_next_data.py [saved page ...]  (with pycricinfo installed)
+
+Pages can be saved with eg Match(1216509).to_files(). Without any, a synthetic page of a
+similar size to a scorecard is used.
+"""
+
+import json
+import sys
+import timeit
+
+from gazpacho import Soup
+
+from pycricinfo.parsing import next_data_text
+
+
+def synthetic_page() -> str:
+    """
+    A page with a few hundred KB of markup around a large embedded json
+    """
+    body = "".join(
+        f'<div class="row"><a href="/player/{i}.html">Player {i}</a><span>{i}</span></div>'
+        for i in range(3000)
+    )
+    data = {"props": {"pageProps": {"data": {"rows": list(range(20000))}}}}
+    return (
+        f"<html><head><title>Scorecard</title></head><body>{body}"
+        f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+        "</body></html>"
+    )
+
+
+def with_soup(html: str) -> dict:
+    text = Soup(html).find("script", attrs={"id": "__NEXT_DATA__"}, mode="first").text
+    return json.loads(text)
+
+
+def with_slice(html: str) -> dict:
+    return json.loads(next_data_text(html))
+
+
+def main(paths) -> None:
+    pages = {}
+    for path in paths:
+        with open(path, "r") as f:
+            pages[path] = f.read()
+    if not pages:
+        pages["synthetic"] = synthetic_page()
+
+    for name, html in pages.items():
+        assert with_soup(html) == with_slice(html)
+
+        number = 5
+        soup = min(timeit.repeat(lambda: with_soup(html), number=number, repeat=3))
+        fast = min(timeit.repeat(lambda: with_slice(html), number=number, repeat=3))
+
+        print(
+            f"{name} ({len(html) // 1024} KB): soup {soup / number * 1000:.2f} ms, "
+            f"slice {fast / number * 1000:.2f} ms, {soup / fast:.0f}x faster"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
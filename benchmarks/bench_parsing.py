@@ -0,0 +1,188 @@
+"""
+Time parsing the saved pages in benchmarks/corpus and compare against a baseline.
+
+Usage:
+    python benchmarks/bench_parsing.py [--save] [--threshold 0.3] [--repeat 5]
+                                       [--baseline benchmarks/baseline.json]
+
+Each case runs on fresh objects with their payloads already in memory, so only parsing
+is timed. Throughput is reported in pages per second. With --save the results become
+the new baseline, otherwise the script exits with status 1 if any case is slower than
+the baseline by more than the threshold. Baselines are machine specific, so save one
+on the machine the comparison runs on.
+
+The corpus is generated by make_corpus.py.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from gazpacho import Soup
+
+from pycricinfo import Ground, LiveScores, Match, Player, Series, Team
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(HERE, "corpus")
+BASELINE = os.path.join(HERE, "baseline.json")
+
+
+def read(name: str) -> str:
+    with open(os.path.join(CORPUS, name), "r") as f:
+        return f.read()
+
+
+def load_corpus() -> Dict[str, str]:
+    return {name: read(name) for name in sorted(os.listdir(CORPUS))}
+
+
+def page(cls, id: int, **payloads):
+    """
+    A page object with its payloads set, as if they had been fetched
+    """
+    obj = cls(id) if cls is not LiveScores else cls()
+    obj.__dict__.update(payloads)
+    return obj
+
+
+def cases(corpus: Dict[str, str]) -> Dict[str, Tuple[int, Callable[[], None]]]:
+    """
+    The cases to time: name -> (pages per run, function doing one run)
+    """
+    html = {name: text for name, text in corpus.items() if name.endswith(".html")}
+    match_html = corpus["match_1216509.html"]
+    match_json = json.loads(corpus["match_1216509.json"])
+    player_html = corpus["player_6044.html"]
+
+    embedded = [
+        (Match, 1216509, match_html),
+        (Team, 4344, corpus["team_4344.html"]),
+        (LiveScores, 0, corpus["livescores.html"]),
+    ]
+
+    def soup() -> None:
+        # gazpacho parses lazily, so construct and find the canonical link as
+        # from_file does
+        for text in html.values():
+            Soup(text).find("link", attrs={"rel": "canonical"}, mode="first")
+
+    def embedded_json() -> None:
+        for cls, id, text in embedded:
+            page(cls, id, html=text).embedded_json
+
+    def match_stats() -> None:
+        page(Match, 1216509, html=match_html, json=match_json).match_stats
+
+    def teams() -> None:
+        page(Match, 1216509, html=match_html, json=match_json).teams
+
+    def player_stats() -> None:
+        page(Player, 6044, html=player_html).player_stats
+
+    def grounds() -> None:
+        Ground.from_file(os.path.join(CORPUS, "ground_56441.html"))
+
+    def series() -> None:
+        s = page(Series, 8048, json=json.loads(corpus["series_8048.json"]))
+        s.name, s.is_tournament
+
+    def live_matches() -> None:
+        page(LiveScores, 0, html=corpus["livescores.html"]).match_states
+
+    return {
+        "soup": (len(html), soup),
+        "embedded_json": (len(embedded), embedded_json),
+        "match_stats": (1, match_stats),
+        "teams": (1, teams),
+        "player_stats": (1, player_stats),
+        "ground": (1, grounds),
+        "series": (1, series),
+        "live_matches": (1, live_matches),
+    }
+
+
+def measure(pages: int, func: Callable[[], None], repeat: int) -> float:
+    """
+    Pages per second from the best of repeat runs, each at least 0.2 seconds long
+    """
+    func()
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= 0.2:
+            break
+        number *= 2
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+
+    return pages * number / best
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """
+    The cases that are slower than the baseline by more than threshold
+    """
+    return [
+        name
+        for name, rate in results.items()
+        if name in baseline and rate < baseline[name] * (1 - threshold)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="save as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("cases", nargs="*", help="only run these cases")
+    args = parser.parse_args()
+
+    baseline: Dict[str, float] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"{'case':<16}{'pages/sec':>12}{'baseline':>12}{'change':>9}")
+    for name, (pages, func) in cases(load_corpus()).items():
+        if args.cases and name not in args.cases:
+            continue
+        results[name] = rate = measure(pages, func, args.repeat)
+
+        line = f"{name:<16}{rate:>12.1f}"
+        if name in baseline:
+            line += f"{baseline[name]:>12.1f}{rate / baseline[name] - 1:>+9.0%}"
+        print(line)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({**baseline, **results}, f, indent=4, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    slower = compare(results, baseline, args.threshold)
+    if slower:
+        print(
+            f"Slower than baseline by more than {args.threshold:.0%}: {', '.join(slower)}"
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+"""
+Load test the bulk paths of the library against a simulated cricinfo backend.
+
+Usage:
+    python benchmarks/load_test.py [--workloads matches,players,livescores]
+        [--transports pooled,unpooled,asyncio] [--concurrency 1,4,16]
+        [--latency lognormal:0.05:0.5] [--error-rate 0.01] [--rate-limit 500]
+        [--client-rate 10] [--max-client-rate 100]
+
+The backend runs in a separate process so the CPU time reported is the client's alone.
+It serves the pages in benchmarks/corpus for any id, with series feeds listing
+--matches matches, after a latency drawn from the given distribution:
+
+    const:SECONDS
+    uniform:LOW:HIGH
+    exp:MEAN
+    lognormal:MEDIAN:SIGMA
+
+A fraction of requests given by --error-rate fail with a 503 and requests beyond
+--rate-limit per second get a 429, both of which the library retries. The client side
+is paced by a fresh RequestScheduler for each run, set up with --client-rate and
+--max-client-rate.
+
+The workloads are:
+
+    matches     Series.all_matches then loading and parsing every match
+    players     loading and parsing the profile and stats of --players players
+    livescores  --polls polls of the live scores page by each of the concurrent watchers
+
+and the transports:
+
+    pooled      PooledTransport keeping connections alive
+    unpooled    PooledTransport with no pool, a new connection per request
+    asyncio     AsyncClient over a PooledTransport
+
+For each combination requests/sec, p50/p99 request latency and CPU time per page are
+reported.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(HERE, "corpus")
+
+sys.path.insert(0, os.path.dirname(HERE))
+
+from pycricinfo import LiveScores, Match, Player, Series, metrics  # noqa: E402
+from pycricinfo.aio import AsyncClient  # noqa: E402
+from pycricinfo.livescores import LiveScoresWatcher  # noqa: E402
+from pycricinfo.replay import StandInServer, StandInTransport  # noqa: E402
+from pycricinfo.scheduler import RequestScheduler, set_scheduler  # noqa: E402
+from pycricinfo.transport import PooledTransport, Response, Transport  # noqa: E402
+
+SERIES_ID = 8048
+FIRST_MATCH = 1000000
+FIRST_PLAYER = 2000000
+EVENTS_PER_PAGE = 25
+
+
+def latency_distribution(spec: str, seed: int = 0) -> Callable[[], float]:
+    """
+    A function drawing latencies from a distribution given as eg "lognormal:0.05:0.5"
+    """
+    name, *params = spec.split(":")
+    args = [float(p) for p in params]
+    rng = random.Random(seed)
+
+    distributions = {
+        "const": lambda: args[0],
+        "uniform": lambda: rng.uniform(args[0], args[1]),
+        "exp": lambda: rng.expovariate(1 / args[0]),
+        "lognormal": lambda: rng.lognormvariate(math.log(args[0]), args[1]),
+    }
+    return distributions[name]
+
+
+class SimulatedBackend(StandInServer):
+    """
+    Serves the corpus pages for any match or player id and series feeds listing matches
+    ids from FIRST_MATCH onwards, split into seasons of 50
+    """
+
+    def __init__(self, matches: int, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+        self.matches = matches
+
+        def read(name: str) -> bytes:
+            with open(os.path.join(CORPUS, name), "rb") as f:
+                return f.read()
+
+        html = {"Content-Type": "text/html; charset=utf-8"}
+        data = {"Content-Type": "application/json"}
+        self.pages = {
+            "match.html": (html, read("match_1216509.html")),
+            "match.json": (data, read("match_1216509.json")),
+            "player": (html, read("player_6044.html")),
+            "scores": (html, read("livescores.html")),
+            "series": (data, read("series_8048.json")),
+        }
+
+    def lookup(self, host: str, path: str) -> Response:
+        route, _, query = path.partition("?")
+        page = int(query.split("=")[1]) if query.startswith("page=") else 1
+        parts = route.strip("/").split("/")
+
+        if route.startswith("/matches/engine/match/"):
+            return self._page(path, "match." + parts[-1].split(".")[1])
+        if route.startswith("/ci/content/player/"):
+            return self._page(path, "player")
+        if route == "/scores":
+            return self._page(path, "scores")
+        if route.startswith("/v2/sports/cricket/leagues/"):
+            if parts[-1] == "seasons":
+                return self._feed(path, list(range(self._seasons())), page, "seasons")
+            if parts[-1] == "events":
+                season = int(parts[-2])
+                first = FIRST_MATCH + season * 50
+                ids = list(range(first, min(first + 50, FIRST_MATCH + self.matches)))
+                return self._feed(path, ids, page, "events")
+            return self._page(path, "series")
+
+        return Response(path, 404)
+
+    def _seasons(self) -> int:
+        return max(1, math.ceil(self.matches / 50))
+
+    def _page(self, path: str, name: str) -> Response:
+        headers, body = self.pages[name]
+        return Response(path, 200, headers, body)
+
+    def _feed(self, path: str, ids: List[int], page: int, kind: str) -> Response:
+        start = (page - 1) * EVENTS_PER_PAGE
+        end = start + EVENTS_PER_PAGE
+        body = {
+            "count": len(ids),
+            "pageIndex": page,
+            "pageCount": max(1, math.ceil(len(ids) / EVENTS_PER_PAGE)),
+            "items": [
+                {"$ref": f"http://core.espnuk.org/v2/{kind}/{id}"}
+                for id in ids[start:end]
+            ],
+        }
+        return Response(
+            path,
+            200,
+            {"Content-Type": "application/json"},
+            json.dumps(body).encode("utf-8"),
+        )
+
+
+def serve(options: dict, urls, stop) -> None:
+    """
+    Run a backend until stop is set, in a separate process
+    """
+    latency = latency_distribution(options.pop("latency"), options["seed"])
+    with SimulatedBackend(latency=latency, **options) as backend:
+        urls.put(backend.url)
+        stop.wait()
+
+
+class Recorder:
+    """
+    Listener collecting the latency of each request and counting retries
+    """
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.retries = 0
+        self.statuses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: metrics.Event) -> None:
+        with self._lock:
+            if event.kind == "request":
+                self.latencies.append(event.duration)
+                status = str(event.status or event.error)
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+            elif event.kind == "retry":
+                self.retries += 1
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def make_transport(name: str, server_url: str, concurrency: int) -> StandInTransport:
+    pool_size = 0 if name == "unpooled" else concurrency
+    return StandInTransport(server_url, PooledTransport(pool_size=pool_size))
+
+
+def load_matches(transport: Transport, concurrency: int, options) -> Tuple[int, int]:
+    series = Series(SERIES_ID, transport=transport)
+    series.workers = concurrency
+    ids = series.all_matches
+
+    results = list(Match.fetch_many(ids, workers=concurrency, transport=transport))
+    return len(results), sum(1 for r in results if r.error)
+
+
+def load_players(transport: Transport, concurrency: int, options) -> Tuple[int, int]:
+    ids = range(FIRST_PLAYER, FIRST_PLAYER + options.players)
+    results = list(Player.fetch_many(ids, workers=concurrency, transport=transport))
+    return len(results), sum(1 for r in results if r.error)
+
+
+def poll_livescores(transport: Transport, concurrency: int, options) -> Tuple[int, int]:
+    def watch(_) -> int:
+        watcher = LiveScoresWatcher(LiveScores(transport=transport))
+        for _ in range(options.polls):
+            watcher.poll()
+        return options.polls
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return sum(executor.map(watch, range(concurrency))), 0
+
+
+async def aload_pages(
+    cls, ids, transport: Transport, concurrency: int, parse: Tuple[str, ...]
+) -> Tuple[int, int]:
+    async with AsyncClient(transport=transport, concurrency=concurrency) as client:
+
+        async def load(id: int) -> None:
+            page = await cls.aload(id, client=client, transport=transport)
+            for name in parse:
+                getattr(page, name)
+
+        results = await asyncio.gather(
+            *[load(id) for id in ids], return_exceptions=True
+        )
+    return len(results), sum(1 for r in results if isinstance(r, Exception))
+
+
+def aload_matches(transport: Transport, concurrency: int, options) -> Tuple[int, int]:
+    async def run() -> Tuple[int, int]:
+        async with AsyncClient(transport=transport, concurrency=concurrency) as client:
+            ids = await Series(SERIES_ID, transport=transport).aall_matches(client)
+        return await aload_pages(
+            Match, ids, transport, concurrency, Match._bulk_properties
+        )
+
+    return asyncio.run(run())
+
+
+def aload_players(transport: Transport, concurrency: int, options) -> Tuple[int, int]:
+    ids = range(FIRST_PLAYER, FIRST_PLAYER + options.players)
+    return asyncio.run(
+        aload_pages(Player, ids, transport, concurrency, Player._bulk_properties)
+    )
+
+
+def apoll_livescores(
+    transport: Transport, concurrency: int, options
+) -> Tuple[int, int]:
+    async def run() -> int:
+        async with AsyncClient(transport=transport, concurrency=concurrency) as client:
+
+            async def watch() -> int:
+                watcher = LiveScoresWatcher(LiveScores(transport=transport))
+                for _ in range(options.polls):
+                    await client.run(watcher.poll)
+                return options.polls
+
+            return sum(await asyncio.gather(*[watch() for _ in range(concurrency)]))
+
+    return asyncio.run(run()), 0
+
+
+WORKLOADS = {
+    "matches": (load_matches, aload_matches),
+    "players": (load_players, aload_players),
+    "livescores": (poll_livescores, apoll_livescores),
+}
+
+
+def run(
+    workload: str, transport_name: str, concurrency: int, server_url: str, options
+) -> dict:
+    """
+    Run one workload and measure it
+    """
+    # a fresh scheduler so the rate learned in one run doesn't carry into the next
+    limits = {"backoff": options.backoff}
+    if options.client_rate:
+        limits.update(rate=options.client_rate, burst=max(1, concurrency))
+    if options.max_client_rate:
+        limits.update(max_rate=options.max_client_rate)
+    set_scheduler(RequestScheduler(**limits))
+    recorder = metrics.add_listener(Recorder())
+    transport = make_transport(transport_name, server_url, concurrency)
+
+    sync, asynchronous = WORKLOADS[workload]
+    func = asynchronous if transport_name == "asyncio" else sync
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        pages, errors = func(transport, concurrency, options)
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        metrics.remove_listener(recorder)
+        transport.close()
+        transport.transport.close()
+        set_scheduler(None)
+
+    requests = len(recorder.latencies)
+    return {
+        "workload": workload,
+        "transport": transport_name,
+        "concurrency": concurrency,
+        "pages": pages,
+        "errors": errors,
+        "requests": requests,
+        "retries": recorder.retries,
+        "statuses": recorder.statuses,
+        "seconds": wall,
+        "requests_per_sec": requests / wall if wall else 0.0,
+        "p50_ms": percentile(recorder.latencies, 50) * 1000,
+        "p99_ms": percentile(recorder.latencies, 99) * 1000,
+        "cpu_ms_per_page": cpu / pages * 1000 if pages else float("nan"),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workloads", default="matches,players,livescores")
+    parser.add_argument("--transports", default="pooled,unpooled,asyncio")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--latency", default="lognormal:0.05:0.5")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument(
+        "--client-rate", type=float, help="starting requests/sec per host (default 10)"
+    )
+    parser.add_argument(
+        "--max-client-rate", type=float, help="limit for the adapted rate (default 100)"
+    )
+    parser.add_argument("--backoff", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    options = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    urls, stop = context.Queue(), context.Event()
+    backend = context.Process(
+        target=serve,
+        args=(
+            {
+                "matches": options.matches,
+                "latency": options.latency,
+                "error_rate": options.error_rate,
+                "rate_limit": options.rate_limit,
+                "seed": options.seed,
+            },
+            urls,
+            stop,
+        ),
+        daemon=True,
+    )
+    backend.start()
+
+    results = []
+    try:
+        server_url = urls.get(timeout=30)
+
+        print(
+            f"{'workload':<12}{'transport':<10}{'conc':>5}{'pages':>7}{'errors':>7}"
+            f"{'reqs':>7}{'retries':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}"
+            f"{'cpu ms/page':>12}"
+        )
+        for workload in options.workloads.split(","):
+            for transport in options.transports.split(","):
+                for concurrency in [int(c) for c in options.concurrency.split(",")]:
+                    r = run(workload, transport, concurrency, server_url, options)
+                    results.append(r)
+                    print(
+                        f"{workload:<12}{transport:<10}{concurrency:>5}{r['pages']:>7}"
+                        f"{r['errors']:>7}{r['requests']:>7}{r['retries']:>8}"
+                        f"{r['requests_per_sec']:>9.1f}{r['p50_ms']:>9.1f}"
+                        f"{r['p99_ms']:>9.1f}{r['cpu_ms_per_page']:>12.2f}"
+                    )
+    finally:
+        stop.set()
+        backend.join(timeout=10)
+
+    if options.json:
+        with open(options.json, "w") as f:
+            json.dump(results, f, indent=4)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""
+Generate the page corpus used by bench_parsing.py.
+
+Usage:
+    python benchmarks/make_corpus.py [directory]  (default benchmarks/corpus)
+
+The pages are synthetic: they have the structure pycricinfo parses on the real pages
+(the embedded __NEXT_DATA__ json, the match json, the player profile and stats tables)
+padded with navigation, scripts and markup to roughly the size of the real ones. The
+output is deterministic so the checked in corpus can be regenerated exactly.
+"""
+
+import json
+import os
+import random
+import sys
+
+MATCH_ID = 1216509
+PLAYER_ID = 6044
+TEAM_ID = 4344
+GROUND_ID = 56441
+SERIES_ID = 8048
+
+TEAM_IDS = (4344, 4343)
+
+
+def padding(rng: random.Random, size: int) -> str:
+    """
+    Markup of about size characters of the kind that surrounds the data on every page
+    """
+    parts = []
+    length = 0
+    while length < size:
+        n = rng.randint(1, 99999)
+        part = (
+            f'<div class="ds-flex ds-items-center ds-px-4 c{n % 97}">'
+            f'<a href="/story/_/id/{n}/news-{n}" class="ds-text-tight-m" title="Story {n}">'
+            f"<span>Story {n}</span></a>"
+            f'<img src="https://img1.hscicdn.com/image/upload/{n}.jpg" alt="" width="100"/>'
+            "</div>"
+        )
+        if n % 7 == 0:
+            part += f'<script type="text/javascript">window.__ad{n}={{"slot":{n}}};</script>'
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def page(rng: random.Random, canonical: str, body: str, size: int, data=None) -> str:
+    """
+    A page with a canonical link, the body between padding and optionally __NEXT_DATA__
+    """
+    next_data = (
+        f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+        if data is not None
+        else ""
+    )
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"/>'
+        f'<link rel="canonical" href="{canonical}"/>'
+        "<title>ESPNcricinfo</title></head><body>"
+        f"{padding(rng, size // 2)}{body}{padding(rng, size // 2)}{next_data}"
+        "</body></html>"
+    )
+
+
+def players(team: int):
+    return [(team * 100 + i, f"Player {team}-{i}") for i in range(11)]
+
+
+def match_json() -> dict:
+    teams = []
+    for team in TEAM_IDS:
+        teams.append(
+            {
+                "team_id": str(team),
+                "team_name": f"Team {team}",
+                "player": [
+                    {
+                        "object_id": str(id),
+                        "known_as": name,
+                        "captain": "1" if id % 100 == 0 else "0",
+                        "keeper": "1" if id % 100 == 1 else "0",
+                    }
+                    for id, name in players(team)
+                ],
+            }
+        )
+
+    innings = []
+    for number in range(4):
+        batting, bowling = TEAM_IDS[number % 2], TEAM_IDS[1 - number % 2]
+        innings.append(
+            {
+                "batting_team_id": str(batting),
+                "bowling_team_id": str(bowling),
+                "ball_limit": "540",
+                "balls": str(400 + number),
+                "over_limit": "90.0",
+                "overs": f"{66 + number}.4",
+            }
+        )
+
+    return {
+        "description": "Synthetic Trophy, 1st Test: Team 4344 v Team 4343",
+        "match": {
+            "match_status": "complete",
+            "start_datetime_local": "2020-12-17T10:30:00",
+            "international_valid": "1",
+            "international_class_card": "Test",
+            "general_class_id": "1",
+            "season": "2020/21",
+            "ground_object_id": str(GROUND_ID),
+            "ground_name": "Synthetic Oval",
+        },
+        "series": [{"core_recreation_id": str(SERIES_ID), "series_name": "Synthetic"}],
+        "live": {"status": "Team 4344 won by 8 wickets"},
+        "team": teams,
+        "innings": innings,
+        # the real json carries a lot the parser ignores
+        "comms": [
+            {"ball": f"{over}.{ball}", "text": f"Ball {over}.{ball}, no run" * 3}
+            for over in range(90)
+            for ball in range(1, 7)
+        ],
+    }
+
+
+def match_html(rng: random.Random) -> str:
+    innings = []
+    for number in range(4):
+        batting, bowling = TEAM_IDS[number % 2], TEAM_IDS[1 - number % 2]
+        innings.append(
+            {
+                "batsmen": [
+                    {
+                        "href": f"https://www.espncricinfo.com/ci/content/player/{id}.html",
+                        "captain": id % 100 == 0,
+                        "runs": str(rng.randint(0, 150)),
+                        "ballsFaced": str(rng.randint(1, 250)),
+                        "minutes": str(rng.randint(1, 300)),
+                        "fours": str(rng.randint(0, 15)),
+                        "sixes": str(rng.randint(0, 5)),
+                        "strikeRate": f"{rng.uniform(20, 120):.2f}",
+                        "runningScore": {
+                            "runs": str(rng.randint(0, 400)),
+                            "wickets": str(i + 1),
+                        },
+                        "runningOver": f"{rng.randint(1, 90)}.{rng.randint(0, 5)}",
+                    }
+                    for i, (id, _) in enumerate(players(batting))
+                ],
+                "bowlers": [
+                    {
+                        "href": f"https://www.espncricinfo.com/ci/content/player/{id}.html",
+                        "captain": id % 100 == 0,
+                        "overs": f"{rng.randint(5, 30)}",
+                        "maidens": str(rng.randint(0, 8)),
+                        "conceded": str(rng.randint(10, 120)),
+                        "wickets": str(rng.randint(0, 5)),
+                        "dots": str(rng.randint(10, 150)),
+                        "foursConceded": str(rng.randint(0, 15)),
+                        "sixesConceded": str(rng.randint(0, 4)),
+                        "noballs": str(rng.randint(0, 3)),
+                        "wides": str(rng.randint(0, 3)),
+                        "economyRate": f"{rng.uniform(1, 6):.2f}",
+                    }
+                    for id, _ in players(bowling)[6:]
+                ],
+                "commentary": [f"Over {over}: dot ball" for over in range(90)],
+            }
+        )
+    data = {
+        "props": {
+            "pageProps": {
+                "data": {
+                    "meta": {"leagueName": "Synthetic Trophy"},
+                    "content": {"innings": innings, "notes": ["note"] * 200},
+                }
+            }
+        }
+    }
+    return page(
+        rng,
+        f"https://www.espncricinfo.com/series/{SERIES_ID}/scorecard/{MATCH_ID}/synthetic",
+        "<div>Scorecard</div>",
+        250_000,
+        data,
+    )
+
+
+BATTING_COLUMNS = [
+    ("matches played", "Mat"),
+    ("innings batted", "Inns"),
+    ("not outs", "NO"),
+    ("runs scored", "Runs"),
+    ("highest inns score", "HS"),
+    ("batting average", "Ave"),
+    ("balls faced", "BF"),
+    ("batting strike rate", "SR"),
+    ("hundreds scored", "100"),
+    ("fifties scored", "50"),
+    ("boundary fours", "4s"),
+    ("boundary sixes", "6s"),
+    ("catches taken", "Ct"),
+    ("stumpings made", "St"),
+]
+
+BOWLING_COLUMNS = [
+    ("matches played", "Mat"),
+    ("innings bowled in", "Inns"),
+    ("balls bowled", "Balls"),
+    ("runs conceded", "Runs"),
+    ("wickets taken", "Wkts"),
+    ("best innings bowling", "BBI"),
+    ("best match bowling", "BBM"),
+    ("bowling average", "Ave"),
+    ("economy rate", "Econ"),
+    ("bowling strike rate", "SR"),
+    ("four wkts in an inns", "4w"),
+    ("five wkts in an inns", "5w"),
+    ("ten wkts in a match", "10"),
+]
+
+GRADES = ("Tests", "ODIs", "T20Is", "First-class", "List A", "T20s")
+
+
+def stats_table(rng: random.Random, columns) -> str:
+    header = "".join(
+        f'<th title="{title}" class="right">{short}</th>' for title, short in columns
+    )
+    rows = "".join(
+        f'<tr class="data1"><td class="left" title="record"><b>{grade}</b></td>'
+        + "".join(f'<td class="right">{rng.randint(0, 999)}</td>' for _ in columns)
+        + "</tr>"
+        for grade in GRADES
+    )
+    return (
+        '<table class="engineTable"><thead><tr class="head">'
+        f'<th title="record" class="left">&nbsp;</th>{header}</tr></thead>'
+        f"<tbody>{rows}</tbody></table>"
+    )
+
+
+def player_html(rng: random.Random) -> str:
+    info = [
+        ("Full name", ["Dean Mervyn Jones"]),
+        ("Born", ["March 24, 1961, Coburg, Melbourne, Victoria"]),
+        ("Major teams", ["Australia,", "Derbyshire,", "Durham,", "Victoria"]),
+        ("Playing role", ["Batsman"]),
+        ("Batting style", ["Right-hand bat"]),
+        ("Bowling style", ["Right-arm offbreak"]),
+    ]
+    body = (
+        '<div class="ciPlayernametxt"><div><h1>Dean Jones</h1><h3>Australia</h3></div></div>'
+        + "".join(
+            f'<p class="ciPlayerinformationtxt"><b>{label}</b> '
+            + " ".join(f"<span>{v}</span>" for v in values)
+            + "</p>"
+            for label, values in info
+        )
+        + stats_table(rng, BATTING_COLUMNS)
+        + stats_table(rng, BOWLING_COLUMNS)
+    )
+    return page(
+        rng,
+        f"https://www.espncricinfo.com/ci/content/player/{PLAYER_ID}.html",
+        body,
+        120_000,
+    )
+
+
+def team_html(rng: random.Random) -> str:
+    data = {
+        "props": {
+            "pageProps": {
+                "data": {
+                    "content": {
+                        "team": {"id": TEAM_ID, "name": f"Team {TEAM_ID}"},
+                        "players": [
+                            {"id": id, "name": name} for id, name in players(TEAM_ID)
+                        ],
+                        "recentMatches": [
+                            {"id": MATCH_ID + i, "title": f"Match {i}"}
+                            for i in range(50)
+                        ],
+                    }
+                }
+            }
+        }
+    }
+    return page(
+        rng,
+        f"https://www.espncricinfo.com/team/_/id/{TEAM_ID}/synthetic",
+        "<div>Team</div>",
+        150_000,
+        data,
+    )
+
+
+def ground_html(rng: random.Random) -> str:
+    return page(
+        rng,
+        f"https://www.espncricinfo.com/ci/content/ground/{GROUND_ID}.html",
+        "<div><h1>Synthetic Oval</h1><p>Capacity 50,000</p></div>",
+        60_000,
+    )
+
+
+def livescores_html(rng: random.Random) -> str:
+    leagues = []
+    for league in range(8):
+        leagues.append(
+            {
+                "name": f"League {league}",
+                "matchEvents": [
+                    {
+                        "id": str(MATCH_ID + league * 10 + i),
+                        "state": rng.choice(["pre", "in", "post"]),
+                        "statusText": "Stumps",
+                        "competitors": [
+                            {
+                                "name": f"Team {team}",
+                                "score": f"{rng.randint(0, 400)}/{rng.randint(0, 10)}",
+                            }
+                            for team in TEAM_IDS
+                        ],
+                    }
+                    for i in range(6)
+                ],
+            }
+        )
+    data = {"props": {"pageProps": {"data": {"content": {"leagueEvents": leagues}}}}}
+    return page(
+        rng, "https://www.espncricinfo.com/scores", "<div>Scores</div>", 200_000, data
+    )
+
+
+def series_json() -> dict:
+    return {
+        "id": str(SERIES_ID),
+        "name": "Synthetic Trophy",
+        "shortName": "Synthetic",
+        "abbreviation": "ST",
+        "isTournament": True,
+    }
+
+
+def main(directory: str) -> None:
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(0)
+
+    files = {
+        f"match_{MATCH_ID}.html": match_html(rng),
+        f"match_{MATCH_ID}.json": json.dumps(match_json(), indent=4),
+        f"player_{PLAYER_ID}.html": player_html(rng),
+        f"team_{TEAM_ID}.html": team_html(rng),
+        f"ground_{GROUND_ID}.html": ground_html(rng),
+        f"series_{SERIES_ID}.json": json.dumps(series_json(), indent=4),
+        "livescores.html": livescores_html(rng),
+    }
+    for name, content in files.items():
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(content)
+        print(f"{name}: {len(content) // 1024} KB")
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1]
+        if len(sys.argv) > 1
+        else os.path.join(os.path.dirname(__file__), "corpus")
+    )
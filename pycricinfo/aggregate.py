@@ -0,0 +1,248 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from pycricinfo.export import scorecard_arrays
+from pycricinfo.match import Match
+
+# what rows can be grouped by and the column holding it, opposition depends on the table
+GROUP_COLUMNS = {
+    "format": "format",
+    "season": "season",
+    "series": "series",
+    "ground": "ground",
+    "year": "date",
+    "opposition": {"batting": "bowling_team_id", "bowling": "batting_team_id"},
+}
+
+
+def career_stats(
+    scorecards: Union[Dict[str, Any], Iterable[Union[int, Match]]],
+    by: Union[str, Sequence[str]] = "format",
+    players: Optional[Iterable[int]] = None,
+    start: Union[datetime, str, None] = None,
+    end: Union[datetime, str, None] = None,
+) -> Dict[int, Dict[str, Dict[Any, Dict[str, Any]]]]:
+    """
+    Career batting and bowling figures for every player in many scorecards, grouped by
+    format, season, series, ground, year or opposition (team id), or a tuple of them.
+    scorecards are the arrays from export.scorecard_arrays() or matches to build them
+    from. The figures for each group are keyed like Player.player_stats so the two can
+    be compared eg career_stats(matches)[28235]["batting"]["Twenty20"]["runs"]
+
+    Scorecards don't say how a batsman was out, so not outs are the innings without a
+    fall of wicket and an entry with no runs, balls or fall of wicket is taken as did
+    not bat
+    """
+    import numpy as np
+
+    if not isinstance(scorecards, dict):
+        scorecards = scorecard_arrays(scorecards)
+
+    keys = (by,) if isinstance(by, str) else tuple(by)
+    for key in keys:
+        if key not in GROUP_COLUMNS:
+            raise ValueError(f"Can't group by {key}, choose from {list(GROUP_COLUMNS)}")
+
+    stats: Dict[int, Dict[str, Dict[Any, Dict[str, Any]]]] = {}
+
+    for table, aggregate in (("batting", _batting), ("bowling", _bowling)):
+        rows = scorecards[table]
+
+        mask = np.ones(len(rows), dtype=bool)
+        if players is not None:
+            mask &= np.isin(rows["id"], list(players))
+        if start is not None:
+            mask &= rows["date"] >= np.datetime64(start, "s")
+        if end is not None:
+            mask &= rows["date"] <= np.datetime64(end, "s")
+
+        rows = rows[mask]
+        for player, label, figures in aggregate(
+            rows, _group_columns(rows, table, keys)
+        ):
+            stats.setdefault(player, {}).setdefault(table, {})[label] = figures
+
+    return stats
+
+
+def _group_columns(rows, table: str, keys: Tuple[str, ...]) -> List[Any]:
+    """
+    The columns of a table to group rows by, player first
+    """
+    columns = [rows["id"]]
+    for key in keys:
+        column = GROUP_COLUMNS[key]
+        if isinstance(column, dict):
+            column = column[table]
+        values = rows[column]
+        if key == "year":
+            values = values.astype("datetime64[Y]").astype("int64") + 1970
+        columns.append(values)
+    return columns
+
+
+def _groups(columns: List[Any]) -> Tuple[Any, List[tuple]]:
+    """
+    The index of the group of each row, numbered in sorted order of the columns, and
+    the values of the columns for each group
+    """
+    import numpy as np
+
+    codes = np.zeros(len(columns[0]), dtype="int64")
+    for column in columns:
+        values, inverse = np.unique(column, return_inverse=True)
+        codes = codes * len(values) + inverse.reshape(-1)
+
+    _, first, index = np.unique(codes, return_index=True, return_inverse=True)
+    labels = list(zip(*[column[first].tolist() for column in columns]))
+    return index.reshape(-1), labels
+
+
+def _best(index, *keys):
+    """
+    The row with the largest keys (compared in order) in each group
+    """
+    import numpy as np
+
+    order = np.lexsort(tuple(reversed(keys)) + (index,))
+    sorted_index = index[order]
+    last = np.flatnonzero(np.r_[sorted_index[1:] != sorted_index[:-1], True])
+    return order[last]
+
+
+def _ratio(numerator, denominator, scale: float = 1.0):
+    """
+    numerator / denominator rounded to 2 places, 0 where it isn't defined as on the
+    profile pages
+    """
+    import numpy as np
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(denominator > 0, numerator * scale / denominator, 0.0)
+    return np.round(ratio, 2)
+
+
+def _matches(index, match_ids, size: int):
+    """
+    The number of distinct matches in each group
+    """
+    import numpy as np
+
+    pairs = np.unique(np.stack([index, match_ids]), axis=1)
+    return np.bincount(pairs[0], minlength=size)
+
+
+def _labelled(labels: List[tuple], columns: Dict[str, Any]):
+    """
+    Yield (player, group label, figures) for each group
+    """
+    rows = zip(*[values.tolist() for values in columns.values()])
+    for (player, *label), values in zip(labels, rows):
+        yield player, label[0] if len(label) == 1 else tuple(label), dict(
+            zip(columns, values)
+        )
+
+
+def _batting(rows, columns: List[Any]):
+    import numpy as np
+
+    out = rows["fow_wickets"] > 0
+    batted = out | (rows["runs"] > 0) | (rows["balls"] > 0)
+    rows, out = rows[batted], out[batted]
+    columns = [column[batted] for column in columns]
+    if not len(rows):
+        return
+
+    index, labels = _groups(columns)
+    size = len(labels)
+
+    def total(values):
+        return np.bincount(index, weights=values, minlength=size)
+
+    innings = total(np.ones(len(rows)))
+    not_outs = total(~out)
+    runs = total(rows["runs"])
+    balls = total(rows["balls"])
+
+    best = _best(index, rows["runs"], ~out)
+    hs = np.char.add(
+        rows["runs"][best].astype(str), np.where(out[best], "", "*").astype(str)
+    )
+
+    yield from _labelled(
+        labels,
+        {
+            "matches": _matches(index, rows["match_id"], size).astype(float),
+            "innings": innings,
+            "not outs": not_outs,
+            "runs": runs,
+            "hs": hs,
+            "average": _ratio(runs, innings - not_outs),
+            "balls": balls,
+            "sr": _ratio(runs, balls, 100),
+            "100s": total(rows["runs"] >= 100),
+            "50s": total((rows["runs"] >= 50) & (rows["runs"] < 100)),
+            "fours": total(rows["fours"]),
+            "sixes": total(rows["sixes"]),
+        },
+    )
+
+
+def _bowling(rows, columns: List[Any]):
+    import numpy as np
+
+    overs = np.nan_to_num(rows["overs"])
+    whole = np.floor(overs)
+    balls = whole * 6 + np.round((overs - whole) * 10)
+
+    bowled = balls > 0
+    rows, balls = rows[bowled], balls[bowled]
+    columns = [column[bowled] for column in columns]
+    if not len(rows):
+        return
+
+    index, labels = _groups(columns)
+    size = len(labels)
+
+    def total(values, group=index):
+        return np.bincount(group, weights=values, minlength=size)
+
+    runs = total(rows["runs"])
+    wickets = total(rows["wickets"])
+    balls_bowled = total(balls)
+
+    bbi = _best(index, rows["wickets"], -rows["runs"])
+
+    # best match figures from the totals of each player's innings in each match
+    pairs, pair_index = np.unique(
+        np.stack([index, rows["match_id"]]), axis=1, return_inverse=True
+    )
+    pair_index = pair_index.reshape(-1)
+    match_wickets = np.bincount(pair_index, weights=rows["wickets"])
+    match_runs = np.bincount(pair_index, weights=rows["runs"])
+    bbm = _best(pairs[0], match_wickets, -match_runs)
+
+    def figures(w, r):
+        return np.char.add(
+            np.char.add(w.astype("int64").astype(str), "/"),
+            r.astype("int64").astype(str),
+        )
+
+    yield from _labelled(
+        labels,
+        {
+            "matches": np.bincount(pairs[0], minlength=size).astype(float),
+            "innings bowled": total(np.ones(len(rows))),
+            "balls": balls_bowled,
+            "runs": runs,
+            "wickets": wickets,
+            "best bowling innings": figures(rows["wickets"][bbi], rows["runs"][bbi]),
+            "best bowling match": figures(match_wickets[bbm], match_runs[bbm]),
+            "average": _ratio(runs, wickets),
+            "er": _ratio(runs, balls_bowled, 6),
+            "sr": _ratio(balls_bowled, wickets),
+            "four wickets": total(rows["wickets"] == 4),
+            "five wickets": total(rows["wickets"] >= 5),
+            "ten wickets": total(match_wickets >= 10, pairs[0]),
+        },
+    )
@@ -0,0 +1,110 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar, Union
+
+from gazpacho.utils import HTTPError
+
+from pycricinfo import scheduler
+from pycricinfo.transport import Response, Transport
+
+T = TypeVar("T")
+
+
+class AsyncClient:
+    """
+    Asyncio client that runs blocking requests through a transport on a pool of threads.
+    A semaphore bounds the number of requests in flight at once.
+    """
+
+    def __init__(
+        self,
+        transport: Optional[Transport] = None,
+        concurrency: int = 10,
+    ) -> None:
+
+        self.transport = transport
+        self.concurrency = concurrency
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="pycricinfo"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """
+        The semaphore for the running event loop, created on first use in each loop
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking function in the thread pool once a slot is free
+        """
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, partial(func, *args)
+            )
+
+    def request(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Awaitable[Response]:
+        """
+        Make a GET request and return the response, whatever the status code
+        """
+        return self.run(partial(scheduler.request, url, headers, self.transport))
+
+    def get(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Awaitable[Union[str, Dict[str, Any]]]:
+        """
+        Make a GET request and return the content, raising HTTPError for error responses
+        """
+        return self.run(partial(self._get, url, headers))
+
+    def _get(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Union[str, Dict[str, Any]]:
+        response = scheduler.request(url, headers, self.transport)
+        if not response.ok:
+            raise HTTPError(response.status, response.reason)
+        return response.content()
+
+    def close(self) -> None:
+        """
+        Shut down the thread pool
+        """
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.close()
+
+
+_default_client: Optional[AsyncClient] = None
+
+
+def get_client() -> AsyncClient:
+    """
+    The client used by the async loaders when none is passed, created on first use
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = AsyncClient()
+    return _default_client
+
+
+def set_client(client: Optional[AsyncClient]) -> None:
+    """
+    Replace the default async client. Passing None restores a fresh AsyncClient on next use
+    """
+    global _default_client
+    _default_client = client
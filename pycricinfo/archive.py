@@ -0,0 +1,297 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+MAGIC = b"PCIA"
+VERSION = 1
+
+# magic, version, codec, reserved, dictionary length
+HEADER = struct.Struct("<4sBBHI")
+# index offset, index length, magic
+FOOTER = struct.Struct("<QQ4s")
+
+CODECS = {"zlib": 0, "zstd": 1}
+
+# zlib only uses the last 32KB of a preset dictionary
+ZLIB_DICT_SIZE = 32 * 1024
+
+
+def _zstd():
+    """
+    The zstandard module, which is optional
+    """
+    import zstandard
+
+    return zstandard
+
+
+def default_codec() -> str:
+    """
+    zstd if zstandard is installed, otherwise zlib
+    """
+    try:
+        _zstd()
+        return "zstd"
+    except ImportError:
+        return "zlib"
+
+
+def train_dictionary(samples: List[bytes], codec: str, size: int = 112640) -> bytes:
+    """
+    Build a compression dictionary from some sample records. Pages are near identical
+    apart from their data so a dictionary helps a lot with compressing them one by one
+    """
+    if not samples:
+        return b""
+    if codec == "zstd":
+        try:
+            return _zstd().train_dictionary(size, samples).as_bytes()
+        except Exception:
+            # too few samples to train on, use the content as the dictionary instead
+            return b"".join(samples)[-size:]
+    return b"".join(samples)[-ZLIB_DICT_SIZE:]
+
+
+class _Codec:
+    """
+    Compresses and decompresses records, with an optional dictionary
+    """
+
+    def __init__(self, codec: str, dictionary: bytes = b"", level: int = 6) -> None:
+        self.codec = codec
+        self.dictionary = dictionary
+        self.level = level
+        self._local = threading.local()
+
+        if codec == "zstd":
+            zstd = _zstd()
+            self._dict = zstd.ZstdCompressionDict(dictionary) if dictionary else None
+        elif codec != "zlib":
+            raise ValueError(f"Unknown codec {codec}")
+
+    def compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return self._zstd_compressor().compress(data)
+        if self.dictionary:
+            c = zlib.compressobj(self.level, zdict=self.dictionary)
+        else:
+            c = zlib.compressobj(self.level)
+        return c.compress(data) + c.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return self._zstd_decompressor().decompress(data)
+        if self.dictionary:
+            d = zlib.decompressobj(zdict=self.dictionary)
+        else:
+            d = zlib.decompressobj()
+        return d.decompress(data) + d.flush()
+
+    def _zstd_compressor(self):
+        # zstd (de)compressors can't be shared between threads
+        if not hasattr(self._local, "compressor"):
+            self._local.compressor = _zstd().ZstdCompressor(
+                level=self.level, dict_data=self._dict
+            )
+        return self._local.compressor
+
+    def _zstd_decompressor(self):
+        if not hasattr(self._local, "decompressor"):
+            self._local.decompressor = _zstd().ZstdDecompressor(dict_data=self._dict)
+        return self._local.decompressor
+
+
+def archive_key(page_class: Union[type, object], id: int, name: str) -> str:
+    """
+    The key a payload of a page is stored under eg 'match/1216509/html'
+    """
+    if not isinstance(page_class, type):
+        page_class = type(page_class)
+    return f"{page_class.__name__.lower()}/{id}/{name}"
+
+
+class ArchiveWriter:
+    """
+    Writes many pages to a single file of compressed records with an index at the end.
+    If train_samples is set, that many records are held back to train a compression
+    dictionary before anything is written
+    """
+
+    def __init__(
+        self,
+        path: str,
+        codec: Optional[str] = None,
+        level: int = 6,
+        dictionary: Optional[bytes] = None,
+        train_samples: int = 0,
+    ) -> None:
+
+        self.path = path
+        self.codec = codec or default_codec()
+        self.level = level
+        self.dictionary = dictionary
+        self.train_samples = 0 if dictionary is not None else train_samples
+
+        self._file = open(path, "wb")
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._pending: List[Tuple[str, bytes]] = []
+        self._codec: Optional[_Codec] = None
+
+        if not self.train_samples:
+            self._start(self.dictionary or b"")
+
+    def add(self, key: str, data: Union[str, bytes]) -> None:
+        """
+        Add a record. Raises ValueError if a record was already added with the key, as
+        the space it takes up can't be reclaimed
+        """
+        if key in self._index or any(key == k for k, _ in self._pending):
+            raise ValueError(f"{key} is already in the archive")
+
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        if self._codec is None:
+            self._pending.append((key, data))
+            if len(self._pending) >= self.train_samples:
+                self._flush_pending()
+            return
+
+        record = self._codec.compress(data)
+        self._index[key] = (self._file.tell(), len(record))
+        self._file.write(record)
+
+    def add_page(self, page) -> None:
+        """
+        Add all the payloads (html, json) of a page, fetching them if needed
+        """
+        for name in page._payloads:
+            value = getattr(page, name)
+            if name == "json":
+                value = json.dumps(value)
+            self.add(archive_key(page, page.id, name), value)
+
+    def close(self) -> None:
+        """
+        Write the index and footer and close the file
+        """
+        if self._file.closed:
+            return
+        if self._codec is None:
+            self._flush_pending()
+
+        index = zlib.compress(json.dumps(self._index).encode("utf-8"))
+        offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(FOOTER.pack(offset, len(index), MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _start(self, dictionary: bytes) -> None:
+        self._codec = _Codec(self.codec, dictionary, self.level)
+        self._file.write(
+            HEADER.pack(MAGIC, VERSION, CODECS[self.codec], 0, len(dictionary))
+        )
+        self._file.write(dictionary)
+
+    def _flush_pending(self) -> None:
+        pending, self._pending = self._pending, []
+        self._start(train_dictionary([data for _, data in pending], self.codec))
+        for key, data in pending:
+            self.add(key, data)
+
+
+class Archive:
+    """
+    Reads records from an archive at random. The file is memory mapped and only the
+    index and the requested record are read
+    """
+
+    def __init__(self, path: str) -> None:
+
+        self.path = path
+
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, codec, _, dict_length = HEADER.unpack_from(self._mmap, 0)
+        index_offset, index_length, end_magic = FOOTER.unpack_from(
+            self._mmap, len(self._mmap) - FOOTER.size
+        )
+        if magic != MAGIC or end_magic != MAGIC:
+            raise ValueError(f"{path} is not a pycricinfo archive")
+        if version != VERSION:
+            raise ValueError(f"Unsupported archive version {version}")
+
+        codec_name = {v: k for k, v in CODECS.items()}[codec]
+        dict_start = HEADER.size
+        dict_end = dict_start + dict_length
+        dictionary = bytes(self._mmap[dict_start:dict_end])
+        self._codec = _Codec(codec_name, dictionary)
+
+        index_end = index_offset + index_length
+        index = self._mmap[index_offset:index_end]
+        self._index: Dict[str, List[int]] = json.loads(zlib.decompress(index))
+
+    def get(self, key: str) -> bytes:
+        """
+        The decompressed record for a key. Raises KeyError if it isn't in the archive
+        """
+        offset, length = self._index[key]
+        end = offset + length
+        return self._codec.decompress(self._mmap[offset:end])
+
+    def keys(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+# shared archives keyed by path and the modification time and size of the file
+_open_archives: Dict[str, Tuple[Tuple[int, int], Archive]] = {}
+_open_lock = threading.Lock()
+
+
+def open_archive(path: str) -> Archive:
+    """
+    An Archive for a path, kept open and shared so repeated loads don't reread the index.
+    A new one is opened if the file has changed or the shared one has been closed, and
+    the one it replaces is closed
+    """
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    with _open_lock:
+        shared = _open_archives.get(path)
+        if shared is None or shared[0] != version or shared[1].closed:
+            if shared is not None:
+                shared[1].close()
+            shared = _open_archives[path] = (version, Archive(path))
+        return shared[1]
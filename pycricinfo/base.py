@@ -1,9 +1,107 @@
+import asyncio
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from functools import cached_property
+from itertools import islice
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from gazpacho import Soup, get
+from gazpacho import Soup
 from gazpacho.utils import HTTPError
 
-from pycricinfo.exceptions import PageNotFoundException
+from pycricinfo.aio import AsyncClient, get_client
+from pycricinfo.archive import Archive, ArchiveWriter, archive_key, open_archive
+from pycricinfo.cache import DiskCache, cached_get
+from pycricinfo.exceptions import PageNotFoundException, PyCricinfoException
+from pycricinfo.metrics import timed
+from pycricinfo.transport import Response, Transport
+
+
+class FetchResult(NamedTuple):
+    """
+    The outcome of loading one object in a bulk fetch. Either page or error is set
+    """
+
+    id: int
+    page: Optional["BaseCricinfoPage"]
+    error: Optional[Exception]
+
+
+class ParseResult(NamedTuple):
+    """
+    The outcome of parsing one saved page in a batch, the parsed properties by name.
+    Either data or error is set
+    """
+
+    source: Any
+    id: Optional[int]
+    data: Optional[Dict[str, Any]]
+    error: Optional[Exception]
+
+
+class MemoryReport(NamedTuple):
+    """
+    The memory held by an object once its properties were parsed, before and after
+    it was compacted, in bytes
+    """
+
+    id: int
+    before: int
+    after: int
+
+    @property
+    def freed(self) -> int:
+        return self.before - self.after
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    An estimate of the memory held by an object and everything it refers to, counting
+    objects reached more than once only once
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            for name in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, name):
+                    stack.append(getattr(obj, name))
+
+    return size
 
 
 class BaseCricinfoPage:
@@ -11,11 +109,18 @@ class BaseCricinfoPage:
     Base class for all pycricinfo objects
     """
 
-    def __init__(self, id):
+    # the transport used to fetch pages, falls back to the default transport if None
+    transport: Optional[Transport] = None
+
+    # the cache for responses, falls back to the default cache (if any) if None
+    cache: Optional[DiskCache] = None
+
+    def __init__(self, id, transport=None):
         """
         Class constructor
         """
         self.id: int = id
+        self.transport = transport
 
         self.url = None
         self.json_url = None
@@ -25,26 +130,282 @@ class BaseCricinfoPage:
         self.json_file = None
         self.soup = None
 
+    # the cached properties holding raw payloads and the methods that fetch them
+    _payloads = {"html": "_fetch_html"}
+
+    # the properties parsed up front when loading in bulk
+    _bulk_properties: Tuple[str, ...] = ()
+
+    # compact objects once they are loaded in bulk, dropping the raw payloads. Set on
+    # the class to apply to all objects or on an object for just that one
+    lean: bool = False
+
+    # the parse trees built from the payloads, dropped when compacting
+    _parse_trees: Tuple[str, ...] = ("soup", "embedded_json")
+
+    # public properties that need further requests, left alone when compacting
+    _fetched_properties: Tuple[str, ...] = ()
+
     @cached_property
     def html(self) -> str:
         """
         Caches the html from the page associate with the object
         """
+        return self._fetch_html()
+
+    @timed("fetch", "html")
+    def _fetch_html(self) -> str:
+        """
+        Read the html from file or fetch it from the site
+        """
         if self.html_file:
             with open(self.html_file, "r") as f:
                 return f.read()
         else:
             try:
-                return get(self.url)
+                return cached_get(
+                    self.url,
+                    kind=self._cache_kind,
+                    transport=self.transport,
+                    cache=self.cache,
+                    on_response=lambda response: self._received("html", response),
+                )
             except HTTPError as e:
                 if e.code == 404:
                     raise PageNotFoundException(
                         e.code,
                         f"Object {self.id} not found. Check that the id is correct.",
                     )
-                return ""
+                raise PyCricinfoException(e.code, e.msg)
+
+    def _cache_kind(self, response: Response) -> str:
+        """
+        The kind of page this is, which determines how long it is cached for
+        """
+        return "page"
+
+    def _received(self, name: str, response: Response) -> None:
+        """
+        Called with the response a payload was read from, whether from the site or the
+        cache, for subclasses
+        """
+
+    @classmethod
+    def fetch_many(
+        cls, ids: Iterable[int], workers: int = 8, parse: bool = True, **kwargs
+    ) -> Iterator[FetchResult]:
+        """
+        Load many objects on a pool of threads, yielding them as they complete. An error
+        loading one id is returned in its result rather than stopping the others
+        """
+
+        def load(id: int) -> "BaseCricinfoPage":
+            page = cls(id, **kwargs)
+            page._load(parse=parse)
+            return page
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures: Dict[Future, int] = {}
+        ids = iter(ids)
+
+        def submit() -> bool:
+            id = next(ids, None)
+            if id is not None:
+                futures[executor.submit(load, id)] = id
+            return id is not None
+
+        try:
+            # keep every thread busy without reading all the ids up front
+            while len(futures) < workers * 2 and submit():
+                pass
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    id = futures.pop(future)
+                    submit()
+                    try:
+                        yield FetchResult(id, future.result(), None)
+                    except Exception as e:
+                        yield FetchResult(id, None, e)
+        finally:
+            # don't leave work queued if the caller stops iterating early
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    @classmethod
+    def parse_many(
+        cls,
+        sources: Iterable[Any],
+        properties: Optional[Sequence[str]] = None,
+        processes: Optional[int] = None,
+        chunk_size: int = 16,
+        ordered: bool = True,
+        archive: Union[str, Archive, None] = None,
+        cache: Optional[str] = None,
+    ) -> Iterator[ParseResult]:
+        """
+        Parse many saved pages on a pool of processes, yielding the properties parsed
+        from each (by default the bulk properties) rather than the objects so soups
+        never have to be sent back. A source is an html file for from_file, a tuple of
+        files for from_files or an id, read from archive if given or else fetched
+        through the DiskCache at the path cache. Sources go to the workers chunk_size
+        at a time and results come back in the order of sources, or as each chunk is
+        done if ordered is False
+        """
+        properties = tuple(properties or cls._bulk_properties)
+        if isinstance(archive, Archive):
+            archive = archive.path
+
+        processes = processes or os.cpu_count() or 1
+        sources = iter(sources)
+
+        executor = ProcessPoolExecutor(max_workers=processes)
+        pending: Deque[Future] = deque()
+
+        def submit() -> bool:
+            chunk = list(islice(sources, chunk_size))
+            if chunk:
+                pending.append(
+                    executor.submit(
+                        _parse_chunk, cls, chunk, properties, archive, cache
+                    )
+                )
+            return bool(chunk)
+
+        try:
+            # keep every process busy without reading all the sources up front
+            while len(pending) < processes * 2 and submit():
+                pass
+
+            while pending:
+                if ordered:
+                    future = pending.popleft()
+                else:
+                    future = next(iter(wait(pending, return_when=FIRST_COMPLETED)[0]))
+                    pending.remove(future)
+                submit()
+                yield from future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _load(self, parse: bool = True) -> None:
+        """
+        Fetch all the payloads of this object and optionally parse its main properties
+        """
+        for name, method in self._payloads.items():
+            if name not in self.__dict__:
+                self.__dict__[name] = getattr(self, method)()
+
+        if parse:
+            for name in self._bulk_properties:
+                getattr(self, name)
+
+            if self.lean:
+                self.compact()
+
+    @classmethod
+    def _public_properties(cls) -> List[str]:
+        """
+        The names of the public cached properties parsed from the payloads
+        """
+        skip = set(cls._payloads) | set(cls._parse_trees) | set(cls._fetched_properties)
+
+        names = []
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if (
+                    isinstance(value, cached_property)
+                    and not name.startswith("_")
+                    and name not in skip
+                    and name not in names
+                ):
+                    names.append(name)
+        return names
+
+    def compact(self) -> MemoryReport:
+        """
+        Parse every public property then drop the raw payloads, parse trees and
+        intermediate results to save memory. Payloads are fetched again if they are
+        needed later eg to refresh a match
+        """
+        cls = type(self)
+
+        for name in self._public_properties():
+            getattr(self, name)
+
+        before = self.memory_usage()
+
+        for name, value in list(self.__dict__.items()):
+            if (
+                name in self._payloads
+                or name in self._parse_trees
+                or (
+                    name.startswith("_")
+                    and isinstance(getattr(cls, name, None), cached_property)
+                )
+                or isinstance(value, Soup)
+            ):
+                del self.__dict__[name]
+
+        self._compact_properties()
+
+        return MemoryReport(self.id, before, self.memory_usage())
+
+    def _compact_properties(self) -> None:
+        """
+        Replace parsed properties with more compact representations, for subclasses
+        """
+
+    def memory_usage(self) -> int:
+        """
+        An estimate of the memory held by the payloads and properties of this object in
+        bytes (not counting its transport or cache, which are shared)
+        """
+        cls = type(self)
+        return deep_sizeof(
+            {
+                name: value
+                for name, value in self.__dict__.items()
+                if isinstance(getattr(cls, name, None), cached_property)
+            }
+        )
+
+    @classmethod
+    async def aload(cls, id: int, client: Optional[AsyncClient] = None, **kwargs):
+        """
+        Create an object and fetch its payloads asynchronously
+        """
+        page = cls(id, **kwargs)
+        await page._aload(client)
+        return page
+
+    async def _aload(self, client: Optional[AsyncClient] = None) -> None:
+        """
+        Fetch all the payloads of this object concurrently using an AsyncClient
+        """
+        client = self._client(client)
+
+        names = list(self._payloads)
+        values = await asyncio.gather(
+            *[client.run(getattr(self, self._payloads[name])) for name in names]
+        )
+        self.__dict__.update(zip(names, values))
+
+    def _client(self, client: Optional[AsyncClient] = None) -> AsyncClient:
+        """
+        The client to load with. Objects without a transport of their own use the client's
+        """
+        client = client or get_client()
+        if self.transport is None:
+            self.transport = client.transport
+        return client
 
     @cached_property
+    @timed("parse", "soup")
     def soup(self) -> Soup:
         """
         Caches the Soup object derived from the html
@@ -73,6 +434,34 @@ class BaseCricinfoPage:
             with open(json_file, "w") as f:
                 f.write(self.json)
 
+    @classmethod
+    def from_archive(cls, archive: Union[str, Archive], id: int, **kwargs):
+        """
+        Load an object from an archive (or the path to one) written with to_archive
+        """
+        if isinstance(archive, str):
+            archive = open_archive(archive)
+
+        page = cls(id, **kwargs)
+        for name in cls._payloads:
+            try:
+                data = archive.get(archive_key(cls, id, name))
+            except KeyError:
+                raise PageNotFoundException(
+                    id, f"Object {id} not found in archive {archive.path}"
+                )
+            page.__dict__[name] = (
+                json.loads(data) if name == "json" else data.decode("utf-8")
+            )
+
+        return page
+
+    def to_archive(self, writer: ArchiveWriter) -> None:
+        """
+        Add the html (and json if applicable) of this object to an archive
+        """
+        writer.add_page(self)
+
     @staticmethod
     def safe_int(int_string: str = "0") -> int:
         """
@@ -96,3 +485,35 @@ class BaseCricinfoPage:
             return 0.0
         else:
             return float(float_string)
+
+
+def _parse_chunk(
+    cls: Any,
+    sources: List[Any],
+    properties: Tuple[str, ...],
+    archive: Optional[str],
+    cache: Optional[str],
+) -> List[ParseResult]:
+    """
+    Parse a chunk of sources in a worker process for BaseCricinfoPage.parse_many
+    """
+    results = []
+    for source in sources:
+        try:
+            if isinstance(source, tuple):
+                page = cls.from_files(*source)
+            elif isinstance(source, str):
+                page = cls.from_file(source)
+            elif archive is not None:
+                page = cls.from_archive(archive, source)
+            else:
+                page = cls(source)
+                if cache is not None:
+                    page.cache = DiskCache(cache)
+
+            data = {name: getattr(page, name) for name in properties}
+            results.append(ParseResult(source, page.id, data, None))
+        except Exception as e:
+            results.append(ParseResult(source, None, None, e))
+
+    return results
@@ -0,0 +1,245 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Union
+
+from gazpacho.utils import HTTPError
+
+from pycricinfo import metrics, scheduler
+from pycricinfo.transport import Response, Transport
+
+# ttl for pages that will never change, in practice capped by the cache's max_age
+IMMUTABLE = float("inf")
+
+# ttls in seconds for each kind of page
+DEFAULT_TTLS: Dict[str, float] = {
+    "complete": IMMUTABLE,  # matches that have finished
+    "current": 30,  # matches in progress
+    "forthcoming": 60 * 60,  # matches yet to start
+    "live": 15,  # the live scores page
+    "feed": 24 * 60 * 60,  # core.espnuk.org json feeds
+    "page": 24 * 60 * 60,  # anything else, eg player and ground pages
+}
+
+
+class DiskCache:
+    """
+    Persistent cache of responses keyed by url. Each entry is a zlib compressed file whose
+    modification time is set to when it expires, so expiry and eviction only need a stat
+    """
+
+    def __init__(
+        self,
+        path: str = ".pycricinfo_cache",
+        max_size: int = 1024**3,
+        max_age: float = 90 * 24 * 60 * 60,
+        ttls: Optional[Dict[str, float]] = None,
+        compresslevel: int = 6,
+    ) -> None:
+
+        self.path = path
+        self.max_size = max_size
+        self.max_age = max_age
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.compresslevel = compresslevel
+
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+        os.makedirs(self.path, exist_ok=True)
+
+    def ttl(self, kind: str) -> float:
+        """
+        The ttl for a kind of page, capped by max_age
+        """
+        return min(self.ttls.get(kind, self.ttls["page"]), self.max_age)
+
+    def get(self, url: str) -> Optional[Response]:
+        """
+        The cached response for a url or None if there isn't one or it has expired
+        """
+        file = self._file(url)
+        try:
+            if os.stat(file).st_mtime < time.time():
+                self.delete(url)
+                return None
+            with open(file, "rb") as f:
+                data = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+
+        return Response.from_bytes(data)
+
+    def set(self, url: str, response: Response, ttl: float) -> None:
+        """
+        Store a response for a url for ttl seconds
+        """
+        ttl = min(ttl, self.max_age)
+        if ttl <= 0:
+            return
+
+        data = zlib.compress(response.to_bytes(), self.compresslevel)
+
+        file = self._file(url)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+
+        # write to a temporary file first so readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(file))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        now = time.time()
+        os.utime(tmp, (now, now + ttl))
+
+        try:
+            previous = os.stat(file).st_size
+        except OSError:
+            previous = 0
+        os.replace(tmp, file)
+
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data) - previous
+            over = self.size > self.max_size
+
+        if over:
+            self.evict()
+
+    def delete(self, url: str) -> None:
+        """
+        Remove the entry for a url
+        """
+        file = self._file(url)
+        try:
+            size = os.stat(file).st_size
+            os.remove(file)
+        except OSError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def clear(self) -> None:
+        """
+        Remove all entries
+        """
+        for file, _ in self._entries():
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+        with self._lock:
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        """
+        The total size of the entries in bytes
+        """
+        if self._size is None:
+            self._size = sum(stat.st_size for _, stat in self._entries())
+        return self._size
+
+    def evict(self) -> int:
+        """
+        Remove expired entries, then those closest to expiring until the cache fits in
+        max_size. Returns the number of entries removed
+        """
+        now = time.time()
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+
+        size = sum(stat.st_size for _, stat in entries)
+        removed = 0
+        for file, stat in entries:
+            if stat.st_mtime >= now and size <= self.max_size:
+                break
+            try:
+                os.remove(file)
+            except OSError:
+                continue
+            size -= stat.st_size
+            removed += 1
+
+        with self._lock:
+            self._size = size
+
+        return removed
+
+    def _file(self, url: str) -> str:
+        """
+        The path of the file for a url
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, key[:2], f"{key}.z")
+
+    def _entries(self):
+        """
+        Iterate over the files in the cache and their stats
+        """
+        for directory in os.scandir(self.path):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith(".z"):
+                    yield entry.path, entry.stat()
+
+
+_default_cache: Optional[DiskCache] = None
+
+
+def get_cache() -> Optional[DiskCache]:
+    """
+    The cache used by objects that haven't been given one. None if caching is disabled
+    """
+    return _default_cache
+
+
+def set_cache(cache: Optional[DiskCache]) -> None:
+    """
+    Set the default cache. Passing None disables caching
+    """
+    global _default_cache
+    _default_cache = cache
+
+
+def cached_get(
+    url: str,
+    kind: Union[str, Callable[[Response], str]] = "page",
+    transport: Optional[Transport] = None,
+    cache: Optional[DiskCache] = None,
+    on_response: Optional[Callable[[Response], None]] = None,
+) -> Union[str, Dict[str, Any]]:
+    """
+    Get the content for a url from the cache if possible, otherwise fetch it through the
+    transport (paced and retried by the shared scheduler) and cache it. The kind of page
+    (or a function taking the response and returning one) determines how long it is
+    cached for. on_response is called with the response the content came from, eg to
+    read its headers
+    """
+    cache = cache or get_cache()
+
+    if cache is not None:
+        response = cache.get(url)
+        if response is not None:
+            if metrics.enabled():
+                page_kind = kind(response) if callable(kind) else kind
+                metrics.emit(metrics.Event("cache", page_kind, hit=True))
+            if on_response is not None:
+                on_response(response)
+            return response.content()
+
+    response = scheduler.request(url, transport=transport)
+    if not response.ok:
+        raise HTTPError(response.status, response.reason)
+
+    if cache is not None:
+        page_kind = kind(response) if callable(kind) else kind
+        if metrics.enabled():
+            metrics.emit(metrics.Event("cache", page_kind, hit=False))
+        cache.set(url, response, cache.ttl(page_kind))
+
+    if on_response is not None:
+        on_response(response)
+    return response.content()
@@ -0,0 +1,348 @@
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from pycricinfo.exceptions import PageNotFoundException
+from pycricinfo.ground import Ground
+from pycricinfo.match import Match
+from pycricinfo.player import Player
+from pycricinfo.scheduler import TokenBucket
+from pycricinfo.series import Series
+from pycricinfo.transport import Transport
+
+# the order entities are crawled in, lower first. The leaves of the graph come first so
+# the players and ground of a match are crawled before the next match, which gets
+# complete matches early and keeps the frontier to the matches of the current seasons
+DEFAULT_PRIORITIES = {
+    "player": 0,
+    "ground": 1,
+    "match": 2,
+    "season": 3,
+    "series": 4,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS nodes_frontier ON nodes (state, priority, seq);
+"""
+
+Node = Tuple[str, Any]  # (kind, id)
+
+
+class CrawlResult(NamedTuple):
+    """
+    The outcome of crawling one entity. Either page or error is set
+    """
+
+    kind: str
+    id: Any
+    page: Optional[Any]
+    error: Optional[Exception]
+
+
+class CrawlState:
+    """
+    The frontier and seen set of a crawl, persisted in a SQLite database. Every entity
+    ever queued is a row, so queuing it again is a no-op. Rows move from pending to
+    running to done (or failed) and running rows go back to pending when the state is
+    reopened, so a crawl that crashed resumes where it was last checkpointed
+    """
+
+    def __init__(self, path: str, priorities: Optional[Dict[str, int]] = None) -> None:
+
+        self.path = path
+        self.priorities = {**DEFAULT_PRIORITIES, **(priorities or {})}
+
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.db.execute("UPDATE nodes SET state = 'pending' WHERE state = 'running'")
+        self.db.commit()
+
+        self._seq = self.db.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM nodes"
+        ).fetchone()[0]
+
+    def add(self, kind: str, id: Any) -> bool:
+        """
+        Queue an entity unless it has been seen before. Returns whether it was queued
+        """
+        self._seq += 1
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO nodes (key, kind, id, priority, seq, state) "
+            "VALUES (?, ?, ?, ?, ?, 'pending')",
+            (f"{kind}:{id}", kind, str(id), self.priorities.get(kind, 99), self._seq),
+        )
+        return cursor.rowcount > 0
+
+    def pop(self, n: int) -> List[Node]:
+        """
+        Take up to n of the pending entities with the highest priority, skipping those
+        waiting to be retried
+        """
+        rows = self.db.execute(
+            "SELECT kind, id FROM nodes WHERE state = 'pending' AND not_before <= ? "
+            "ORDER BY priority, seq LIMIT ?",
+            (time.time(), n),
+        ).fetchall()
+        self.db.executemany(
+            "UPDATE nodes SET state = 'running' WHERE key = ?",
+            [(f"{kind}:{id}",) for kind, id in rows],
+        )
+        return rows
+
+    def done(self, node: Node) -> None:
+        self._set(node, "done")
+
+    def failed(
+        self, node: Node, error: Exception, retry: bool, delay: float = 0.0
+    ) -> None:
+        """
+        Record an error, putting the entity back in the frontier to be retried after
+        delay seconds if it is to be retried
+        """
+        self.db.execute(
+            "UPDATE nodes SET state = ?, attempts = attempts + 1, not_before = ?, "
+            "error = ? WHERE key = ?",
+            (
+                "pending" if retry else "failed",
+                time.time() + delay,
+                repr(error),
+                self._key(node),
+            ),
+        )
+
+    def release(self, nodes: Iterable[Node]) -> None:
+        """
+        Put entities that were taken but not crawled back in the frontier
+        """
+        for node in nodes:
+            self._set(node, "pending")
+
+    def until_ready(self) -> Optional[float]:
+        """
+        The seconds until a pending entity can be taken, None if there are none
+        """
+        row = self.db.execute(
+            "SELECT MIN(not_before) FROM nodes WHERE state = 'pending'"
+        ).fetchone()
+        return None if row[0] is None else max(row[0] - time.time(), 0.0)
+
+    def attempts(self, node: Node) -> int:
+        row = self.db.execute(
+            "SELECT attempts FROM nodes WHERE key = ?", (self._key(node),)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def checkpoint(self) -> None:
+        """
+        Make everything recorded so far durable
+        """
+        self.db.commit()
+
+    def counts(self) -> Dict[str, int]:
+        """
+        The number of entities in each state
+        """
+        return dict(
+            self.db.execute(
+                "SELECT state, COUNT(*) FROM nodes GROUP BY state"
+            ).fetchall()
+        )
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
+
+    def _set(self, node: Node, state: str) -> None:
+        self.db.execute(
+            "UPDATE nodes SET state = ? WHERE key = ?", (state, self._key(node))
+        )
+
+    @staticmethod
+    def _key(node: Node) -> str:
+        return f"{node[0]}:{node[1]}"
+
+
+class Crawler:
+    """
+    Crawls the graph from series to seasons, matches and on to the players and grounds
+    of each match, fetching and parsing with the page classes on a pool of threads.
+    Only the kinds of entity listed in follow are crawled. Pages are fetched at no more
+    than rate per second however many workers there are, and progress is checkpointed
+    to the state file every checkpoint_every entities. An entity that fails is tried up
+    to max_attempts times, waiting retry_delay seconds (doubling each time) in between
+
+    crawler = Crawler("ipl.crawl")
+    crawler.add("series", 8048)
+    for result in crawler.crawl():
+        ...
+    """
+
+    def __init__(
+        self,
+        path: str,
+        workers: int = 4,
+        rate: float = 2.0,
+        follow: Iterable[str] = ("season", "match", "player", "ground"),
+        priorities: Optional[Dict[str, int]] = None,
+        checkpoint_every: int = 20,
+        max_attempts: int = 3,
+        retry_delay: float = 30.0,
+        transport: Optional[Transport] = None,
+    ) -> None:
+
+        self.state = CrawlState(path, priorities)
+        self.workers = workers
+        self.follow = set(follow)
+        self.checkpoint_every = checkpoint_every
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.transport = transport
+
+        self._bucket = TokenBucket(rate, 1)
+
+        self.handlers: Dict[str, Callable[[str], Tuple[Any, List[Node]]]] = {
+            "series": self._series,
+            "season": self._season,
+            "match": self._match,
+            "player": self._player,
+            "ground": self._ground,
+        }
+
+    def add(self, kind: str, id: Any) -> bool:
+        """
+        Queue an entity to crawl from. Returns False if it has already been seen
+        """
+        queued = self.state.add(kind, id)
+        self.state.checkpoint()
+        return queued
+
+    def crawl(self, limit: Optional[int] = None) -> Iterator[CrawlResult]:
+        """
+        Crawl until the frontier is empty (or limit entities have been crawled),
+        yielding each entity as it completes
+        """
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        running: Dict[Future, Node] = {}
+        crawled = 0
+        try:
+            while True:
+                wanted = self.workers - len(running)
+                if limit is not None:
+                    wanted = min(wanted, limit - crawled - len(running))
+                for node in self.state.pop(wanted) if wanted > 0 else []:
+                    running[executor.submit(self._visit, node)] = node
+                if not running:
+                    # all that's left may be waiting to be retried
+                    delay = self.state.until_ready() if wanted > 0 else None
+                    if delay is None:
+                        break
+                    time.sleep(delay)
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    crawled += 1
+                    yield self._complete(node, future)
+                    if crawled % self.checkpoint_every == 0:
+                        self.state.checkpoint()
+        finally:
+            for future in running:
+                future.cancel()
+            self.state.release(running.values())
+            self.state.checkpoint()
+            executor.shutdown(wait=False)
+
+    def counts(self) -> Dict[str, int]:
+        """
+        The number of entities pending, done and failed
+        """
+        return self.state.counts()
+
+    def close(self) -> None:
+        self.state.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _visit(self, node: Node) -> Tuple[Any, List[Node]]:
+        kind, id = node
+        self._bucket.acquire()
+        return self.handlers[kind](id)
+
+    def _complete(self, node: Node, future: Future) -> CrawlResult:
+        """
+        Record the outcome of crawling an entity and queue what it links to
+        """
+        kind, id = node
+        try:
+            page, children = future.result()
+        except Exception as e:
+            attempts = self.state.attempts(node)
+            retry = not isinstance(e, PageNotFoundException) and (
+                attempts + 1 < self.max_attempts
+            )
+            self.state.failed(node, e, retry, self.retry_delay * 2**attempts)
+            return CrawlResult(kind, id, None, e)
+
+        for child_kind, child_id in children:
+            if child_kind in self.follow:
+                self.state.add(child_kind, child_id)
+        self.state.done(node)
+
+        return CrawlResult(kind, id, page, None)
+
+    def _series(self, id: str) -> Tuple[Any, List[Node]]:
+        series = Series(int(id), transport=self.transport)
+        return series, [("season", f"{id}/{season}") for season in series.seasons]
+
+    def _season(self, id: str) -> Tuple[Any, List[Node]]:
+        series_id, season = id.split("/")
+        matches = Series(int(series_id), transport=self.transport).get_season_matches(
+            int(season)
+        )
+        return matches, [("match", match) for match in matches]
+
+    def _match(self, id: str) -> Tuple[Any, List[Node]]:
+        match = Match(int(id), transport=self.transport)
+        match._load()
+
+        children: List[Node] = [("player", player) for player in match.player_index]
+        if match.ground and match.ground.get("id"):
+            children.append(("ground", match.ground["id"]))
+        return match, children
+
+    def _player(self, id: str) -> Tuple[Any, List[Node]]:
+        player = Player(int(id), transport=self.transport)
+        player._load()
+        return player, []
+
+    def _ground(self, id: str) -> Tuple[Any, List[Node]]:
+        ground = Ground(int(id), transport=self.transport)
+        ground._load()
+        return ground, []
@@ -0,0 +1,345 @@
+import json
+import uuid
+from datetime import date
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from pycricinfo.match import Match, ScorecardEntry
+
+# the keys identifying the match each row belongs to
+MATCH_FIELDS = [
+    ("match_id", "int"),
+    ("date", "date"),
+    ("series_id", "int"),
+    ("series", "str"),
+    ("season_id", "int"),
+    ("season", "str"),
+    ("format_id", "int"),
+    ("format", "str"),
+    ("ground_id", "int"),
+    ("ground", "str"),
+    ("innings", "int"),
+    ("batting_team_id", "int"),
+    ("bowling_team_id", "int"),
+]
+
+# the columns of each table, after the match fields
+TABLE_FIELDS = {
+    "innings": [
+        ("balls_limit", "int"),
+        ("balls", "int"),
+        ("over_limit", "float"),
+        ("overs", "float"),
+    ],
+    "batting": [
+        ("id", "int"),
+        ("name", "str"),
+        ("captain", "bool"),
+        ("runs", "int"),
+        ("balls", "int"),
+        ("minutes", "int"),
+        ("fours", "int"),
+        ("sixes", "int"),
+        ("sr", "float"),
+        ("fow_runs", "int"),
+        ("fow_wickets", "int"),
+        ("fow_overs", "float"),
+    ],
+    "bowling": [
+        ("id", "int"),
+        ("name", "str"),
+        ("captain", "bool"),
+        ("overs", "float"),
+        ("maidens", "int"),
+        ("runs", "int"),
+        ("wickets", "int"),
+        ("dotballs", "int"),
+        ("fours", "int"),
+        ("sixes", "int"),
+        ("noballs", "int"),
+        ("wides", "int"),
+        ("er", "float"),
+    ],
+}
+
+# numpy has no nulls so missing values are filled in
+NUMPY_TYPES = {
+    "int": ("int64", 0),
+    "float": ("float64", float("nan")),
+    "str": ("U", ""),
+    "bool": ("bool", False),
+    "date": ("datetime64[s]", "NaT"),
+}
+
+
+def table_fields(table: str) -> List[Tuple[str, str]]:
+    """
+    The names and types of the columns of a table: 'innings', 'batting' or 'bowling'
+    """
+    return MATCH_FIELDS + TABLE_FIELDS[table]
+
+
+def match_keys(match: Match) -> Dict[str, Any]:
+    """
+    The fields identifying a match that are added to each of its rows
+    """
+    series = match.series or {}
+    season = match.season or {}
+    format = match.format or {}
+    ground = match.ground or {}
+
+    return {
+        "match_id": match.id,
+        "date": match.date,
+        "series_id": series.get("id"),
+        "series": series.get("name"),
+        "season_id": season.get("id"),
+        "season": season.get("name"),
+        "format_id": format.get("id"),
+        "format": format.get("name"),
+        "ground_id": ground.get("id"),
+        "ground": ground.get("name"),
+    }
+
+
+def scorecard_rows(match: Match) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Flatten the scorecard of a match into (table, row) pairs, one for each innings and
+    each batting and bowling entry. Each row carries the keys of its match and innings
+    """
+    keys = match_keys(match)
+
+    for number, inn in enumerate(match.match_stats["all_innings"], start=1):
+        innings_keys = {
+            **keys,
+            "innings": number,
+            "batting_team_id": inn.get("batting_team_id"),
+            "bowling_team_id": inn.get("bowling_team_id"),
+        }
+
+        yield "innings", {
+            **innings_keys,
+            "balls_limit": inn.get("balls_limit"),
+            "balls": inn.get("balls"),
+            "over_limit": inn.get("over_limit"),
+            "overs": inn.get("overs"),
+        }
+
+        for b in inn.get("batting") or []:
+            fow = b.get("fow") or {}
+            yield "batting", {
+                **innings_keys,
+                **{k: v for k, v in b.items() if k != "fow"},
+                "fow_runs": fow.get("runs"),
+                "fow_wickets": fow.get("wickets"),
+                "fow_overs": fow.get("overs"),
+            }
+
+        for b in inn.get("bowling") or []:
+            yield "bowling", {**innings_keys, **b}
+
+
+def iter_matches(matches: Iterable[Union[int, Match]]) -> Iterator[Match]:
+    """
+    Turn an iterable of match ids and Match objects into Match objects, one at a time
+    """
+    for match in matches:
+        yield match if isinstance(match, Match) else Match(match)
+
+
+def ndjson_lines(
+    matches: Iterable[Union[int, Match]],
+    tables: Sequence[str] = ("innings", "batting", "bowling"),
+) -> Iterator[str]:
+    """
+    Yield a line of json for each innings, batting and bowling row of many matches,
+    with the table it belongs to under "table". Matches are loaded one at a time as
+    the lines are consumed, so memory stays flat however many there are
+    """
+    for match in iter_matches(matches):
+        for table, row in scorecard_rows(match):
+            if table in tables:
+                yield json.dumps({"table": table, **row}, default=_json_default) + "\n"
+
+
+def write_ndjson(
+    matches: Iterable[Union[int, Match]],
+    file: IO[str],
+    tables: Sequence[str] = ("innings", "batting", "bowling"),
+) -> int:
+    """
+    Stream the rows of many matches to a file-like object as newline delimited json.
+    Returns the number of rows written
+    """
+    count = 0
+    for line in ndjson_lines(matches, tables):
+        file.write(line)
+        count += 1
+    return count
+
+
+def _json_default(value: Any) -> Any:
+    """
+    Encode the values json doesn't know about: dates, compacted scorecard entries and
+    numpy scalars
+    """
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, ScorecardEntry):
+        return dict(value)
+
+    try:
+        import numpy as np
+    except ImportError:
+        pass
+    else:
+        if isinstance(value, np.generic):
+            return value.item()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ScorecardColumns:
+    """
+    Accumulates the innings, batting and bowling rows of many matches column by column
+    and builds typed arrays from them
+    """
+
+    def __init__(self, matches: Iterable[Union[int, Match]] = ()) -> None:
+        self.columns: Dict[str, Dict[str, list]] = {
+            table: {name: [] for name, _ in table_fields(table)}
+            for table in TABLE_FIELDS
+        }
+        self.add(matches)
+
+    def __len__(self) -> int:
+        """
+        The number of innings
+        """
+        return len(self.columns["innings"]["match_id"])
+
+    @property
+    def rows(self) -> int:
+        """
+        The number of rows in all the tables
+        """
+        return sum(len(columns["match_id"]) for columns in self.columns.values())
+
+    def add(self, matches: Iterable[Union[int, Match]]) -> None:
+        """
+        Add the scorecards of some matches
+        """
+        for match in iter_matches(matches):
+            for table, row in scorecard_rows(match):
+                for name, values in self.columns[table].items():
+                    values.append(row.get(name))
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        The tables as numpy structured arrays. Missing numbers are 0 or NaN
+        """
+        import numpy as np
+
+        arrays = {}
+        for table, columns in self.columns.items():
+            data = {}
+            for name, kind in table_fields(table):
+                dtype, fill = NUMPY_TYPES[kind]
+                values = [fill if v is None else v for v in columns[name]]
+                data[name] = np.asarray(values, dtype=dtype if kind != "str" else str)
+
+            length = len(columns["match_id"])
+            array = np.empty(length, dtype=[(n, a.dtype) for n, a in data.items()])
+            for name, column in data.items():
+                array[name] = column
+            arrays[table] = array
+
+        return arrays
+
+    def to_arrow(self) -> Dict[str, Any]:
+        """
+        The tables as pyarrow RecordBatches. Missing values are null
+        """
+        import pyarrow as pa  # type: ignore
+
+        types = {
+            "int": pa.int64(),
+            "float": pa.float64(),
+            "str": pa.string(),
+            "bool": pa.bool_(),
+            "date": pa.timestamp("s"),
+        }
+
+        batches = {}
+        for table, columns in self.columns.items():
+            fields = table_fields(table)
+            batches[table] = pa.RecordBatch.from_arrays(
+                [pa.array(columns[name], type=types[kind]) for name, kind in fields],
+                schema=pa.schema([(name, types[kind]) for name, kind in fields]),
+            )
+
+        return batches
+
+
+def scorecard_arrays(matches: Iterable[Union[int, Match]]) -> Dict[str, Any]:
+    """
+    The innings, batting and bowling of many matches as numpy structured arrays
+    """
+    return ScorecardColumns(matches).to_numpy()
+
+
+def scorecard_batches(matches: Iterable[Union[int, Match]]) -> Dict[str, Any]:
+    """
+    The innings, batting and bowling of many matches as pyarrow RecordBatches
+    """
+    return ScorecardColumns(matches).to_arrow()
+
+
+def write_parquet(
+    matches: Iterable[Union[int, Match]],
+    path: str,
+    partition_by: Sequence[str] = ("season_id", "format_id"),
+    chunk_rows: int = 100_000,
+) -> None:
+    """
+    Write the scorecards of many matches to partitioned parquet datasets at
+    path/innings, path/batting and path/bowling. Each match's rows are taken as soon as
+    it loads and written out every chunk_rows rows, so only one match and a chunk of
+    rows are ever held in memory
+    """
+    import pyarrow as pa  # type: ignore
+    import pyarrow.dataset as ds  # type: ignore
+
+    partitioning: Optional[List[str]] = list(partition_by) or None
+
+    def flush(columns: ScorecardColumns) -> None:
+        for table, batch in columns.to_arrow().items():
+            ds.write_dataset(
+                pa.Table.from_batches([batch]),
+                f"{path}/{table}",
+                format="parquet",
+                partitioning=partitioning,
+                partitioning_flavor="hive" if partitioning else None,
+                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+
+    columns = ScorecardColumns()
+    for match in iter_matches(matches):
+        columns.add([match])
+        if columns.rows >= chunk_rows:
+            flush(columns)
+            columns = ScorecardColumns()
+
+    if columns.rows:
+        flush(columns)
@@ -1,6 +1,9 @@
+from typing import Optional
+
 from gazpacho import Soup
 
 from pycricinfo.base import BaseCricinfoPage
+from pycricinfo.transport import Transport
 
 
 class Ground(BaseCricinfoPage):
@@ -12,9 +15,11 @@ class Ground(BaseCricinfoPage):
         self,
         id: int,
         html_file: str = None,
+        transport: Optional[Transport] = None,
     ) -> None:
 
         self.id = id
+        self.transport = transport
 
         self.url = f"https://www.espncricinfo.com/ci/content/ground/{self.id}.html"
 
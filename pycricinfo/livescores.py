@@ -1,9 +1,72 @@
+import asyncio
 import json
+import time
 import warnings
 from functools import cached_property
-from typing import List
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
-from gazpacho import Soup, get
+from gazpacho import Soup
+from gazpacho.utils import HTTPError
+
+from pycricinfo import scheduler
+from pycricinfo.aio import AsyncClient, get_client
+from pycricinfo.cache import DiskCache, cached_get
+from pycricinfo.exceptions import PageNotFoundException, PyCricinfoException
+from pycricinfo.metrics import timed
+from pycricinfo.parsing import next_data_text, select_embedded
+from pycricinfo.transport import Response, Transport
+
+# the states a match event on the scores page can be in
+MATCH_STATES = ("pre", "in", "post")
+
+
+class MatchState(NamedTuple):
+    """
+    The state of a match on the live scores page
+    """
+
+    id: int
+    league: Optional[str]
+    state: Optional[str]  # pre, in or post
+    status: Optional[str]  # eg "India won by 7 wickets"
+    scores: Tuple[Tuple[Optional[str], Optional[str]], ...]  # (team, score) pairs
+
+
+class ScoreChange(NamedTuple):
+    """
+    A match whose scores have changed between two polls
+    """
+
+    id: int
+    before: MatchState
+    after: MatchState
+
+
+class LiveScoresDiff(NamedTuple):
+    """
+    The changes to the live scores page between two polls
+    """
+
+    started: List[int]
+    finished: List[int]
+    scores: List[ScoreChange]
+    matches: Dict[int, MatchState]  # the state of every match after the poll
+
+    @property
+    def changed(self) -> bool:
+        """
+        Flag to indicate anything has changed
+        """
+        return bool(self.started or self.finished or self.scores)
 
 
 class LiveScores(object):
@@ -11,11 +74,16 @@ class LiveScores(object):
     Object used to scrape basic information about live games
     """
 
+    # the cache for responses, falls back to the default cache (if any) if None
+    cache: Optional[DiskCache] = None
+
     def __init__(
         self,
+        transport: Optional[Transport] = None,
         **kwargs,
     ) -> None:
 
+        self.transport = transport
         self.url = "https://www.espncricinfo.com/scores"
 
     # caching the results for now, this might need to be reviewed for this object
@@ -25,8 +93,14 @@ class LiveScores(object):
         """
         The html from this page
         """
-        r = get(self.url)
-        return r
+        try:
+            return cached_get(
+                self.url, kind="live", transport=self.transport, cache=self.cache
+            )
+        except HTTPError as e:
+            if e.code == 404:
+                raise PageNotFoundException(e.code, "Live scores page not found")
+            raise PyCricinfoException(e.code, e.msg)
 
     @cached_property
     def soup(self) -> Soup:
@@ -36,14 +110,18 @@ class LiveScores(object):
         return Soup(self.html)
 
     @cached_property
+    @timed("parse", "embedded_json")
     def embedded_json(self) -> dict:
         """
         Try to locate the embedded json inside the html
         """
         try:
-            json_text = self.soup.find(
-                "script", attrs={"id": "__NEXT_DATA__"}, mode="first"
-            ).text
+            json_text = (
+                next_data_text(self.html)
+                or self.soup.find(
+                    "script", attrs={"id": "__NEXT_DATA__"}, mode="first"
+                ).text
+            )
             return json.loads(json_text)
         except Exception:
             warnings.warn(
@@ -57,10 +135,223 @@ class LiveScores(object):
         Return a list of all live matches
         """
         match_ids = []
-        for match in self.embedded_json["props"]["pageProps"]["data"]["content"][
-            "leagueEvents"
-        ][0]["matchEvents"]:
+        try:
+            for match in select_embedded(
+                self, ("props", "pageProps", "data", "content", "leagueEvents", 0)
+            )["matchEvents"]:
 
-            match_ids.append(int(match["id"]))
+                match_ids.append(int(match["id"]))
+        except Exception:
+            warnings.warn("Live matches not found in page", RuntimeWarning)
 
         return match_ids
+
+    @cached_property
+    def match_states(self) -> Dict[int, MatchState]:
+        """
+        The state of every match on the page, across all leagues
+        """
+        states = {}
+        try:
+            leagues = select_embedded(
+                self, ("props", "pageProps", "data", "content", "leagueEvents")
+            )
+            for league in leagues or []:
+                for match in league.get("matchEvents") or []:
+                    state = self._match_state(match, league)
+                    states[state.id] = state
+        except Exception:
+            warnings.warn("Match states not found in page", RuntimeWarning)
+            return {}
+
+        return states
+
+    @staticmethod
+    def _match_state(match: Dict[str, Any], league: Dict[str, Any]) -> MatchState:
+        """
+        Reduce a match event to the fields that are watched for changes
+        """
+        state = match.get("state")
+
+        return MatchState(
+            id=int(match["id"]),
+            league=league.get("name"),
+            state=state if state in MATCH_STATES else None,
+            status=match.get("statusText"),
+            scores=tuple(
+                (team.get("name"), team.get("score"))
+                for team in match.get("competitors") or []
+            ),
+        )
+
+    def watch(
+        self,
+        interval: float = 15.0,
+        max_interval: float = 300.0,
+        backoff: float = 2.0,
+        polls: Optional[int] = None,
+    ) -> Iterator[LiveScoresDiff]:
+        """
+        Poll the page and yield a diff whenever something changes. Requests are
+        conditional so an unchanged page costs a 304 and no parsing, and the interval
+        grows by backoff each time nothing changes, up to max_interval. The first diff
+        lists the matches already in progress as started
+        """
+        watcher = LiveScoresWatcher(self, interval, max_interval, backoff)
+        count = 0
+        while polls is None or count < polls:
+            if count:
+                time.sleep(watcher.delay)
+            diff = watcher.poll()
+            count += 1
+            if diff is not None:
+                yield diff
+
+    async def awatch(
+        self,
+        client: Optional[AsyncClient] = None,
+        interval: float = 15.0,
+        max_interval: float = 300.0,
+        backoff: float = 2.0,
+        polls: Optional[int] = None,
+    ) -> AsyncIterator[LiveScoresDiff]:
+        """
+        Asynchronous version of watch()
+        """
+        client = client or get_client()
+        if self.transport is None:
+            self.transport = client.transport
+
+        watcher = LiveScoresWatcher(self, interval, max_interval, backoff)
+        count = 0
+        while polls is None or count < polls:
+            if count:
+                await asyncio.sleep(watcher.delay)
+            diff = await client.run(watcher.poll)
+            count += 1
+            if diff is not None:
+                yield diff
+
+
+class LiveScoresWatcher:
+    """
+    Makes conditional requests for the live scores page and diffs the matches on it
+    against the previous poll. Changed pages are loaded into the LiveScores object so
+    its properties stay current
+    """
+
+    def __init__(
+        self,
+        scores: LiveScores,
+        interval: float = 15.0,
+        max_interval: float = 300.0,
+        backoff: float = 2.0,
+    ) -> None:
+
+        self.scores = scores
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+        # the seconds to wait before the next poll
+        self.delay = interval
+
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._html: Optional[str] = None
+        self._states: Optional[Dict[int, MatchState]] = None
+
+    def poll(self) -> Optional[LiveScoresDiff]:
+        """
+        Fetch the page if it has changed and return the diff, or None if nothing changed.
+        An error (including being rate limited once the scheduler has given up
+        retrying) is raised rather than looking like a page that hasn't changed
+        """
+        response = self._request()
+
+        if response.status == 304:
+            return self._unchanged()
+        if response.status == 404:
+            raise PageNotFoundException(response.status, "Live scores page not found")
+        if not response.ok:
+            raise PyCricinfoException(response.status, response.reason)
+
+        self._etag = response.headers.get("etag", self._etag)
+        self._last_modified = response.headers.get("last-modified", self._last_modified)
+
+        # servers that ignore conditional requests send the same page again
+        html = response.text
+        if html == self._html:
+            return self._unchanged()
+        self._html = html
+
+        self._load(html)
+        previous, self._states = self._states, self.scores.match_states
+        diff = self.diff(previous, self._states)
+
+        # the page changed but not the matches on it, eg an advert
+        if previous is not None and not diff.changed:
+            return self._unchanged()
+
+        self.delay = self.interval
+        return diff
+
+    @staticmethod
+    def diff(
+        before: Optional[Dict[int, MatchState]], after: Dict[int, MatchState]
+    ) -> LiveScoresDiff:
+        """
+        The changes between two sets of match states. With no previous states, the
+        matches in progress count as started
+        """
+        if before is None:
+            return LiveScoresDiff(
+                started=[id for id, state in after.items() if state.state == "in"],
+                finished=[],
+                scores=[],
+                matches=after,
+            )
+
+        started, finished, scores = [], [], []
+        for id, state in after.items():
+            previous = before.get(id)
+            previous_state = previous.state if previous else "pre"
+
+            if state.state == "in" and previous_state == "pre":
+                started.append(id)
+            if state.state == "post" and previous_state != "post":
+                finished.append(id)
+            if previous is not None and state.scores != previous.scores:
+                scores.append(ScoreChange(id, previous, state))
+
+        return LiveScoresDiff(started, finished, scores, after)
+
+    def _request(self) -> Response:
+        """
+        Request the page, only asking for it to be sent if it has changed
+        """
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        return scheduler.request(
+            self.scores.url, headers=headers, transport=self.scores.transport
+        )
+
+    def _load(self, html: str) -> None:
+        """
+        Replace the page held by the LiveScores object and drop what was parsed from it
+        """
+        d = self.scores.__dict__
+        for name in ("soup", "embedded_json", "live_matches", "match_states"):
+            d.pop(name, None)
+        d["html"] = html
+
+    def _unchanged(self) -> Optional[LiveScoresDiff]:
+        """
+        Back off when nothing has changed
+        """
+        self.delay = min(self.delay * self.backoff, self.max_interval)
+        return None
@@ -1,14 +1,111 @@
+import hashlib
 import json
+import re
 import warnings
+from collections.abc import Mapping
 from datetime import datetime
 from functools import cached_property
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
 
-from gazpacho import Soup, get
+from gazpacho import Soup
 from gazpacho.utils import HTTPError
 
-from pycricinfo.base import BaseCricinfoPage
+from pycricinfo import scheduler
+from pycricinfo.base import BaseCricinfoPage, MemoryReport
+from pycricinfo.cache import cached_get, get_cache
 from pycricinfo.exceptions import PageNotFoundException, PyCricinfoException
+from pycricinfo.metrics import timed
+from pycricinfo.parsing import next_data_text, select_embedded
+from pycricinfo.transport import Response, Transport
+
+# the status of the match in its json, or the json embedded in its page
+MATCH_STATUS = r'"match_status"\s*:\s*"(\w+)"'
+
+
+def _digest(payload: Union[str, dict]) -> str:
+    """
+    A digest of a payload to compare it with once it has been dropped
+    """
+    text = payload if isinstance(payload, str) else json.dumps(payload, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class MatchRefresh(NamedTuple):
+    """
+    What changed when a match was refreshed
+    """
+
+    payloads: List[str]  # the payloads (json, html) that had changed
+    properties: List[str]  # the loaded properties whose values changed
+
+    @property
+    def changed(self) -> bool:
+        """
+        Flag to indicate anything has changed
+        """
+        return bool(self.payloads)
+
+
+class ScorecardEntry(Mapping):
+    """
+    A batting or bowling entry of a compacted match, held in slots rather than a dict
+    but read with the same keys
+    """
+
+    __slots__: Tuple[str, ...] = ()
+
+    def __init__(self, values: Dict[str, Any]) -> None:
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class BattingEntry(ScorecardEntry):
+
+    __slots__ = (
+        "id",
+        "name",
+        "captain",
+        "runs",
+        "balls",
+        "minutes",
+        "fours",
+        "sixes",
+        "sr",
+        "fow",
+    )
+
+
+class BowlingEntry(ScorecardEntry):
+
+    __slots__ = (
+        "id",
+        "name",
+        "captain",
+        "overs",
+        "maidens",
+        "runs",
+        "wickets",
+        "dotballs",
+        "fours",
+        "sixes",
+        "noballs",
+        "wides",
+        "er",
+    )
 
 
 class Match(BaseCricinfoPage):
@@ -21,10 +118,12 @@ class Match(BaseCricinfoPage):
         id: int,
         html_file: Optional[str] = None,
         json_file: Optional[str] = None,
+        transport: Optional[Transport] = None,
         **kwargs,
     ) -> None:
 
         self.id = id
+        self.transport = transport
 
         self.url = f"https://www.espncricinfo.com/matches/engine/match/{id}.html"
         self.json_url = f"https://www.espncricinfo.com/matches/engine/match/{id}.json"
@@ -32,6 +131,11 @@ class Match(BaseCricinfoPage):
         self.html_file = html_file
         self.json_file = json_file
 
+        # the etag and last-modified headers of each payload, for conditional requests
+        self._validators: Dict[str, Dict[str, str]] = {}
+        # digests of the payloads dropped by compact(), to tell if a refetch has changed
+        self._digests: Dict[str, str] = {}
+
     @classmethod
     def from_files(cls, html_file: str, json_file: str):
         """
@@ -64,34 +168,177 @@ class Match(BaseCricinfoPage):
         with open(json_file, "w") as f:
             f.write(json.dumps(self.json, indent=4))
 
+    # the json comes first so the status of the match is known when caching the html
+    _payloads = {"json": "_fetch_json", "html": "_fetch_html"}
+
+    _bulk_properties = ("teams", "match_stats")
+
+    # the properties derived from each payload that change while a match is in progress.
+    # Everything else (teams, ground, series etc) is kept when refreshing
+    _live_properties = {
+        "json": ("status", "result", "_innings_list", "_all_innings", "match_stats"),
+        "html": (
+            "soup",
+            "embedded_json",
+            "_innings_details_list",
+            "_all_innings",
+            "match_stats",
+        ),
+    }
+
+    def refresh(self) -> MatchRefresh:
+        """
+        Bring an in progress match up to date. The json is refetched with a conditional
+        request and the html only if the json has changed. Only the properties that
+        depend on a changed payload are recomputed
+        """
+        payloads: List[str] = []
+        for name in ("json", "html"):
+            if payloads or name == "json":
+                value = self._refetch(name)
+                if value is not None:
+                    self.__dict__[name] = value
+                    payloads.append(name)
+
+        invalidated = {p for name in payloads for p in self._live_properties[name]}
+        previous = {p: self.__dict__.pop(p) for p in invalidated if p in self.__dict__}
+
+        # report public properties that had been loaded and now have a different value
+        properties = [
+            p
+            for p in previous
+            if not p.startswith("_")
+            and p not in ("soup", "embedded_json")
+            and getattr(self, p) != previous[p]
+        ]
+
+        if self.lean:
+            self.compact()
+
+        return MatchRefresh(payloads, sorted(properties))
+
+    def _refetch(self, name: str) -> Optional[Union[str, dict]]:
+        """
+        Fetch a payload again, returning None if it hasn't changed. Once a payload has
+        been fetched it is always requested from the site, conditionally if it came
+        with validators, rather than from the cache
+        """
+        if (self.html_file if name == "html" else self.json_file) or (
+            name not in self.__dict__ and name not in self._validators
+        ):
+            value = getattr(self, self._payloads[name])()
+            return None if self._unchanged(name, value) else value
+
+        url = self.url if name == "html" else self.json_url
+        headers = {}
+        validators = self._validators.get(name, {})
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last-modified" in validators:
+            headers["If-Modified-Since"] = validators["last-modified"]
+
+        response = scheduler.request(url, headers=headers, transport=self.transport)
+        if response.status == 304:
+            return None
+        if response.status == 404:
+            raise PageNotFoundException(
+                response.status,
+                f"Match {self.id} not found. Check that the id is correct.",
+            )
+        if not response.ok:
+            raise PyCricinfoException(response.status, response.reason)
+
+        self._received(name, response)
+
+        # keep the cache in step so new objects see the refreshed payload
+        cache = self.cache or get_cache()
+        if cache is not None:
+            kind = self._cache_kind if name == "html" else self._json_cache_kind
+            cache.set(url, response, cache.ttl(kind(response)))
+
+        value = response.content()
+        return None if self._unchanged(name, value) else value
+
+    def _unchanged(self, name: str, value: Union[str, dict]) -> bool:
+        """
+        Whether a refetched payload is the same as the one held, or the one dropped when
+        compacting
+        """
+        if name in self.__dict__:
+            return value == self.__dict__[name]
+        return self._digests.get(name) == _digest(value)
+
+    def _received(self, name: str, response: Response) -> None:
+        """
+        Keep the validators of each payload for conditional requests when refreshing
+        """
+        self._validators[name] = {
+            k: v for k, v in response.headers.items() if k in ("etag", "last-modified")
+        }
+
     @cached_property
     def json(self) -> dict:
         """
         The JSON file for this match
         """
+        return self._fetch_json()
+
+    @timed("fetch", "json")
+    def _fetch_json(self) -> dict:
+        """
+        Read the json from file or fetch it from the site
+        """
         if self.json_file:
             with open(self.json_file, "r") as f:
                 return json.loads(f.read())
         else:
             try:
-                return get(self.json_url)
+                return cached_get(
+                    self.json_url,
+                    kind=self._json_cache_kind,
+                    transport=self.transport,
+                    cache=self.cache,
+                    on_response=lambda response: self._received("json", response),
+                )
             except HTTPError as e:
                 if e.code == 404:
                     raise PageNotFoundException(
                         e.code,
                         f"Match {self.id} not found. Check that the id is correct.",
                     )
-                raise PyCricinfoException(e.code, e.message)
+                raise PyCricinfoException(e.code, e.msg)
+
+    def _cache_kind(self, response: Response) -> str:
+        """
+        The html is cached according to the status of the match, from the json if it has
+        been loaded or else the json embedded in the page
+        """
+        if "json" in self.__dict__ and self.json:
+            return self.json.get("match", {}).get("match_status") or "current"
+        status = re.search(MATCH_STATUS, next_data_text(response.body) or "")
+        return status.group(1) if status else "current"
+
+    @staticmethod
+    def _json_cache_kind(response: Response) -> str:
+        """
+        The json is cached according to the status of the match it contains
+        """
+        status = re.search(MATCH_STATUS.encode("utf-8"), response.body)
+        return status.group(1).decode("utf-8") if status else "current"
 
     @cached_property
+    @timed("parse", "embedded_json")
     def embedded_json(self) -> dict:
         """
         Try to find the embedded json in the html
         """
         try:
-            json_text = self.soup.find(
-                "script", attrs={"id": "__NEXT_DATA__"}, mode="first"
-            ).text
+            json_text = (
+                next_data_text(self.html)
+                or self.soup.find(
+                    "script", attrs={"id": "__NEXT_DATA__"}, mode="first"
+                ).text
+            )
             return json.loads(json_text)
         except Exception:
             warnings.warn(
@@ -266,6 +513,45 @@ class Match(BaseCricinfoPage):
             return [{}, {}]
 
     @cached_property
+    def player_index(self) -> Dict[int, dict]:
+        """
+        All players in the match keyed by id, each a dict containing id, name, team_id,
+        team_name, captain and keeper
+        """
+
+        try:
+            index = {}
+            for team in self.json["team"]:
+                team_id = BaseCricinfoPage.safe_int(team["team_id"])
+                for p in team["player"]:
+                    id = BaseCricinfoPage.safe_int(p["object_id"])
+                    index[id] = {
+                        "id": id,
+                        "name": p["known_as"],
+                        "team_id": team_id,
+                        "team_name": team["team_name"],
+                        "captain": str(p.get("captain")) == "1",
+                        "keeper": str(p.get("keeper")) == "1",
+                    }
+            return index
+
+        except Exception:
+            warnings.warn(
+                f"Could not parse players for match {self.id}", RuntimeWarning
+            )
+            return {}
+
+    def _player_name(self, id: int, team_id: int) -> str:
+        """
+        The name of a player if they played for the team, otherwise an empty string
+        """
+        player = self.player_index.get(id)
+        if player and player["team_id"] == team_id:
+            return player["name"]
+        return ""
+
+    @cached_property
+    @timed("parse", "match_stats")
     def match_stats(self) -> dict:
         """
         Gives a dictionary of the stats of the game
@@ -275,6 +561,28 @@ class Match(BaseCricinfoPage):
             "all_innings": self._all_innings,
         }
 
+    def compact(self) -> MemoryReport:
+        """
+        Compact the match, keeping a digest of each payload it drops so a later refresh
+        can still tell whether it has changed
+        """
+        # parsing the properties may fetch the payloads
+        for name in self._public_properties():
+            getattr(self, name)
+
+        for name in self._payloads:
+            if name in self.__dict__:
+                self._digests[name] = _digest(self.__dict__[name])
+        return super().compact()
+
+    def _compact_properties(self) -> None:
+        """
+        Hold the batting and bowling entries of each innings in slotted records
+        """
+        for inn in self.__dict__.get("match_stats", {}).get("all_innings") or []:
+            inn["batting"] = [BattingEntry(b) for b in inn.get("batting") or []]
+            inn["bowling"] = [BowlingEntry(b) for b in inn.get("bowling") or []]
+
     @cached_property
     def _all_innings(self) -> List[dict]:
         """
@@ -302,9 +610,10 @@ class Match(BaseCricinfoPage):
         The details of the innings stored in the json
         """
         try:
-            return self.embedded_json["props"]["pageProps"]["data"]["content"][
-                "innings"
-            ]
+            # only decode the innings rather than the whole embedded json
+            return select_embedded(
+                self, ("props", "pageProps", "data", "content", "innings")
+            )
 
         except Exception:
             warnings.warn("Property not found in page", RuntimeWarning)
@@ -350,21 +659,13 @@ class Match(BaseCricinfoPage):
             details = self._innings_details_list[index]
 
             if details:
+                team_id = self._get_innings_headline(index)["batting_team_id"]
+
                 for b in details["batsmen"]:
 
                     id = int(b["href"].split("/")[6].split(".")[0])
 
-                    # bit of a hack to get the player's name
-                    name = ""
-
-                    for t in self.teams:
-                        if (
-                            t["id"]
-                            == self._get_innings_headline(index)["batting_team_id"]
-                        ):
-                            for p in t["players"]:
-                                if p["id"] == id:
-                                    name = p["name"]
+                    name = self._player_name(id, team_id)
 
                     # try to get FOW
                     # strange hack to pass mypy checks but doesn't seem necessary and needs to be reviewed
@@ -410,21 +711,13 @@ class Match(BaseCricinfoPage):
             details = self._innings_details_list[index]
 
             if details:
+                team_id = self._get_innings_headline(index)["bowling_team_id"]
+
                 for b in details["bowlers"]:
 
                     id = int(b["href"].split("/")[6].split(".")[0])
 
-                    # bit of a hack to get the player's name
-                    name = ""
-
-                    for t in self.teams:
-                        if (
-                            t["id"]
-                            == self._get_innings_headline(index)["bowling_team_id"]
-                        ):
-                            for p in t["players"]:
-                                if p["id"] == id:
-                                    name = p["name"]
+                    name = self._player_name(id, team_id)
 
                     bowling.append(
                         {
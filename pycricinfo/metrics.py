@@ -0,0 +1,262 @@
+import bisect
+import functools
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# the upper bounds in seconds of the duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Event(NamedTuple):
+    """
+    Something measured while fetching or parsing a page. The kinds are:
+
+    request: one attempt at a request, stage is the host
+    retry: a request that is going to be retried, stage is the host
+    cache: a lookup in the response cache, stage is the kind of page
+    fetch: getting a payload (html or json) from wherever it comes from
+    parse: computing a property from the payloads, eg soup or player_stats
+    """
+
+    kind: str
+    stage: str
+    duration: float = 0.0
+    size: int = 0
+    status: Optional[int] = None
+    hit: Optional[bool] = None
+    error: Optional[str] = None
+
+
+Listener = Callable[[Event], None]
+
+# instrumentation is disabled while this is empty
+_listeners: List[Listener] = []
+_lock = threading.Lock()
+
+
+def add_listener(listener: Listener) -> Listener:
+    """
+    Call a function with every event from now on. Returns the listener so this can be
+    used as a decorator
+    """
+    with _lock:
+        _listeners.append(listener)
+    return listener
+
+
+def remove_listener(listener: Listener) -> None:
+    """
+    Stop calling a listener
+    """
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def enabled() -> bool:
+    """
+    Flag to indicate anything is listening
+    """
+    return bool(_listeners)
+
+
+def emit(event: Event) -> None:
+    """
+    Pass an event to the listeners. Callers check enabled() first so nothing is built
+    when instrumentation is off
+    """
+    for listener in list(_listeners):
+        listener(event)
+
+
+def timed(kind: str, stage: str) -> Callable:
+    """
+    Decorator emitting the duration of each call to a function as an event
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _listeners:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            error = None
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                emit(Event(kind, stage, time.perf_counter() - start, error=error))
+
+        return wrapper
+
+    return decorator
+
+
+class Histogram:
+    """
+    Counts of observations falling under each bucket bound, plus their sum
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """
+        (bound, count of observations <= bound) pairs, as Prometheus expects
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsAggregator:
+    """
+    Listener that totals events into counters and duration histograms
+
+    aggregator = MetricsAggregator()
+    add_listener(aggregator)
+    ...
+    print(aggregator.to_prometheus())
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS) -> None:
+        self.buckets = buckets
+
+        self.counters: Dict[str, Dict[Labels, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        with self._lock:
+            if event.kind == "request":
+                status = str(event.status) if event.status else event.error or ""
+                self._count(
+                    "requests_total", (("host", event.stage), ("status", status))
+                )
+                self._count(
+                    "response_bytes_total", (("host", event.stage),), event.size
+                )
+                self._observe("request_seconds", (("host", event.stage),), event)
+            elif event.kind == "retry":
+                reason = str(event.status) if event.status else event.error or ""
+                self._count(
+                    "retries_total", (("host", event.stage), ("reason", reason))
+                )
+            elif event.kind == "cache":
+                result = "hit" if event.hit else "miss"
+                self._count(
+                    "cache_lookups_total", (("kind", event.stage), ("result", result))
+                )
+            else:
+                labels = (("kind", event.kind), ("stage", event.stage))
+                self._observe("stage_seconds", labels, event)
+                if event.error:
+                    self._count("stage_errors_total", labels)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """
+        The value of a counter eg counter("requests_total", host="...", status="200")
+        """
+        return self.counters[name].get(_key(labels), 0)
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        """
+        A duration histogram eg histogram("stage_seconds", kind="parse", stage="soup")
+        """
+        return self.histograms[name].get(_key(labels))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def to_prometheus(self, prefix: str = "pycricinfo_") -> str:
+        """
+        The metrics in the Prometheus text exposition format
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{prefix}{name}{_labels(labels)} {_number(value)}")
+
+            for name, histograms in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for labels, histogram in sorted(histograms.items()):
+                    for bound, count in histogram.cumulative():
+                        bucket_labels = labels + (("le", _number(bound)),)
+                        lines.append(
+                            f"{prefix}{name}_bucket{_labels(bucket_labels)} {count}"
+                        )
+                    inf_labels = labels + (("le", "+Inf"),)
+                    lines.append(
+                        f"{prefix}{name}_bucket{_labels(inf_labels)} {histogram.count}"
+                    )
+                    lines.append(
+                        f"{prefix}{name}_sum{_labels(labels)} {_number(histogram.sum)}"
+                    )
+                    lines.append(
+                        f"{prefix}{name}_count{_labels(labels)} {histogram.count}"
+                    )
+
+        return "\n".join(lines) + "\n"
+
+    def _count(self, name: str, labels: Labels, value: float = 1) -> None:
+        self.counters[name][tuple(sorted(labels))] += value
+
+    def _observe(self, name: str, labels: Labels, event: Event) -> None:
+        labels = tuple(sorted(labels))
+        series = self.histograms[name]
+        if labels not in series:
+            series[labels] = Histogram(self.buckets)
+        series[labels].observe(event.duration)
+
+
+def _key(labels: Dict[str, str]) -> Labels:
+    """
+    The labels of a series sorted by name so they can be given in any order
+    """
+    return tuple(sorted(labels.items()))
+
+
+def _labels(labels: Labels) -> str:
+    """
+    Format labels as {name="value",...}
+    """
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _number(value: float) -> str:
+    """
+    Format a number without a trailing .0 for whole numbers
+    """
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,393 @@
+import json
+import re
+from html.parser import HTMLParser
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+# the opening tag of the script holding the page's embedded json
+NEXT_DATA_TAG = re.compile(
+    r"""<script[^>]*\sid\s*=\s*["']?__NEXT_DATA__["']?[^>]*>""", re.IGNORECASE
+)
+SCRIPT_END = re.compile(r"</script\s*>", re.IGNORECASE)
+
+
+def next_data_text(html: Union[str, bytes, None]) -> Optional[str]:
+    """
+    Slice the text of the __NEXT_DATA__ script straight out of the html without parsing
+    the page. Returns None if it can't be found
+    """
+    if not html:
+        return None
+    if isinstance(html, bytes):
+        html = html.decode("utf-8")
+
+    # the script is normally near the end of the page
+    start = html.rfind("__NEXT_DATA__")
+    if start < 0:
+        return None
+
+    tag = NEXT_DATA_TAG.search(html, html.rfind("<script", 0, start))
+    if not tag or tag.start() > start:
+        tag = NEXT_DATA_TAG.search(html)
+        if not tag:
+            return None
+
+    end = SCRIPT_END.search(html, tag.end())
+    if not end:
+        return None
+
+    text_start, text_end = tag.end(), end.start()
+    return html[text_start:text_end].strip() or None
+
+
+# a run of json without any brackets outside of strings
+JSON_FLAT = re.compile(r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*')
+JSON_SCALAR_END = re.compile(r"[,}\]\s]")
+WHITESPACE = re.compile(r"\s*")
+
+_decoder = json.JSONDecoder()
+
+# decodes the string whose opening quote is just before pos, returning it and its end
+_scanstring: Callable[[str, int], Tuple[str, int]]
+_scanstring = json.decoder.scanstring  # type: ignore[attr-defined]
+
+
+def select_json(text: str, path: Sequence[Union[str, int]]) -> Any:
+    """
+    Decode only the value at path (a sequence of keys and list indexes) in a json
+    document. Everything else is skipped over without being decoded. Raises KeyError or
+    IndexError if the path doesn't exist, like indexing the decoded document would
+    """
+    pos = _skip_whitespace(text, 0)
+
+    for key in path:
+        if isinstance(key, str):
+            pos = _find_key(text, pos, key)
+        else:
+            pos = _find_index(text, pos, key)
+
+    return _decoder.raw_decode(text, pos)[0]
+
+
+def select_embedded(
+    page, path: Sequence[Union[str, int]], selective: Optional[bool] = None
+) -> Any:
+    """
+    A value from a page's embedded json. By default the whole document is decoded once
+    with json.loads and kept, which is the quickest. If selective (by default when the
+    page is lean) and it hasn't already been decoded, only the requested part is. That
+    is slower, since everything else still has to be scanned in Python, but it never
+    builds the rest of the document
+    """
+    if selective is None:
+        selective = getattr(page, "lean", False)
+
+    if selective and "embedded_json" not in page.__dict__:
+        text = next_data_text(page.html)
+        if text:
+            return select_json(text, path)
+
+    value = page.embedded_json
+    for key in path:
+        value = value[key]
+    return value
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    match = WHITESPACE.match(text, pos)
+    return match.end() if match else pos
+
+
+def _skip_value(text: str, pos: int) -> int:
+    """
+    The position just after the value starting at pos
+    """
+    char = text[pos]
+
+    if char == '"':
+        return _scanstring(text, pos + 1)[1]
+
+    if char not in "{[":
+        end = JSON_SCALAR_END.search(text, pos)
+        return end.start() if end else len(text)
+
+    depth = 0
+    while True:
+        char = text[pos]
+        if char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+        else:
+            raise ValueError(f"Invalid json at {pos}")
+        pos += 1
+        if depth == 0:
+            return pos
+        flat = JSON_FLAT.match(text, pos)
+        pos = flat.end() if flat else pos
+
+
+def _find_key(text: str, pos: int, key: str) -> int:
+    """
+    The position of the value for key in the object starting at pos
+    """
+    if text[pos] != "{":
+        raise KeyError(key)
+    pos = _skip_whitespace(text, pos + 1)
+
+    while text[pos] != "}":
+        name, pos = _scanstring(text, pos + 1)
+        pos = _skip_whitespace(text, pos)
+        # skip the colon
+        pos = _skip_whitespace(text, pos + 1)
+        if name == key:
+            return pos
+        pos = _skip_whitespace(text, _skip_value(text, pos))
+        if text[pos] == ",":
+            pos = _skip_whitespace(text, pos + 1)
+
+    raise KeyError(key)
+
+
+def _find_index(text: str, pos: int, index: int) -> int:
+    """
+    The position of item index in the list starting at pos
+    """
+    if text[pos] != "[":
+        raise IndexError(index)
+    pos = _skip_whitespace(text, pos + 1)
+
+    current = 0
+    while text[pos] != "]":
+        if current == index:
+            return pos
+        pos = _skip_whitespace(text, _skip_value(text, pos))
+        if text[pos] == ",":
+            pos = _skip_whitespace(text, pos + 1)
+        current += 1
+
+    raise IndexError(index)
+
+
+class PlayerProfileParser(HTMLParser):
+    """
+    Collects the name and the labelled information fields from a player's profile in a
+    single pass over the html
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.name: Optional[str] = None
+        self.info: Dict[str, List[str]] = {}
+
+        self._in_name_div = False
+        self._label: Optional[str] = None
+        self._values: Optional[List[str]] = None
+        # the element whose text is being captured and how deeply nested in it we are
+        self._capture: Optional[str] = None
+        self._depth = 0
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if self._capture:
+            if tag == self._capture:
+                self._depth += 1
+            return
+
+        classes = dict(attrs).get("class") or ""
+        if tag == "div" and "ciPlayernametxt" in classes:
+            self._in_name_div = True
+        elif tag == "h1" and self._in_name_div and self.name is None:
+            self._start_capture(tag)
+        elif tag == "p" and "ciPlayerinformationtxt" in classes:
+            self._label, self._values = None, []
+        elif tag in ("b", "span") and self._values is not None:
+            self._start_capture(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._capture:
+            if tag != self._capture:
+                return
+            if self._depth:
+                self._depth -= 1
+                return
+            self._end_capture(" ".join("".join(self._text).split()))
+        elif tag == "p" and self._values is not None:
+            if self._label:
+                self.info[self._label] = self._values
+            self._label, self._values = None, None
+
+    def handle_data(self, data: str) -> None:
+        if self._capture:
+            self._text.append(data)
+
+    def _start_capture(self, tag: str) -> None:
+        self._capture, self._depth, self._text = tag, 0, []
+
+    def _end_capture(self, text: str) -> None:
+        if self._capture == "h1":
+            self.name = text
+            self._in_name_div = False
+        elif self._capture == "b":
+            self._label = text
+        elif self._values is not None:
+            self._values.append(text)
+        self._capture = None
+
+
+def parse_player_profile(html: str) -> PlayerProfileParser:
+    """
+    Parse the name and information fields of a player's profile. Only the part of the
+    page containing them is fed to the parser
+    """
+    markers = ("ciPlayernametxt", "ciPlayerinformationtxt")
+
+    starts = [html.find(marker) for marker in markers]
+    ends = [html.rfind(marker) for marker in markers]
+    if min(starts) >= 0:
+        start = html.rfind("<", 0, min(starts))
+        end = html.find("</p>", max(ends))
+        if start >= 0 and end >= 0:
+            html = html[start:end] + "</p>"
+
+    parser = PlayerProfileParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+class Table(NamedTuple):
+    """
+    A table as its header titles and the text of the cells of each row
+    """
+
+    headers: List[str]
+    rows: List[List[str]]
+
+
+class TableSchema:
+    """
+    Maps the header titles of a table's columns to a name and a function to convert the
+    cell text. Columns not in the schema keep their title and text
+    """
+
+    def __init__(self, columns: Dict[str, Tuple[str, Callable[[str], Any]]]) -> None:
+        self.columns = columns
+
+    def convert(self, title: str, text: str) -> Tuple[str, Any]:
+        """
+        The name and converted value of a single cell
+        """
+        name, convert = self.columns.get(title, (title, str))
+        return name, convert(text)
+
+    def records(self, table: Table) -> Dict[str, Dict[str, Any]]:
+        """
+        The rows of a table as dicts of converted values, keyed by their first cell
+        """
+        # look up each column once rather than for every cell
+        columns = [self.columns.get(title, (title, str)) for title in table.headers[1:]]
+
+        records = {}
+        for row in table.rows:
+            if not row:
+                continue
+            records[row[0]] = {
+                name: convert(text) for (name, convert), text in zip(columns, row[1:])
+            }
+        return records
+
+
+class TableParser(HTMLParser):
+    """
+    Collects the headers and cell text of every table with a given class in a single
+    pass. The text of a cell is its first non blank piece of text, like Soup.text
+    """
+
+    def __init__(self, table_class: str) -> None:
+        super().__init__()
+        self.table_class = table_class
+        self.tables: List[Table] = []
+
+        self._depth = 0
+        self._row: Optional[List[str]] = None
+        self._header_row = False
+        self._cell: Optional[str] = None
+        self._cell_text: Optional[str] = None
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag == "table":
+            if self._depth:
+                self._depth += 1
+            elif self.table_class in (dict(attrs).get("class") or ""):
+                self._depth = 1
+                self.tables.append(Table([], []))
+            return
+
+        # only look at the cells of the matching table, not of any nested in it
+        if self._depth != 1:
+            return
+
+        if tag == "tr":
+            self._row, self._header_row = [], False
+        elif tag in ("th", "td") and self._row is not None:
+            self._cell = tag
+            self._cell_text = None
+            if tag == "th":
+                self._header_row = True
+                self._cell_text = dict(attrs).get("title")
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self._depth:
+            return
+        if tag == "table":
+            self._depth -= 1
+            return
+        if self._depth != 1:
+            return
+
+        if tag in ("th", "td") and self._cell and self._row is not None:
+            self._row.append(self._cell_text or "")
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            table = self.tables[-1]
+            if self._header_row and not table.headers:
+                table.headers.extend(self._row)
+            elif not self._header_row:
+                table.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data: str) -> None:
+        if self._cell and self._cell_text is None and self._depth == 1:
+            data = data.strip()
+            if data:
+                self._cell_text = data
+
+
+def extract_tables(html: str, table_class: str = "engineTable") -> List[Table]:
+    """
+    Extract every table with a class from the html in one pass over the part of the page
+    containing them
+    """
+    start = html.find(table_class)
+    if start < 0:
+        return []
+    start = html.rfind("<table", 0, start)
+    end = html.rfind("</table>")
+    if start >= 0 and end >= 0:
+        end += len("</table>")
+        html = html[start:end]
+
+    parser = TableParser(table_class)
+    parser.feed(html)
+    parser.close()
+    return parser.tables
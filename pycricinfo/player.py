@@ -1,10 +1,18 @@
-import warnings
 from functools import cached_property
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from gazpacho import Soup
 
 from pycricinfo.base import BaseCricinfoPage
+from pycricinfo.metrics import timed
+from pycricinfo.parsing import (
+    PlayerProfileParser,
+    Table,
+    TableSchema,
+    extract_tables,
+    parse_player_profile,
+)
+from pycricinfo.transport import Transport
 
 
 class Player(BaseCricinfoPage):
@@ -12,13 +20,19 @@ class Player(BaseCricinfoPage):
     Abstraction of a player
     """
 
+    _bulk_properties = ("name", "full_name", "player_stats")
+
+    _parse_trees = BaseCricinfoPage._parse_trees + ("player_info_soup",)
+
     def __init__(
         self,
         id: int,
         html_file: str = None,
+        transport: Optional[Transport] = None,
     ) -> None:
 
         self.id = id
+        self.transport = transport
         self.url = f"https://www.espncricinfo.com/ci/content/player/{id}.html"
 
         self.html_file = html_file
@@ -47,181 +61,148 @@ class Player(BaseCricinfoPage):
         return self.soup.find("p", attrs={"class": "ciPlayerinformationtxt"})
 
     @cached_property
-    def name(self) -> str:
+    def _profile(self) -> PlayerProfileParser:
+        """
+        The name and information fields of the profile, parsed in one pass
+        """
+        return parse_player_profile(self.html)
+
+    @cached_property
+    def player_info(self) -> Dict[str, str]:
+        """
+        All the labelled fields of the player information eg {"Full name": "Dean Mervyn Jones", ...}
+        """
+        return {label: " ".join(values) for label, values in self._profile.info.items()}
+
+    @cached_property
+    def name(self) -> Optional[str]:
         """
         The player's name
         """
-        info = self.soup.find("div", attrs={"class": "ciPlayernametxt"}, mode="first")
-        return info.find("h1", mode="first").text
+        return self._profile.name
 
     @cached_property
     def full_name(self) -> Optional[str]:
         """
         The player's long name
         """
-        for i in self.player_info_soup:
-            if i.find("b").text == "Full name":
-                return i.find("span", mode="first").text
-        return None
+        return self.player_info.get("Full name")
 
     @cached_property
     def batting_style(self) -> str:
         """
         The player's batting style eg Right-hand bat
         """
-
-        for i in self.player_info_soup:
-            if i.find("b").text == "Batting style":
-                return i.find("span", mode="first").text
-        return ""
+        return self.player_info.get("Batting style", "")
 
     @cached_property
     def bowling_style(self) -> str:
         """
         The player's bowling style(s) eg 'Right-arm offbreak'. Note, may return several, comma separated
         """
-
-        for i in self.player_info_soup:
-            if i.find("b").text == "Bowling style":
-                return i.find("span", mode="first").text
-        return ""
+        return self.player_info.get("Bowling style", "")
 
     @cached_property
-    def player_stats(self) -> dict:
+    def born(self) -> Optional[str]:
         """
-        The player's stats as a dict
+        The player's date and place of birth as a string
         """
+        return self.player_info.get("Born")
 
-        stats = {}
-
-        try:
-            etables = self.soup.find(
-                "table", attrs={"class": "engineTable"}, mode="all"
-            )
-
-            if len(etables) >= 2:
-
-                # this will hopefully be batting
-                batting_table = etables[0]
-                batting = {}
-                header_columns = []
-                for th in (
-                    batting_table.find("thead", mode="first")
-                    .find("tr", mode="first")
-                    .find("th", mode="all")
-                ):
-                    header_columns.append(th.attrs["title"])
-
-                for tr in batting_table.find("tbody", mode="first").find(
-                    "tr", mode="all"
-                ):
-
-                    grade_stats = {}
-
-                    stat_columns = tr.find("td", mode="all")
-
-                    grade = stat_columns[0].text
-
-                    for index, col in enumerate(stat_columns[1:]):
-
-                        stat = header_columns[index + 1]
-
-                        val = stat_columns[index + 1].text
-                        # hack to do type conversion
-
-                        stat, val = self._format_stat(stat, val)
-                        # hack to do type conversion
-
-                        grade_stats[stat] = val
-
-                    batting[grade] = grade_stats
-
-                stats["batting"] = batting
-
-                bowling_table = etables[1]
-
-                bowling = {}
-
-                header_columns = []
-                for th in (
-                    bowling_table.find("thead", mode="first")
-                    .find("tr", mode="first")
-                    .find("th", mode="all")
-                ):
-                    header_columns.append(th.attrs["title"])
-
-                for tr in bowling_table.find("tbody", mode="first").find(
-                    "tr", mode="all"
-                ):
-
-                    grade_stats = {}
-
-                    stat_columns = tr.find("td", mode="all")
-
-                    grade = stat_columns[0].text
+    @cached_property
+    def playing_role(self) -> Optional[str]:
+        """
+        The player's role eg 'Batsman'
+        """
+        return self.player_info.get("Playing role")
 
-                    for index, col in enumerate(stat_columns[1:]):
-                        stat = header_columns[index + 1]
+    @cached_property
+    def teams(self) -> List[str]:
+        """
+        The major teams the player has played for
+        """
+        return [
+            team.rstrip(",").strip()
+            for team in self._profile.info.get("Major teams", [])
+            if team.rstrip(",").strip()
+        ]
 
-                        val = stat_columns[index + 1].text
-                        # hack to do type conversion
+    @cached_property
+    @timed("parse", "player_stats")
+    def player_stats(self) -> dict:
+        """
+        The player's stats as a dict
+        """
 
-                        stat, val = self._format_stat(stat, val)
-                        grade_stats[stat] = val
+        stats: Dict[str, Any] = {}
 
-                    bowling[grade] = grade_stats
+        tables = extract_tables(self.html, "engineTable")
 
-                stats["bowling"] = bowling
-        except Exception as e:
-            raise e
-            warnings.warn("Player stats could not be parsed", RuntimeWarning)
+        if len(tables) >= 2:
+            # these will hopefully be batting and bowling, any others are named by their columns
+            for index, table in enumerate(tables):
+                kind = (
+                    ("batting", "bowling")[index] if index < 2 else _table_kind(table)
+                )
+                if kind in stats:
+                    kind = f"{kind} {index}"
+                stats[kind] = PLAYER_STATS_SCHEMA.records(table)
 
         return stats
 
     def _format_stat(self, stat: str, val: str):
         """
-        Helper method to map stats to names and types. Needs improvement
-        """
-        to_int_stats = {
-            "wickets taken": "wickets",
-            "five wkts in an inns": "five wickets",
-            "balls bowled": "balls",
-            "ten wkts in a match": "ten wickets",
-            "runs conceded": "runs",
-            "four wkts in an inns": "four wickets",
-            "matches played": "matches",
-            "innings batted": "innings",
-            "not outs": "not outs",
-            "runs scored": "runs",
-            "balls faced": "balls",
-            "hundreds scored": "100s",
-            "fifties scored": "50s",
-            "boundary fours": "fours",
-            "boundary sixes": "sixes",
-            "catches taken": "catches",
-            "stumpings made": "stumpings",
-            "innings bowled in": "innings bowled",
-        }
-        to_float_stats = {
-            "batting average": "average",
-            "batting strike rate": "sr",
-            "bowling average": "average",
-            "bowling strike rate": "sr",
-            "economy rate": "er",
-        }
-        to_str_stats = {
-            "highest inns score": "hs",
-            "best innings bowling": "best bowling innings",
-            "best match bowling": "best bowling match",
-        }
-
-        if stat in to_int_stats.keys():
-            stat = to_int_stats[stat]
-            return stat, BaseCricinfoPage.safe_float(val)
-
-        elif stat in to_float_stats.keys():
-            stat = to_float_stats[stat]
-            return stat, BaseCricinfoPage.safe_float(val)
-        else:
-            stat = to_str_stats.get(stat, stat)
-            return stat, val
+        Helper method to map stats to names and types
+        """
+        return PLAYER_STATS_SCHEMA.convert(stat, val)
+
+
+def _table_kind(table: Table) -> str:
+    """
+    Guess what kind of stats a table holds from its columns
+    """
+    if "wickets taken" in table.headers:
+        return "bowling"
+    if "runs scored" in table.headers:
+        return "batting"
+    if "catches taken" in table.headers:
+        return "fielding"
+    return "stats"
+
+
+# the column titles of the stats tables mapped to the names used for them and their types
+PLAYER_STATS_SCHEMA = TableSchema(
+    {
+        **{
+            title: (name, BaseCricinfoPage.safe_float)
+            for title, name in {
+                "wickets taken": "wickets",
+                "five wkts in an inns": "five wickets",
+                "balls bowled": "balls",
+                "ten wkts in a match": "ten wickets",
+                "runs conceded": "runs",
+                "four wkts in an inns": "four wickets",
+                "matches played": "matches",
+                "innings batted": "innings",
+                "not outs": "not outs",
+                "runs scored": "runs",
+                "balls faced": "balls",
+                "hundreds scored": "100s",
+                "fifties scored": "50s",
+                "boundary fours": "fours",
+                "boundary sixes": "sixes",
+                "catches taken": "catches",
+                "stumpings made": "stumpings",
+                "innings bowled in": "innings bowled",
+                "batting average": "average",
+                "batting strike rate": "sr",
+                "bowling average": "average",
+                "bowling strike rate": "sr",
+                "economy rate": "er",
+            }.items()
+        },
+        "highest inns score": ("hs", str),
+        "best innings bowling": ("best bowling innings", str),
+        "best match bowling": ("best bowling match", str),
+    }
+)
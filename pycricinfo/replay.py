@@ -0,0 +1,300 @@
+import http.server
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+from pycricinfo.archive import Archive, ArchiveWriter
+from pycricinfo.exceptions import PyCricinfoException
+from pycricinfo.scheduler import TokenBucket
+from pycricinfo.transport import PooledTransport, Response, Transport, get_transport
+
+# headers describing the body as it was sent, which no longer apply once decoded
+HOP_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection")
+
+
+def _key(number: int, url: str) -> str:
+    """
+    The key of the number'th response recorded for a url
+    """
+    return f"{number} {url}"
+
+
+class RecordingTransport(Transport):
+    """
+    Transport that passes requests on to another transport and records every response
+    in a cassette, an archive of responses keyed by url. A url requested several times
+    is recorded each time so a replay gets the responses in the same order
+
+    with RecordingTransport("ipl.cassette") as transport:
+        Series(8048, transport=transport).all_matches
+    """
+
+    def __init__(
+        self, path: str, transport: Optional[Transport] = None, **kwargs
+    ) -> None:
+
+        self.path = path
+        self.transport = transport
+
+        self._writer = ArchiveWriter(path, **kwargs)
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def request(self, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        response = (self.transport or get_transport()).request(url, headers=headers)
+
+        with self._lock:
+            self._writer.add(_key(self._counts[url], url), response.to_bytes())
+            self._counts[url] += 1
+
+        return response
+
+    def close(self) -> None:
+        """
+        Finish writing the cassette. The transport passed on to is left open
+        """
+        with self._lock:
+            self._writer.close()
+
+
+class Cassette:
+    """
+    The responses recorded in a cassette, served in the order they were recorded. Once
+    they run out the last one is served again
+    """
+
+    def __init__(self, path: str) -> None:
+
+        self.path = path
+        self.archive = Archive(path)
+
+        self._keys: Dict[str, List[str]] = defaultdict(list)
+        for key in sorted(self.archive.keys(), key=lambda key: int(key.split(" ")[0])):
+            self._keys[key.split(" ", 1)[1]].append(key)
+
+        self._served: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @property
+    def urls(self) -> List[str]:
+        """
+        The urls in the cassette
+        """
+        return list(self._keys)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._keys
+
+    def next(self, url: str) -> Optional[Response]:
+        """
+        The next response for a url, or None if it wasn't recorded
+        """
+        keys = self._keys.get(url)
+        if not keys:
+            return None
+
+        with self._lock:
+            index = min(self._served[url], len(keys) - 1)
+            self._served[url] += 1
+
+        return Response.from_bytes(self.archive.get(keys[index]))
+
+    def rewind(self) -> None:
+        """
+        Start serving each url's responses from the first again
+        """
+        with self._lock:
+            self._served.clear()
+
+    def close(self) -> None:
+        self.archive.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Transport serving the responses recorded in a cassette without touching the
+    network. Requesting a url that wasn't recorded raises a PyCricinfoException
+    """
+
+    def __init__(self, cassette: Union[str, Cassette]) -> None:
+
+        self.cassette = Cassette(cassette) if isinstance(cassette, str) else cassette
+
+    def request(self, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        response = self.cassette.next(url)
+        if response is None:
+            raise PyCricinfoException(
+                url, f"{url} is not in the cassette {self.cassette.path}"
+            )
+        return response
+
+    def close(self) -> None:
+        self.cassette.close()
+
+
+class _StandInHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        response = self.server.stand_in.respond(self.headers.get("Host", ""), self.path)
+        body = response.body
+
+        self.send_response(response.status, response.reason or None)
+        for name, value in response.headers.items():
+            if name not in HOP_HEADERS:
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer:
+    """
+    Local http server standing in for cricinfo, serving the responses in a cassette.
+    Requests are matched on their Host header and path, so point a StandInTransport
+    at it. Latency (seconds, or a function returning them) is added to every response,
+    a fraction of requests given by error_rate fail with error_status and requests
+    beyond rate_limit per second get a 429. Subclasses can serve something other than
+    a cassette by overriding lookup()
+
+    with StandInServer("ipl.cassette", latency=0.05, error_rate=0.01) as server:
+        Match(1216509, transport=StandInTransport(server.url)).match_stats
+    """
+
+    def __init__(
+        self,
+        cassette: Optional[Union[str, Cassette]] = None,
+        latency: Union[float, Callable[[], float]] = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        rate_limit: Optional[float] = None,
+        seed: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+
+        self.cassette = Cassette(cassette) if isinstance(cassette, str) else cassette
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+
+        self.requests = 0
+        self.limited = 0
+
+        self._bucket = TokenBucket(rate_limit, rate_limit) if rate_limit else None
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer((host, port), _StandInHandler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self  # type: ignore
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        The base url of the server eg http://127.0.0.1:8123
+        """
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode("ascii")
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        """
+        Serve requests on a background thread
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the socket
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def respond(self, host: str, path: str) -> Response:
+        """
+        The response to a request for a path on a host, after the injected latency
+        """
+        with self._lock:
+            self.requests += 1
+            latency = self.latency() if callable(self.latency) else self.latency
+            error = self._random.random() < self.error_rate
+
+        if self._bucket is not None and not self._bucket.try_acquire():
+            with self._lock:
+                self.limited += 1
+            return Response(path, 429, {"Retry-After": "1"}, reason="Rate limited")
+
+        if latency > 0:
+            time.sleep(latency)
+
+        if error:
+            return Response(path, self.error_status, reason="Injected error")
+
+        return self.lookup(host, path)
+
+    def lookup(self, host: str, path: str) -> Response:
+        """
+        The content for a path on a host, from the cassette
+        """
+        if self.cassette is not None:
+            for scheme in ("https", "http"):
+                response = self.cassette.next(f"{scheme}://{host}{path}")
+                if response is not None:
+                    return response
+
+        return Response(path, 404, reason="Not in cassette")
+
+
+class StandInTransport(Transport):
+    """
+    Transport sending every request to a StandInServer instead of the host in the url.
+    The original host goes in the Host header, which http.client leaves alone when it
+    is given one
+    """
+
+    def __init__(self, server_url: str, transport: Optional[Transport] = None) -> None:
+
+        self.server_url = server_url.rstrip("/")
+        self.transport = transport or PooledTransport()
+        self._owns_transport = transport is None
+
+    def request(self, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+
+        response = self.transport.request(
+            f"{self.server_url}{path}",
+            headers={**(headers or {}), "Host": parts.netloc},
+        )
+        response.url = url
+        return response
+
+    def close(self) -> None:
+        """
+        Close the connections to the server, unless the transport was passed in
+        """
+        if self._owns_transport:
+            self.transport.close()
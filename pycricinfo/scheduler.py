@@ -0,0 +1,263 @@
+import http.client
+import random
+import socket
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from pycricinfo import metrics
+from pycricinfo.transport import Response, Transport, get_transport
+
+# statuses worth retrying
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# statuses that mean the server wants fewer requests, so the rate is cut
+THROTTLE_STATUSES = (429, 503)
+
+# errors worth retrying: timeouts and dropped connections. Other errors, eg a failed
+# dns lookup or a bad certificate, won't go away by trying again
+RETRY_ERRORS = (
+    TimeoutError,
+    socket.timeout,
+    ConnectionError,
+    http.client.RemoteDisconnected,
+    http.client.IncompleteRead,
+)
+
+
+class TokenBucket:
+    """
+    Allows requests at rate per second on average with bursts of up to burst requests
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token, returning how many seconds to wait before using it. Tokens are
+        reserved in the order they are asked for, so waiting callers are served fairly
+        """
+        with self._lock:
+            if self.rate == float("inf"):
+                return 0.0
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def try_acquire(self) -> bool:
+        """
+        Take a token if one is available now, without waiting
+        """
+        with self._lock:
+            if self.rate == float("inf"):
+                return True
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self) -> None:
+        """
+        Block until a token is available
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def set_rate(self, rate: float) -> None:
+        """
+        Change the rate, keeping the tokens already earned
+        """
+        with self._lock:
+            self.rate = rate
+
+
+class RequestScheduler:
+    """
+    Paces requests to each host with a token bucket and retries failures with jittered
+    exponential backoff. The rate for a host adapts to its responses: it grows by
+    about increase requests per second each second things go well and is multiplied by
+    decrease whenever the server pushes back (AIMD)
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: float = 10.0,
+        min_rate: float = 0.5,
+        max_rate: float = 100.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        retries: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 60.0,
+        retry_statuses: Tuple[int, ...] = RETRY_STATUSES,
+    ) -> None:
+
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = retry_statuses
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        """
+        The token bucket for the host of a url
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def request(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        transport: Optional[Transport] = None,
+    ) -> Response:
+        """
+        Make a request through a transport once the host's bucket allows it, retrying
+        errors and retryable statuses. The last response is returned if every attempt
+        fails with a retryable status, and the last error raised if they fail with one
+        """
+        transport = transport or get_transport()
+        bucket = self.bucket(url)
+
+        for attempt in range(self.retries + 1):
+            bucket.acquire()
+            response: Optional[Response] = None
+            error: Optional[Exception] = None
+            start = time.perf_counter()
+            try:
+                response = transport.request(url, headers=headers)
+            except RETRY_ERRORS as e:
+                if metrics.enabled():
+                    self._record("request", url, start, error=e)
+                self._slow_down(bucket)
+                if attempt >= self.retries:
+                    raise
+                error = e
+            else:
+                if metrics.enabled():
+                    self._record("request", url, start, response)
+                if response.status not in self.retry_statuses:
+                    self._speed_up(bucket)
+                    return response
+                if response.status in THROTTLE_STATUSES:
+                    self._slow_down(bucket)
+                if attempt >= self.retries:
+                    return response
+
+            if metrics.enabled():
+                self._record("retry", url, start, response, error)
+            time.sleep(self.delay(attempt, response))
+
+        raise AssertionError("unreachable")
+
+    def delay(self, attempt: int, response: Optional[Response] = None) -> float:
+        """
+        The seconds to wait before retrying: a random time up to an exponentially
+        growing limit, or longer if the server asked for it with Retry-After
+        """
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+        retry_after = (response.headers.get("retry-after") if response else None) or ""
+        if retry_after.strip().isdigit():
+            delay = max(delay, min(float(retry_after), self.max_backoff))
+
+        return delay
+
+    @staticmethod
+    def _record(
+        kind: str,
+        url: str,
+        start: float,
+        response: Optional[Response] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        """
+        Emit a request or retry event
+        """
+        metrics.emit(
+            metrics.Event(
+                kind,
+                urlsplit(url).netloc,
+                duration=time.perf_counter() - start,
+                size=len(response.body) if response is not None else 0,
+                status=response.status if response is not None else None,
+                error=type(error).__name__ if error is not None else None,
+            )
+        )
+
+    def _speed_up(self, bucket: TokenBucket) -> None:
+        """
+        Additive increase, spread over the requests made in a second
+        """
+        bucket.set_rate(min(self.max_rate, bucket.rate + self.increase / bucket.rate))
+
+    def _slow_down(self, bucket: TokenBucket) -> None:
+        """
+        Multiplicative decrease
+        """
+        bucket.set_rate(max(self.min_rate, bucket.rate * self.decrease))
+
+
+_default_scheduler: Optional[RequestScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """
+    The scheduler shared by all requests, created on first use
+    """
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
+
+
+def set_scheduler(scheduler: Optional[RequestScheduler]) -> None:
+    """
+    Replace the shared scheduler. Passing None restores a fresh default one on next use
+    """
+    global _default_scheduler
+    with _default_lock:
+        _default_scheduler = scheduler
+
+
+def request(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    transport: Optional[Transport] = None,
+) -> Response:
+    """
+    Make a request through a transport, paced and retried by the shared scheduler
+    """
+    return get_scheduler().request(url, headers=headers, transport=transport)
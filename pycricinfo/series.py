@@ -1,10 +1,17 @@
+import asyncio
 import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from functools import cached_property
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
 from gazpacho import Soup
+from gazpacho.utils import HTTPError
 
-from pycricinfo.base import BaseCricinfoPage, get
+from pycricinfo.aio import AsyncClient
+from pycricinfo.base import BaseCricinfoPage
+from pycricinfo.cache import cached_get
+from pycricinfo.exceptions import PageNotFoundException, PyCricinfoException
+from pycricinfo.transport import Transport
 
 
 class Series(BaseCricinfoPage):
@@ -12,14 +19,19 @@ class Series(BaseCricinfoPage):
     Abstraction of a series
     """
 
+    # the number of feed pages fetched at once when enumerating seasons and matches
+    workers: int = 8
+
     def __init__(
         self,
         id: int,
         html_file: Optional[str] = None,
         json_file: Optional[str] = None,
+        transport: Optional[Transport] = None,
     ) -> None:
 
         self.id = id
+        self.transport = transport
 
         self.url = f"https://www.espncricinfo.com/series/_/id/{self.id}/"
 
@@ -59,17 +71,27 @@ class Series(BaseCricinfoPage):
         with open(json_file, "w") as f:
             f.write(json.dumps(self.json, indent=4))
 
+    _payloads = {"json": "_fetch_json"}
+
+    _fetched_properties = ("seasons", "all_matches")
+
     @cached_property
     def json(self) -> dict:
         """
         The JSON feed for this series
         """
+        return self._fetch_json()
+
+    def _fetch_json(self) -> dict:
+        """
+        Read the json from file or fetch it from the feed
+        """
 
         if self.json_file:
             with open(self.json_file, "r") as f:
                 return json.loads(f.read())
         else:
-            return get(self.json_url)
+            return self._get_feed(self.json_url)
 
     # need to think about whether these belong here or somewhere else
     @cached_property
@@ -77,25 +99,13 @@ class Series(BaseCricinfoPage):
         """
         Get all the seasons for this series
         """
-        r = get(f"{self.json_url}seasons/")
-
-        seasons = []
-        for season in r.get("items"):
-            seasons.append(int(season.get("$ref", "").split("/")[-1]))
-
-        return seasons
+        return self._get_items(f"{self.json_url}seasons/")
 
     def get_season_matches(self, season: int) -> List[int]:
         """
         Get all match ids that formed part of a specific season for this series
         """
-        r = get(f"{self.json_url}seasons/{season}/events/")
-        matches = []
-
-        for m in r.get("items", []):
-            matches.append(int(m.get("$ref", "").split("/")[-1]))
-
-        return matches
+        return self._get_items(self._events_url(season))
 
     @cached_property
     def all_matches(self) -> List[int]:
@@ -103,12 +113,175 @@ class Series(BaseCricinfoPage):
         Iterate through all seasons of this series and return a list of all match ids
         """
 
+        # pages arrive in any order so put them back in season and page order
+        season_order = {season: index for index, season in enumerate(self.seasons)}
+        pages = sorted(
+            self._iter_event_pages(),
+            key=lambda page: (season_order[page[0]], page[1]),
+        )
+
         matches = []
-        for season in self.seasons:
-            for match in self.get_season_matches(season):
-                matches.append(match)
+        for _, _, ids in pages:
+            matches.extend(ids)
         return matches
 
+    def iter_matches(self, workers: Optional[int] = None) -> Iterator[int]:
+        """
+        Yield the match ids of all seasons of this series as each page of events arrives
+        """
+        for _, _, ids in self._iter_event_pages(workers):
+            yield from ids
+
+    def _iter_event_pages(
+        self, workers: Optional[int] = None
+    ) -> Iterator[Tuple[int, int, List[int]]]:
+        """
+        Fetch every page of events for every season concurrently, yielding
+        (season, page, match ids) as each one arrives
+        """
+        executor = ThreadPoolExecutor(max_workers=workers or self.workers)
+        pending = {
+            executor.submit(self._get_feed, self._events_url(season)): (season, 1)
+            for season in self.seasons
+        }
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    season, page = pending.pop(future)
+                    r = future.result()
+                    if page == 1:
+                        # now we know how many pages there are, ask for the rest
+                        for next_page in range(2, r.get("pageCount", 1) + 1):
+                            url = self._page_url(self._events_url(season), next_page)
+                            pending[executor.submit(self._get_feed, url)] = (
+                                season,
+                                next_page,
+                            )
+                    yield season, page, self._ref_ids(r)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    async def aseasons(self, client: Optional[AsyncClient] = None) -> List[int]:
+        """
+        Get all the seasons for this series asynchronously
+        """
+        if "seasons" not in self.__dict__:
+            self.__dict__["seasons"] = await self._aget_items(
+                f"{self.json_url}seasons/", client
+            )
+
+        return self.seasons
+
+    async def aget_season_matches(
+        self, season: int, client: Optional[AsyncClient] = None
+    ) -> List[int]:
+        """
+        Get all match ids for a specific season of this series asynchronously
+        """
+        return await self._aget_items(self._events_url(season), client)
+
+    async def aall_matches(self, client: Optional[AsyncClient] = None) -> List[int]:
+        """
+        Get all match ids of this series, fetching the seasons concurrently
+        """
+        if "all_matches" not in self.__dict__:
+            seasons = await self.aseasons(client)
+            season_matches = await asyncio.gather(
+                *[self.aget_season_matches(season, client) for season in seasons]
+            )
+            self.__dict__["all_matches"] = [
+                match for matches in season_matches for match in matches
+            ]
+
+        return self.all_matches
+
+    def _get_items(self, url: str) -> List[int]:
+        """
+        Get the ids from every page of a paged core api response, fetching pages after
+        the first concurrently
+        """
+        r = self._get_feed(url)
+        ids = self._ref_ids(r)
+
+        urls = [
+            self._page_url(url, page) for page in range(2, r.get("pageCount", 1) + 1)
+        ]
+        if urls:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for page in executor.map(self._get_feed, urls):
+                    ids.extend(self._ref_ids(page))
+
+        return ids
+
+    async def _aget_items(
+        self, url: str, client: Optional[AsyncClient] = None
+    ) -> List[int]:
+        """
+        Get the ids from every page of a paged core api response asynchronously
+        """
+        client = self._client(client)
+
+        r = await client.run(self._get_feed, url)
+        ids = self._ref_ids(r)
+
+        pages = await asyncio.gather(
+            *[
+                client.run(self._get_feed, self._page_url(url, page))
+                for page in range(2, r.get("pageCount", 1) + 1)
+            ]
+        )
+        for page in pages:
+            ids.extend(self._ref_ids(page))
+
+        return ids
+
+    def _get_feed(self, url: str) -> dict:
+        """
+        Get a json feed from the core api
+        """
+        try:
+            return cached_get(
+                url, kind="feed", transport=self.transport, cache=self.cache
+            )
+        except HTTPError as e:
+            if e.code == 404:
+                raise PageNotFoundException(
+                    e.code,
+                    (
+                        f"Series {self.id} not found. Check that the id is correct."
+                        if url == self.json_url
+                        else f"Feed {url} not found"
+                    ),
+                )
+            raise PyCricinfoException(e.code, e.msg)
+
+    def _events_url(self, season: int) -> str:
+        """
+        The url of the feed listing the events (matches) of a season
+        """
+        return f"{self.json_url}seasons/{season}/events/"
+
+    @staticmethod
+    def _page_url(url: str, page: int) -> str:
+        """
+        The url for a page of a paged core api response
+        """
+        return f"{url}?page={page}"
+
+    @staticmethod
+    def _ref_ids(r: dict) -> List[int]:
+        """
+        Get the ids from the $ref links of the items in a core api response
+        """
+        ids = []
+        for item in r.get("items", []):
+            ids.append(int(item.get("$ref", "").split("/")[-1]))
+
+        return ids
+
     @cached_property
     def is_tournament(self) -> bool:
         """
@@ -0,0 +1,506 @@
+import json
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from pycricinfo.export import TABLE_FIELDS, iter_matches, match_keys, scorecard_rows
+from pycricinfo.match import Match
+from pycricinfo.player import Player
+
+SQL_TYPES = {
+    "int": "INTEGER",
+    "float": "REAL",
+    "str": "TEXT",
+    "bool": "INTEGER",
+    "date": "TEXT",
+}
+
+# the keys of the rows of each scorecard table
+SCORECARD_KEYS = {
+    "innings": [
+        ("match_id", "int"),
+        ("innings", "int"),
+        ("batting_team_id", "int"),
+        ("bowling_team_id", "int"),
+    ],
+    "batting": [("match_id", "int"), ("innings", "int"), ("position", "int")],
+    "bowling": [("match_id", "int"), ("innings", "int"), ("position", "int")],
+}
+
+# the columns of match_details that matches() and the player queries filter on
+FILTER_COLUMNS = ("ground", "season", "series", "format")
+
+PLAYER_FIELDS = (
+    "name",
+    "full_name",
+    "born",
+    "batting_style",
+    "bowling_style",
+    "playing_role",
+)
+
+
+def scorecard_columns(table: str) -> List[Tuple[str, str]]:
+    """
+    The names and types of the columns of a stored scorecard table. Players are
+    referred to by player_id, their names are kept in the players table
+    """
+    return SCORECARD_KEYS[table] + [
+        ("player_id" if name == "id" else name, kind)
+        for name, kind in TABLE_FIELDS[table]
+        if name != "name"
+    ]
+
+
+def _schema() -> str:
+    tables = []
+    for table in TABLE_FIELDS:
+        columns = ",\n    ".join(
+            f"{name} {SQL_TYPES[kind]}" for name, kind in scorecard_columns(table)
+        )
+        key = "match_id, innings" + (", position" if table != "innings" else "")
+        tables.append(
+            f"CREATE TABLE IF NOT EXISTS {table} (\n    {columns},\n"
+            f"    PRIMARY KEY ({key})\n);"
+        )
+
+    return "\n".join(
+        [
+            *(
+                f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, name TEXT);"
+                for table in ("series", "formats", "grounds", "teams")
+            ),
+            """
+-- seasons are keyed on their name as the start year alone is shared by eg 2020
+-- and 2020/21
+CREATE TABLE IF NOT EXISTS seasons (name TEXT PRIMARY KEY, year INTEGER);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    date TEXT,
+    series_id INTEGER,
+    season TEXT,
+    format_id INTEGER,
+    ground_id INTEGER,
+    status TEXT,
+    result TEXT
+);
+CREATE TABLE IF NOT EXISTS match_teams (
+    match_id INTEGER,
+    team_id INTEGER,
+    PRIMARY KEY (match_id, team_id)
+);
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    full_name TEXT,
+    born TEXT,
+    batting_style TEXT,
+    bowling_style TEXT,
+    playing_role TEXT,
+    teams TEXT
+);
+CREATE TABLE IF NOT EXISTS match_players (
+    match_id INTEGER,
+    player_id INTEGER,
+    team_id INTEGER,
+    PRIMARY KEY (match_id, player_id)
+);
+CREATE TABLE IF NOT EXISTS player_stats (
+    player_id INTEGER,
+    kind TEXT,
+    grade TEXT,
+    stat TEXT,
+    value,
+    PRIMARY KEY (player_id, kind, grade, stat)
+);
+""",
+            *tables,
+            """
+CREATE INDEX IF NOT EXISTS matches_ground ON matches (ground_id, date);
+CREATE INDEX IF NOT EXISTS matches_season ON matches (season, date);
+CREATE INDEX IF NOT EXISTS matches_series ON matches (series_id, date);
+CREATE INDEX IF NOT EXISTS matches_format ON matches (format_id, date);
+CREATE INDEX IF NOT EXISTS match_teams_team ON match_teams (team_id);
+CREATE INDEX IF NOT EXISTS match_players_player ON match_players (player_id);
+CREATE INDEX IF NOT EXISTS batting_player ON batting (player_id);
+CREATE INDEX IF NOT EXISTS bowling_player ON bowling (player_id);
+
+CREATE VIEW IF NOT EXISTS match_details AS
+SELECT
+    m.id AS match_id,
+    m.date,
+    m.series_id,
+    s.name AS series,
+    se.year AS season_id,
+    m.season,
+    m.format_id,
+    f.name AS format,
+    m.ground_id,
+    g.name AS ground,
+    m.status,
+    m.result
+FROM matches m
+LEFT JOIN series s ON s.id = m.series_id
+LEFT JOIN seasons se ON se.name = m.season
+LEFT JOIN formats f ON f.id = m.format_id
+LEFT JOIN grounds g ON g.id = m.ground_id;
+""",
+        ]
+    )
+
+
+SCHEMA = _schema()
+
+
+class Store:
+    """
+    Parsed matches and players in a normalized SQLite database. Adding a match or
+    player again replaces what was stored for it, so a store can be brought up to date
+    incrementally. The query helpers answer from the store without touching the network
+
+    with Store("ipl.db") as store:
+        store.add_matches(Series(8048).all_matches, update=False)
+        store.player_innings(28235, format="Twenty20")
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+
+        self.path = path
+
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def add(self, page: Union[Match, Player]) -> None:
+        """
+        Store a match or player
+        """
+        if isinstance(page, Match):
+            self.add_match(page)
+        elif isinstance(page, Player):
+            self.add_player(page)
+        else:
+            raise TypeError(f"Can't store a {type(page).__name__}")
+
+    def add_match(self, match: Match) -> None:
+        """
+        Store the metadata, teams and scorecard of a match, replacing any stored before
+        """
+        keys = match_keys(match)
+
+        with self.db:
+            for table, name in (
+                ("series", "series"),
+                ("formats", "format"),
+                ("grounds", "ground"),
+            ):
+                if keys[f"{name}_id"] is not None:
+                    self._upsert(table, {"id": keys[f"{name}_id"], "name": keys[name]})
+            if keys["season"] is not None:
+                self._upsert(
+                    "seasons",
+                    {"name": keys["season"], "year": keys["season_id"]},
+                    key="name",
+                )
+
+            self._upsert(
+                "matches",
+                {
+                    "id": match.id,
+                    "date": _date(keys["date"]),
+                    "series_id": keys["series_id"],
+                    "season": keys["season"],
+                    "format_id": keys["format_id"],
+                    "ground_id": keys["ground_id"],
+                    "status": match.status,
+                    "result": match.result,
+                },
+            )
+
+            for table in ("match_teams", "match_players", *TABLE_FIELDS):
+                self.db.execute(f"DELETE FROM {table} WHERE match_id = ?", (match.id,))
+
+            for team in match.teams:
+                if not team.get("id"):
+                    continue
+                self._upsert("teams", {"id": team["id"], "name": team["name"]})
+                self._insert(
+                    "match_teams", {"match_id": match.id, "team_id": team["id"]}
+                )
+                for player in team["players"]:
+                    # profiles added with add_player have the last word on names
+                    self._upsert(
+                        "players",
+                        {"id": player["id"], "name": player["name"]},
+                        update=False,
+                    )
+                    self._insert(
+                        "match_players",
+                        {
+                            "match_id": match.id,
+                            "player_id": player["id"],
+                            "team_id": team["id"],
+                        },
+                    )
+
+            positions: Dict[Tuple[str, int], int] = {}
+            for table, row in scorecard_rows(match):
+                position = positions.get((table, row["innings"]), 0) + 1
+                positions[table, row["innings"]] = position
+                row = {**row, "position": position, "player_id": row.get("id")}
+                self._insert(
+                    table, {name: row.get(name) for name, _ in scorecard_columns(table)}
+                )
+
+    def add_matches(
+        self, matches: Iterable[Union[int, Match]], update: bool = True
+    ) -> int:
+        """
+        Store many matches, one at a time. With update False, match ids that are
+        already stored are skipped without being fetched. Returns the number stored
+        """
+        if not update:
+            matches = (
+                m
+                for m in matches
+                if not self.has_match(m.id if isinstance(m, Match) else m)
+            )
+
+        count = 0
+        for match in iter_matches(matches):
+            self.add_match(match)
+            count += 1
+        return count
+
+    def add_player(self, player: Player) -> None:
+        """
+        Store the profile and career stats of a player, replacing any stored before
+        """
+        with self.db:
+            self._upsert(
+                "players",
+                {
+                    "id": player.id,
+                    **{name: getattr(player, name) for name in PLAYER_FIELDS},
+                    "teams": json.dumps(player.teams),
+                },
+            )
+
+            self.db.execute(
+                "DELETE FROM player_stats WHERE player_id = ?", (player.id,)
+            )
+            self.db.executemany(
+                "INSERT INTO player_stats (player_id, kind, grade, stat, value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (player.id, kind, grade, stat, value)
+                    for kind, grades in player.player_stats.items()
+                    for grade, stats in grades.items()
+                    for stat, value in stats.items()
+                ],
+            )
+
+    def add_players(
+        self, players: Iterable[Union[int, Player]], update: bool = True
+    ) -> int:
+        """
+        Store many players, one at a time. With update False, players whose profile
+        is already stored are skipped without being fetched. Returns the number stored
+        """
+        count = 0
+        for player in players:
+            id = player.id if isinstance(player, Player) else player
+            if not update and self.has_player(id):
+                continue
+            self.add_player(player if isinstance(player, Player) else Player(player))
+            count += 1
+        return count
+
+    def has_match(self, id: int) -> bool:
+        return self._one("SELECT 1 FROM matches WHERE id = ?", id) is not None
+
+    def has_player(self, id: int) -> bool:
+        """
+        Whether the profile of a player is stored (not just their name from a match)
+        """
+        row = self._one("SELECT teams FROM players WHERE id = ?", id)
+        return row is not None and row["teams"] is not None
+
+    def match(self, id: int) -> Optional[dict]:
+        """
+        The stored metadata of a match with its teams, or None
+        """
+        row = self._one("SELECT * FROM match_details WHERE match_id = ?", id)
+        if row is None:
+            return None
+
+        teams = self.db.execute(
+            "SELECT t.id, t.name FROM match_teams mt JOIN teams t ON t.id = mt.team_id "
+            "WHERE mt.match_id = ? ORDER BY mt.rowid",
+            (id,),
+        )
+        return {**dict(row), "teams": [dict(team) for team in teams]}
+
+    def matches(
+        self,
+        ground: Union[int, str, None] = None,
+        season: Union[int, str, None] = None,
+        series: Union[int, str, None] = None,
+        format: Union[int, str, None] = None,
+        team: Optional[int] = None,
+        start: Union[datetime, str, None] = None,
+        end: Union[datetime, str, None] = None,
+    ) -> List[dict]:
+        """
+        The stored matches in date order, filtered by ground, season, series and format
+        (each an id or a name), a team id or a range of dates. A season given as an
+        id is its start year and matches both 2020 and 2020/21
+        """
+        where, params = _filters(
+            ground=ground,
+            season=season,
+            series=series,
+            format=format,
+            start=start,
+            end=end,
+        )
+        if team is not None:
+            where += " AND d.match_id IN (SELECT match_id FROM match_teams WHERE team_id = ?)"
+            params.append(team)
+
+        return self._all(
+            f"SELECT d.* FROM match_details d WHERE {where} ORDER BY d.date, d.match_id",
+            *params,
+        )
+
+    def player_innings(self, player_id: int, **filters) -> List[dict]:
+        """
+        A player's batting innings in date order, with the details of each match.
+        Filtered like matches() eg player_innings(28235, format="Twenty20")
+        """
+        return self._player_rows("batting", player_id, **filters)
+
+    def player_bowling(self, player_id: int, **filters) -> List[dict]:
+        """
+        A player's bowling innings in date order, with the details of each match
+        """
+        return self._player_rows("bowling", player_id, **filters)
+
+    def player(self, id: int) -> Optional[dict]:
+        """
+        The stored profile of a player including their player_stats, or None
+        """
+        row = self._one("SELECT * FROM players WHERE id = ?", id)
+        if row is None:
+            return None
+
+        player = dict(row)
+        player["teams"] = json.loads(player["teams"]) if player["teams"] else []
+        player["player_stats"] = self.player_stats(id)
+        return player
+
+    def player_stats(self, id: int) -> dict:
+        """
+        The stored career stats of a player, in the same shape as Player.player_stats
+        """
+        stats: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for row in self.db.execute(
+            "SELECT kind, grade, stat, value FROM player_stats WHERE player_id = ? "
+            "ORDER BY rowid",
+            (id,),
+        ):
+            stats.setdefault(row["kind"], {}).setdefault(row["grade"], {})[
+                row["stat"]
+            ] = row["value"]
+        return stats
+
+    def _player_rows(self, table: str, player_id: int, **filters) -> List[dict]:
+        where, params = _filters(**filters)
+        columns = ", ".join(
+            f"r.{name}" for name, _ in scorecard_columns(table) if name != "match_id"
+        )
+        rows = self._all(
+            f"SELECT d.*, {columns}, p.name FROM {table} r "
+            "JOIN match_details d ON d.match_id = r.match_id "
+            "LEFT JOIN players p ON p.id = r.player_id "
+            f"WHERE r.player_id = ? AND {where} ORDER BY d.date, d.match_id, r.innings",
+            player_id,
+            *params,
+        )
+        for row in rows:
+            row["captain"] = (
+                bool(row["captain"]) if row["captain"] is not None else None
+            )
+        return rows
+
+    def _upsert(
+        self, table: str, row: Dict[str, Any], update: bool = True, key: str = "id"
+    ) -> None:
+        """
+        Insert a row, or update the row with the same key
+        """
+        columns = list(row)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != key)
+        self.db.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))}) ON CONFLICT ({key}) DO "
+            + (f"UPDATE SET {updates}" if update and updates else "NOTHING"),
+            list(row.values()),
+        )
+
+    def _insert(self, table: str, row: Dict[str, Any]) -> None:
+        self.db.execute(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(row)}) "
+            f"VALUES ({', '.join('?' * len(row))})",
+            list(row.values()),
+        )
+
+    def _one(self, sql: str, *params) -> Optional[sqlite3.Row]:
+        return self.db.execute(sql, params).fetchone()
+
+    def _all(self, sql: str, *params) -> List[dict]:
+        return [dict(row) for row in self.db.execute(sql, params)]
+
+
+def _date(value: Union[datetime, str, None]) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _filters(start=None, end=None, **filters) -> Tuple[str, list]:
+    """
+    The where clause on match_details for filters given as ids or names, and a range
+    of dates
+    """
+    for name in filters:
+        if name not in FILTER_COLUMNS:
+            raise ValueError(
+                f"Can't filter by {name}, choose from {list(FILTER_COLUMNS)}"
+            )
+
+    clauses = ["1"]
+    params: list = []
+    for name, value in filters.items():
+        if value is None:
+            continue
+        clauses.append(
+            f"d.{name}_id = ?" if isinstance(value, int) else f"d.{name} = ?"
+        )
+        params.append(value)
+
+    if start is not None:
+        clauses.append("d.date >= ?")
+        params.append(_date(start))
+    if end is not None:
+        clauses.append("d.date <= ?")
+        params.append(_date(end))
+
+    return " AND ".join(clauses), params
@@ -6,6 +6,9 @@ from typing import Optional
 from gazpacho import Soup
 
 from pycricinfo.base import BaseCricinfoPage
+from pycricinfo.metrics import timed
+from pycricinfo.parsing import next_data_text
+from pycricinfo.transport import Transport
 
 
 class Team(BaseCricinfoPage):
@@ -13,13 +16,17 @@ class Team(BaseCricinfoPage):
     Abstraction of a team
     """
 
+    _bulk_properties = ("embedded_json",)
+
     def __init__(
         self,
         id: int,
         html_file: str = None,
+        transport: Optional[Transport] = None,
     ) -> None:
 
         self.id = id
+        self.transport = transport
         self.url = f"https://www.espncricinfo.com/team/_/id/{self.id}/"
 
         self.html_file = html_file
@@ -42,14 +49,18 @@ class Team(BaseCricinfoPage):
         return cls(id=id, html_file=html_file)
 
     @cached_property
+    @timed("parse", "embedded_json")
     def embedded_json(self) -> Optional[dict]:
         """
         Looks for the json object embedded in the html and returns it
         """
         try:
-            json_text = self.soup.find(
-                "script", attrs={"id": "__NEXT_DATA__"}, mode="first"
-            ).text
+            json_text = (
+                next_data_text(self.html)
+                or self.soup.find(
+                    "script", attrs={"id": "__NEXT_DATA__"}, mode="first"
+                ).text
+            )
             return json.loads(json_text)
         except Exception:
             warnings.warn("Embedded JSON not found", RuntimeWarning)
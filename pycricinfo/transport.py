@@ -0,0 +1,331 @@
+import gzip
+import http.client
+import json
+import ssl
+import threading
+import zlib
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Tuple, Union
+from urllib.parse import urljoin, urlsplit
+
+from gazpacho.utils import HTTPError, sanitize
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.16; rv:80.0) Gecko/20100101 Firefox/80.0"
+)
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# errors that mean a kept-alive connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class Response:
+    """
+    A response returned by a transport
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        headers: Optional[Dict[str, str]] = None,
+        body: bytes = b"",
+        reason: str = "",
+    ) -> None:
+
+        self.url = url
+        self.status = status
+        self.reason = reason
+        # header names are stored lower case
+        self.headers = {k.lower(): v for k, v in (headers or {}).items()}
+        self.body = body
+
+    def __repr__(self) -> str:
+        return f"<Response [{self.status}] {self.url}>"
+
+    @property
+    def ok(self) -> bool:
+        """
+        Flag to indicate the request was successful
+        """
+        return self.status < 400
+
+    @property
+    def content_type(self) -> str:
+        """
+        The media type of the response eg 'application/json'
+        """
+        return self.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    @property
+    def text(self) -> str:
+        """
+        The body of the response decoded as a string
+        """
+        return self.body.decode("utf-8")
+
+    def to_bytes(self) -> bytes:
+        """
+        The response as a line of json with the url, status, reason and headers followed
+        by the body
+        """
+        header = json.dumps(
+            {
+                "url": self.url,
+                "status": self.status,
+                "reason": self.reason,
+                "headers": self.headers,
+            }
+        ).encode("utf-8")
+        return header + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Response":
+        """
+        Read a response written by to_bytes
+        """
+        header, _, body = data.partition(b"\n")
+        meta = json.loads(header)
+        return cls(
+            url=meta["url"],
+            status=meta["status"],
+            headers=meta["headers"],
+            body=body,
+            reason=meta.get("reason", ""),
+        )
+
+    def content(self) -> Union[str, Dict[str, Any]]:
+        """
+        The body as a dict if the response is json, otherwise as a string (the same as gazpacho.get)
+        """
+        if self.content_type == "application/json":
+            return json.loads(self.text)
+        return self.text
+
+
+class Transport:
+    """
+    Base class for transports. Subclasses need to implement request()
+    """
+
+    def request(self, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        """
+        Make a GET request and return the response, whatever the status code
+        """
+        raise NotImplementedError
+
+    def get(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Union[str, Dict[str, Any]]:
+        """
+        Make a GET request and return the content, raising HTTPError for error responses
+        """
+        response = self.request(url, headers=headers)
+        if not response.ok:
+            raise HTTPError(response.status, response.reason)
+        return response.content()
+
+    def close(self) -> None:
+        """
+        Release any resources held by the transport
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+PoolKey = Tuple[str, str, Optional[int]]
+
+
+class PooledTransport(Transport):
+    """
+    Transport that keeps connections alive in a pool per host and asks for compressed responses
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        timeout: float = 30.0,
+        max_redirects: int = 5,
+        compress: bool = True,
+        user_agent: str = USER_AGENT,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.compress = compress
+        self.user_agent = user_agent
+        self.ssl_context = ssl_context or ssl.create_default_context()
+
+        self._pools: Dict[PoolKey, Deque[http.client.HTTPConnection]] = defaultdict(
+            deque
+        )
+        self._lock = threading.Lock()
+
+    def request(self, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        """
+        Make a GET request, following redirects
+        """
+        url = sanitize(url)
+
+        for _ in range(self.max_redirects + 1):
+            response = self._request(url, headers)
+            location = response.headers.get("location")
+            if response.status not in REDIRECT_CODES or not location:
+                return response
+            url = urljoin(url, location)
+
+        return response
+
+    def close(self) -> None:
+        """
+        Close all idle connections
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            for conn in pool:
+                conn.close()
+
+    def _request(self, url: str, headers: Optional[Dict[str, str]]) -> Response:
+        """
+        Make a single request, retrying once on a fresh connection if a pooled one has gone stale
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname or "", parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+
+        request_headers = {
+            "User-Agent": self.user_agent,
+            "Connection": "keep-alive",
+        }
+        if self.compress:
+            request_headers["Accept-Encoding"] = "gzip, deflate"
+        request_headers.update(headers or {})
+
+        while True:
+            conn, reused = self._acquire(key)
+            try:
+                conn.request("GET", path, headers=request_headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            break
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+
+        response_headers = dict(resp.getheaders())
+
+        return Response(
+            url=url,
+            status=resp.status,
+            headers=response_headers,
+            body=self._decode(body, resp.getheader("Content-Encoding")),
+            reason=resp.reason,
+        )
+
+    def _acquire(self, key: PoolKey) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Take an idle connection for the host from the pool or open a new one
+        """
+        with self._lock:
+            pool = self._pools[key]
+            if pool:
+                return pool.pop(), True
+
+        scheme, host, port = key
+        if scheme == "https":
+            return (
+                http.client.HTTPSConnection(
+                    host, port, timeout=self.timeout, context=self.ssl_context
+                ),
+                False,
+            )
+        return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+    def _release(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        """
+        Return a connection to the pool, closing it if the pool is full
+        """
+        with self._lock:
+            pool = self._pools[key]
+            if len(pool) < self.pool_size:
+                pool.append(conn)
+                return
+        conn.close()
+
+    @staticmethod
+    def _decode(body: bytes, encoding: Optional[str]) -> bytes:
+        """
+        Decompress a gzip or deflate encoded body
+        """
+        encoding = (encoding or "").strip().lower()
+        if encoding == "gzip":
+            return gzip.decompress(body)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                # some servers send raw deflate streams without the zlib header
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+        return body
+
+
+_default_transport: Optional[Transport] = None
+_default_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """
+    The transport used by objects that haven't been given one, created on first use
+    """
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = PooledTransport()
+        return _default_transport
+
+
+def set_transport(transport: Optional[Transport]) -> None:
+    """
+    Replace the default transport. Passing None restores a fresh PooledTransport on next use
+    """
+    global _default_transport
+    with _default_lock:
+        _default_transport = transport
+
+
+def get(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    transport: Optional[Transport] = None,
+) -> Union[str, Dict[str, Any]]:
+    """
+    Drop in replacement for gazpacho.get that goes through a transport
+    """
+    return (transport or get_transport()).get(url, headers=headers)
@@ -9,6 +9,7 @@ setup(
     description="A lightweight wrapper around Cricinfo",
     license="MIT",
     install_requires=["gazpacho"],
+    extras_require={"numpy": ["numpy"], "arrow": ["pyarrow"], "zstd": ["zstandard"]},
     author="Alexander Sutcliffe",
     author_email="sutcliffe.alex@gmail.com",
     url="http://github.com/scrambldchannel/pycricinfo",
@@ -1,4 +1,9 @@
+import gzip
+import http.server
+import threading
+
 import pytest
+from helpers import StaticTransport, make_match_html, make_match_json, make_player_html
 
 
 @pytest.fixture(scope="module")
@@ -47,3 +52,79 @@ def teams():
         1234676,
         233713,
     ]
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves the routes registered on the server, counting requests and connections
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        status, headers, body = self.server.routes.get(
+            self.path, (404, {}, b"not found")
+        )
+        if callable(body):
+            body = body(self)
+        if "gzip" in self.headers.get("Accept-Encoding", "") and len(body) > 0:
+            body = gzip.compress(body)
+            headers = {**headers, "Content-Encoding": "gzip"}
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """
+    A local http server. Add responses to server.routes as {path: (status, headers, body)}
+    """
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.routes = {}
+    server.requests = []
+    server.connections = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def static_transport():
+    return StaticTransport()
+
+
+@pytest.fixture
+def match_transport(static_transport):
+    """
+    Transport serving the html and json for match 1216509
+    """
+    url = "https://www.espncricinfo.com/matches/engine/match/1216509"
+    static_transport.add_html(f"{url}.html", make_match_html())
+    static_transport.add_json(f"{url}.json", make_match_json())
+    return static_transport
+
+
+@pytest.fixture
+def player_transport(static_transport):
+    """
+    Transport serving the profile for player 6044
+    """
+    static_transport.add_html(
+        "https://www.espncricinfo.com/ci/content/player/6044.html", make_player_html()
+    )
+    return static_transport
@@ -0,0 +1,268 @@
+"""
+Canned pages and a transport serving them, shared by the tests
+"""
+
+import json
+
+from pycricinfo.transport import Response, Transport
+
+
+class StaticTransport(Transport):
+    """
+    Transport serving canned responses from a dict of {url: (status, headers, body)}
+    """
+
+    def __init__(self, routes=None):
+        self.routes = routes or {}
+        self.requests = []
+
+    def request(self, url, headers=None):
+        self.requests.append(url)
+        status, response_headers, body = self.routes.get(url, (404, {}, b""))
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        return Response(url, status, response_headers, body, reason="")
+
+    def add_json(self, url, data):
+        self.routes[url] = (
+            200,
+            {"Content-Type": "application/json"},
+            json.dumps(data),
+        )
+
+    def add_html(self, url, html):
+        self.routes[url] = (200, {"Content-Type": "text/html"}, html)
+
+
+def make_match_json(status="complete"):
+    """
+    A minimal match json in the shape of the one served by cricinfo
+    """
+    return {
+        "description": "Indian Premier League, 34th Match: Delhi Capitals v Chennai Super Kings",
+        "match": {
+            "match_status": status,
+            "start_datetime_local": "2020-10-17T18:00:00",
+            "international_valid": "0",
+            "general_class_id": "6",
+            "general_class_card": "Twenty20",
+            "general_class_name": "Twenty20",
+            "season": "2020/21",
+            "ground_object_id": "56441",
+            "ground_name": "Melbourne Cricket Ground",
+        },
+        "series": [
+            {"core_recreation_id": "8048", "series_name": "Indian Premier League"}
+        ],
+        "live": {"status": "Delhi Capitals won by 5 wickets"},
+        "team": [
+            {
+                "team_id": "4344",
+                "team_name": "Delhi Capitals",
+                "player": [
+                    {"object_id": "1070168", "known_as": "Prithvi Shaw"},
+                    {"object_id": "28235", "known_as": "Shikhar Dhawan"},
+                    {"object_id": "550215", "known_as": "Kagiso Rabada"},
+                ],
+            },
+            {
+                "team_id": "4343",
+                "team_name": "Chennai Super Kings",
+                "player": [
+                    {"object_id": "44828", "known_as": "Faf du Plessis"},
+                    {"object_id": "28081", "known_as": "MS Dhoni"},
+                    {"object_id": "447261", "known_as": "Deepak Chahar"},
+                ],
+            },
+        ],
+        "innings": [
+            {
+                "batting_team_id": "4343",
+                "bowling_team_id": "4344",
+                "ball_limit": "120",
+                "balls": "120",
+                "over_limit": "20.0",
+                "overs": "20.0",
+            },
+            {
+                "batting_team_id": "4344",
+                "bowling_team_id": "4343",
+                "ball_limit": "120",
+                "balls": "115",
+                "over_limit": "20.0",
+                "overs": "19.1",
+            },
+        ],
+    }
+
+
+def _batsman(id, runs, balls, wickets):
+    return {
+        "href": f"https://www.espncricinfo.com/ci/content/player/{id}.html",
+        "captain": False,
+        "runs": str(runs),
+        "ballsFaced": str(balls),
+        "minutes": "0",
+        "fours": "4",
+        "sixes": "1",
+        "strikeRate": "120.5",
+        "runningScore": {"runs": str(runs + 20), "wickets": str(wickets)},
+        "runningOver": "10.2",
+    }
+
+
+def _bowler(id, wickets, runs):
+    return {
+        "href": f"https://www.espncricinfo.com/ci/content/player/{id}.html",
+        "captain": False,
+        "overs": "4",
+        "maidens": "0",
+        "conceded": str(runs),
+        "wickets": str(wickets),
+        "dots": "9",
+        "foursConceded": "2",
+        "sixesConceded": "1",
+        "noballs": "0",
+        "wides": "1",
+        "economyRate": "7.5",
+    }
+
+
+def make_match_html(id=1216509, status="complete"):
+    """
+    A minimal match page with its status and innings embedded as __NEXT_DATA__
+    """
+    embedded = {
+        "props": {
+            "pageProps": {
+                "data": {
+                    "meta": {"leagueName": "Indian Premier League"},
+                    "match": {"match_status": status},
+                    "content": {
+                        "innings": [
+                            {
+                                "batsmen": [
+                                    _batsman(44828, 58, 47, 3),
+                                    _batsman(28081, 3, 5, 4),
+                                ],
+                                "bowlers": [
+                                    _bowler(550215, 2, 33),
+                                    _bowler(1070168, 0, 12),
+                                ],
+                            },
+                            {
+                                "batsmen": [
+                                    _batsman(1070168, 0, 1, 1),
+                                    _batsman(28235, 101, 58, 5),
+                                ],
+                                "bowlers": [_bowler(447261, 1, 18)],
+                            },
+                        ]
+                    },
+                }
+            }
+        }
+    }
+    return (
+        "<html><head>"
+        f'<link rel="canonical" href="https://www.espncricinfo.com/series/8048/scorecard/{id}/dc-v-csk"/>'
+        "</head><body><div>Scorecard</div>"
+        f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(embedded)}</script>'
+        "</body></html>"
+    )
+
+
+BATTING_COLUMNS = [
+    ("matches played", "Mat"),
+    ("innings batted", "Inns"),
+    ("not outs", "NO"),
+    ("runs scored", "Runs"),
+    ("highest inns score", "HS"),
+    ("batting average", "Ave"),
+    ("balls faced", "BF"),
+    ("batting strike rate", "SR"),
+    ("hundreds scored", "100"),
+    ("fifties scored", "50"),
+    ("boundary fours", "4s"),
+    ("boundary sixes", "6s"),
+    ("catches taken", "Ct"),
+    ("stumpings made", "St"),
+]
+
+BOWLING_COLUMNS = [
+    ("matches played", "Mat"),
+    ("innings bowled in", "Inns"),
+    ("balls bowled", "Balls"),
+    ("runs conceded", "Runs"),
+    ("wickets taken", "Wkts"),
+    ("best innings bowling", "BBI"),
+    ("best match bowling", "BBM"),
+    ("bowling average", "Ave"),
+    ("economy rate", "Econ"),
+    ("bowling strike rate", "SR"),
+    ("four wkts in an inns", "4w"),
+    ("five wkts in an inns", "5w"),
+    ("ten wkts in a match", "10"),
+]
+
+PLAYER_STATS = {
+    "batting": {
+        "Tests": ["52", "89", "11", "3631", "216", "46.55", "7427", "48.88"]
+        + ["11", "14", "361", "10", "34", "0"],
+        "ODIs": ["164", "161", "25", "6068", "145", "44.61", "8362", "72.56"]
+        + ["7", "46", "460", "47", "54", "0"],
+    },
+    "bowling": {
+        "Tests": ["52", "7", "156", "64", "1", "1/5", "1/5", "64.00", "2.46"]
+        + ["156.0", "0", "0", "0"],
+        "ODIs": ["164", "22", "106", "81", "3", "2/34", "2/34", "27.00", "4.58"]
+        + ["35.3", "0", "0", "0"],
+    },
+}
+
+
+def _stats_table(columns, rows):
+    header = "".join(
+        f'<th title="{title}" class="right">{short}</th>' for title, short in columns
+    )
+    body = "".join(
+        f'<tr class="data1"><td class="left" title="record"><b>{grade}</b></td>'
+        + "".join(f'<td class="right">{v}</td>' for v in values)
+        + "</tr>"
+        for grade, values in rows.items()
+    )
+    return (
+        '<table class="engineTable"><thead><tr class="head">'
+        f'<th title="record" class="left">&nbsp;</th>{header}</tr></thead>'
+        f"<tbody>{body}</tbody></table>"
+    )
+
+
+def make_player_html(id=6044):
+    """
+    A minimal player profile page in the shape of the ones on cricinfo
+    """
+    info = [
+        ("Full name", ["Dean Mervyn Jones"]),
+        ("Born", ["March 24, 1961, Coburg, Melbourne, Victoria"]),
+        ("Major teams", ["Australia,", "Derbyshire,", "Durham,", "Victoria"]),
+        ("Playing role", ["Batsman"]),
+        ("Batting style", ["Right-hand bat"]),
+        ("Bowling style", ["Right-arm offbreak"]),
+    ]
+    info_html = "".join(
+        f'<p class="ciPlayerinformationtxt"><b>{label}</b> '
+        + " ".join(f"<span>{v}</span>" for v in values)
+        + "</p>"
+        for label, values in info
+    )
+    return (
+        "<html><head>"
+        f'<link rel="canonical" href="https://www.espncricinfo.com/ci/content/player/{id}.html"/>'
+        '</head><body><div class="ciPlayernametxt"><div><h1>Dean Jones</h1>'
+        "<h3>Australia</h3></div></div>"
+        f"{info_html}"
+        f'{_stats_table(BATTING_COLUMNS, PLAYER_STATS["batting"])}'
+        f'{_stats_table(BOWLING_COLUMNS, PLAYER_STATS["bowling"])}'
+        "</body></html>"
+    )
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import pytest
+
+from pycricinfo import Match
+from pycricinfo.aggregate import career_stats
+from pycricinfo.export import scorecard_arrays
+from pycricinfo.player import PLAYER_STATS_SCHEMA
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def match(match_transport):
+    return Match(1216509, transport=match_transport)
+
+
+def test_career_stats(match):
+    stats = career_stats([match])
+
+    assert stats[28235]["batting"]["Twenty20"] == {
+        "matches": 1.0,
+        "innings": 1.0,
+        "not outs": 0.0,
+        "runs": 101.0,
+        "hs": "101",
+        "average": 101.0,
+        "balls": 58.0,
+        "sr": 174.14,
+        "100s": 1.0,
+        "50s": 0.0,
+        "fours": 4.0,
+        "sixes": 1.0,
+    }
+    assert stats[550215]["bowling"]["Twenty20"] == {
+        "matches": 1.0,
+        "innings bowled": 1.0,
+        "balls": 24.0,
+        "runs": 33.0,
+        "wickets": 2.0,
+        "best bowling innings": "2/33",
+        "best bowling match": "2/33",
+        "average": 16.5,
+        "er": 8.25,
+        "sr": 12.0,
+        "four wickets": 0.0,
+        "five wickets": 0.0,
+        "ten wickets": 0.0,
+    }
+
+    # the same names as the scraped profile
+    names = {name for name, _ in PLAYER_STATS_SCHEMA.columns.values()}
+    for player in stats.values():
+        for table in player.values():
+            for figures in table.values():
+                assert set(figures) <= names
+
+
+def test_career_stats_groups(match):
+    arrays = {
+        table: np.concatenate([a, a]) for table, a in scorecard_arrays([match]).items()
+    }
+    # the second copy of the match is played a year later
+    for table in ("batting", "bowling"):
+        half = len(arrays[table]) // 2
+        arrays[table]["match_id"][half:] = 1
+        arrays[table]["date"][half:] = np.datetime64("2021-10-17T18:00:00")
+
+    by_year = career_stats(arrays, by="year", players=[28235])
+    assert list(by_year) == [28235]
+    assert {year: s["runs"] for year, s in by_year[28235]["batting"].items()} == {
+        2020: 101.0,
+        2021: 101.0,
+    }
+
+    overall = career_stats(arrays, by="format")[550215]["bowling"]["Twenty20"]
+    assert overall["matches"] == 2.0
+    assert overall["wickets"] == 4.0
+
+    since = career_stats(arrays, start=datetime(2021, 1, 1))
+    assert since[28235]["batting"]["Twenty20"]["matches"] == 1.0
+
+    both = career_stats(arrays, by=("season", "opposition"))
+    assert list(both[28235]["batting"]) == [("2020/21", 4343)]
+
+    with pytest.raises(ValueError):
+        career_stats(arrays, by="weather")
@@ -0,0 +1,40 @@
+import asyncio
+
+from pycricinfo import Match, Series
+from pycricinfo.aio import AsyncClient
+
+
+def test_match_aload(match_transport):
+    async def load():
+        async with AsyncClient(transport=match_transport, concurrency=2) as client:
+            return await Match.aload(1216509, client=client)
+
+    m = asyncio.run(load())
+
+    # both payloads are fetched up front and the parsed properties work as before
+    assert len(match_transport.requests) == 2
+    assert m.status == "complete"
+    assert m.format == {"id": 6, "name": "Twenty20"}
+    assert m.teams[1]["name"] == "Chennai Super Kings"
+    assert m.match_stats["all_innings"][0]["batting"][0]["name"] == "Faf du Plessis"
+    assert len(match_transport.requests) == 2
+
+
+def test_series_aall_matches(static_transport):
+    url = "http://core.espnuk.org/v2/sports/cricket/leagues/8048/seasons/"
+    static_transport.add_json(
+        url, {"items": [{"$ref": f"{url}2019"}, {"$ref": f"{url}2020"}]}
+    )
+    for season, ids in [(2019, [1, 2]), (2020, [3])]:
+        static_transport.add_json(
+            f"{url}{season}/events/",
+            {"items": [{"$ref": f"{url}{season}/events/{id}"} for id in ids]},
+        )
+
+    async def load():
+        s = Series(8048)
+        return s, await s.aall_matches(AsyncClient(transport=static_transport))
+
+    s, matches = asyncio.run(load())
+    assert matches == [1, 2, 3]
+    assert s.seasons == [2019, 2020]
@@ -0,0 +1,80 @@
+import pytest
+from helpers import make_match_html, make_match_json, make_player_html
+
+from pycricinfo import Match, PageNotFoundException, Player
+from pycricinfo.archive import Archive, ArchiveWriter, open_archive
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_archive_round_trip(tmp_path, codec):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+
+    path = str(tmp_path / "season.pcia")
+    with ArchiveWriter(path, codec=codec, train_samples=4) as writer:
+        for id in range(10):
+            writer.add(f"match/{id}/html", make_match_html(id))
+            writer.add(f"match/{id}/json", f'{{"id": {id}}}')
+
+    with Archive(path) as archive:
+        assert len(archive) == 20
+        assert archive.get("match/7/html").decode("utf-8") == make_match_html(7)
+        assert archive.get("match/3/json") == b'{"id": 3}'
+        assert "match/10/html" not in archive
+        with pytest.raises(KeyError):
+            archive.get("match/10/html")
+
+
+def test_pages_from_archive(tmp_path, match_transport):
+    path = str(tmp_path / "pages.pcia")
+    player_html = tmp_path / "6044.html"
+    player_html.write_text(make_player_html())
+
+    with ArchiveWriter(path) as writer:
+        Match(1216509, transport=match_transport).to_archive(writer)
+        Player(6044, html_file=str(player_html)).to_archive(writer)
+
+    m = Match.from_archive(path, 1216509)
+    assert m.json == make_match_json()
+    assert m.match_stats["all_innings"][1]["batting"][1]["name"] == "Shikhar Dhawan"
+
+    p = Player.from_archive(Archive(path), 6044)
+    assert p.full_name == "Dean Mervyn Jones"
+
+    with pytest.raises(PageNotFoundException):
+        Match.from_archive(path, 1)
+
+
+def test_open_archive_reopens(tmp_path):
+    path = str(tmp_path / "pages.pcia")
+    with ArchiveWriter(path) as writer:
+        writer.add("a", "1")
+
+    archive = open_archive(path)
+    assert open_archive(path) is archive
+
+    # a closed archive isn't handed out again
+    archive.close()
+    archive = open_archive(path)
+    assert not archive.closed and archive.get("a") == b"1"
+
+    # nor is one for a file that has since been rewritten
+    with ArchiveWriter(path) as writer:
+        writer.add("a", "1")
+        writer.add("b", "2")
+    assert open_archive(path) is not archive
+    assert open_archive(path).get("b") == b"2"
+    # and the one it replaced is closed
+    assert archive.closed
+
+
+@pytest.mark.parametrize("train_samples", [0, 4])
+def test_archive_duplicate_keys(tmp_path, train_samples):
+    path = str(tmp_path / "pages.pcia")
+    with ArchiveWriter(path, codec="zlib", train_samples=train_samples) as writer:
+        writer.add("a", "1")
+        with pytest.raises(ValueError):
+            writer.add("a", "2")
+
+    with Archive(path) as archive:
+        assert list(archive.keys()) == ["a"] and archive.get("a") == b"1"
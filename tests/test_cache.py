@@ -0,0 +1,99 @@
+import os
+import time
+
+from helpers import make_match_html, make_match_json
+
+from pycricinfo import LiveScores, Match
+from pycricinfo.cache import IMMUTABLE, DiskCache
+from pycricinfo.transport import Response
+
+
+def test_disk_cache(tmp_path):
+    cache = DiskCache(path=str(tmp_path), max_size=10_000)
+    url = "https://www.espncricinfo.com/ci/content/player/6044.html"
+
+    assert cache.get(url) is None
+
+    cache.set(url, Response(url, 200, {"Content-Type": "text/html"}, b"x" * 5000), 60)
+    response = cache.get(url)
+    assert response.status == 200
+    assert response.content() == "x" * 5000
+    # entries are compressed
+    assert cache.size < 1000
+
+    cache.set("expired", Response("expired", 200, {}, b"old"), 60)
+    os.utime(cache._file("expired"), (0, time.time() - 1))
+    assert cache.get("expired") is None
+
+
+def test_disk_cache_eviction(tmp_path):
+    cache = DiskCache(path=str(tmp_path), max_size=2_500, compresslevel=0)
+
+    for i in range(5):
+        body = os.urandom(1000)
+        cache.set(str(i), Response(str(i), 200, {}, body), 100 + i)
+
+    # the entries closest to expiring are evicted first
+    assert cache.size <= 2_500
+    assert cache.get("0") is None
+    assert cache.get("4") is not None
+
+
+def test_match_cached_by_status(tmp_path, match_transport):
+    cache = DiskCache(path=str(tmp_path), max_age=1000)
+
+    m = Match(1216509, transport=match_transport)
+    m.cache = cache
+    assert m.status == "complete"
+    assert m.match_stats["all_innings"][1]["batting"][1]["runs"] == 101
+
+    # a completed match is kept as long as the cache allows
+    expires = os.stat(cache._file(m.json_url)).st_mtime
+    assert expires > time.time() + 900
+    assert cache.ttl("complete") == 1000
+    assert IMMUTABLE > 1000
+
+    m2 = Match(1216509, transport=match_transport)
+    m2.cache = cache
+    assert m2.match_stats == m.match_stats
+    assert len(match_transport.requests) == 2
+
+
+def test_current_match_short_ttl(tmp_path, static_transport):
+    cache = DiskCache(path=str(tmp_path))
+    m = Match(1, transport=static_transport)
+    m.cache = cache
+    static_transport.add_json(m.json_url, make_match_json(status="current"))
+
+    assert m.status == "current"
+    expires = os.stat(cache._file(m.json_url)).st_mtime
+    assert expires < time.time() + cache.ttls["current"] + 1
+
+    ls = LiveScores(transport=static_transport)
+    ls.cache = cache
+    static_transport.add_html(ls.url, "<html></html>")
+    assert ls.html == "<html></html>"
+    expires = os.stat(cache._file(ls.url)).st_mtime
+    assert expires < time.time() + cache.ttls["live"] + 1
+
+
+def test_match_html_cached_by_status(tmp_path, static_transport):
+    cache = DiskCache(path=str(tmp_path), max_age=1000)
+
+    # the html is fetched before the json, its status comes from the embedded json
+    for id, status in ((1216509, "complete"), (1, "current")):
+        m = Match(id, transport=static_transport)
+        m.cache = cache
+        static_transport.add_html(m.url, make_match_html(id, status=status))
+        assert m.html
+        expires = os.stat(cache._file(m.url)).st_mtime
+        assert (expires > time.time() + 900) is (status == "complete")
+
+    # loading in bulk fetches the json first
+    cache.clear()
+    m = Match(1216509, transport=static_transport)
+    m.cache = cache
+    static_transport.add_html(m.url, "<html></html>")
+    static_transport.add_json(m.json_url, make_match_json())
+    m._load(parse=False)
+    assert os.stat(cache._file(m.url)).st_mtime > time.time() + 900
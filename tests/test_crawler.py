@@ -0,0 +1,167 @@
+import time
+
+import pytest
+from helpers import make_match_html, make_match_json, make_player_html
+
+from pycricinfo import PageNotFoundException, PyCricinfoException
+from pycricinfo.crawler import Crawler
+
+FEED = "http://core.espnuk.org/v2/sports/cricket/leagues/8048/"
+PLAYERS = [1070168, 28235, 550215, 44828, 28081, 447261]
+
+
+@pytest.fixture
+def crawl_transport(match_transport):
+    """
+    Transport serving series 8048 with a single match and its players and ground
+    """
+    match_transport.add_json(
+        f"{FEED}seasons/", {"pageCount": 1, "items": [{"$ref": f"{FEED}seasons/2020"}]}
+    )
+    match_transport.add_json(
+        f"{FEED}seasons/2020/events/",
+        {"pageCount": 1, "items": [{"$ref": f"{FEED}events/1216509"}]},
+    )
+    for id in PLAYERS:
+        match_transport.add_html(
+            f"https://www.espncricinfo.com/ci/content/player/{id}.html",
+            make_player_html(id),
+        )
+    match_transport.add_html(
+        "https://www.espncricinfo.com/ci/content/ground/56441.html",
+        "<html><body><h1>Melbourne Cricket Ground</h1></body></html>",
+    )
+    return match_transport
+
+
+def test_crawl(tmp_path, crawl_transport):
+    with Crawler(str(tmp_path / "crawl"), rate=1000, transport=crawl_transport) as c:
+        assert c.add("series", 8048)
+        assert not c.add("series", 8048)
+
+        results = list(c.crawl())
+
+        assert all(r.error is None for r in results)
+        assert sorted((r.kind, r.id) for r in results if r.kind == "player") == sorted(
+            ("player", str(id)) for id in PLAYERS
+        )
+        assert [r.page for r in results if r.kind == "season"] == [[1216509]]
+        match = next(r.page for r in results if r.kind == "match")
+        assert match.match_stats["all_innings"][0]["batting"][0]["runs"] == 58
+        assert c.counts() == {"done": 10}
+
+    # every page was fetched once
+    assert len(crawl_transport.requests) == len(set(crawl_transport.requests))
+
+
+def test_crawl_priorities(tmp_path, crawl_transport):
+    c = Crawler(
+        str(tmp_path / "crawl"),
+        workers=1,
+        rate=1000,
+        follow=("season", "match", "ground"),
+        priorities={"player": 5},
+        transport=crawl_transport,
+    )
+    c.add("series", 8048)
+    c.add("player", 6044)
+
+    assert [r.kind for r in c.crawl()] == [
+        "series",
+        "season",
+        "match",
+        "ground",
+        "player",
+    ]
+
+    # only the player that was added by hand is crawled
+    assert [u for u in crawl_transport.requests if "/player/" in u] == [
+        "https://www.espncricinfo.com/ci/content/player/6044.html"
+    ]
+
+
+def test_crawl_depth_first(tmp_path, crawl_transport):
+    crawl_transport.add_json(
+        f"{FEED}seasons/2020/events/",
+        {
+            "pageCount": 1,
+            "items": [{"$ref": f"{FEED}events/1216509"}, {"$ref": f"{FEED}events/1"}],
+        },
+    )
+    crawl_transport.add_html(
+        "https://www.espncricinfo.com/matches/engine/match/1.html", make_match_html(1)
+    )
+    crawl_transport.add_json(
+        "https://www.espncricinfo.com/matches/engine/match/1.json", make_match_json()
+    )
+
+    with Crawler(
+        str(tmp_path / "crawl"), workers=1, rate=1000, transport=crawl_transport
+    ) as c:
+        c.add("series", 8048)
+        kinds = [r.kind for r in c.crawl()]
+
+    # the players and ground of the first match come before the second match
+    assert kinds == ["series", "season", "match"] + ["player"] * 6 + [
+        "ground",
+        "match",
+    ]
+
+
+def test_crawl_resume(tmp_path, crawl_transport):
+    path = str(tmp_path / "crawl")
+
+    c = Crawler(path, workers=2, rate=1000, transport=crawl_transport)
+    c.add("series", 8048)
+    first = [(r.kind, r.id) for r in c.crawl(limit=4)]
+    assert len(first) == 4
+    c.close()
+
+    # a crawl opened on the same file carries on with what was left
+    with Crawler(path, workers=2, rate=1000, transport=crawl_transport) as c:
+        rest = [(r.kind, r.id) for r in c.crawl()]
+
+    assert len(rest) == 6
+    assert not set(first) & set(rest)
+    assert len(crawl_transport.requests) == len(set(crawl_transport.requests))
+
+
+def test_crawl_errors(tmp_path, crawl_transport):
+    del crawl_transport.routes[
+        "https://www.espncricinfo.com/ci/content/player/28235.html"
+    ]
+
+    with Crawler(str(tmp_path / "crawl"), rate=1000, transport=crawl_transport) as c:
+        c.add("match", 1216509)
+        errors = [r for r in c.crawl() if r.error is not None]
+
+        assert [(r.kind, r.id) for r in errors] == [("player", "28235")]
+        assert isinstance(errors[0].error, PageNotFoundException)
+        assert c.counts() == {"done": 7, "failed": 1}
+
+
+def test_crawl_retries_later(tmp_path, crawl_transport):
+    url = "https://www.espncricinfo.com/ci/content/player/28235.html"
+    crawl_transport.routes[url] = (403, {}, "")
+
+    with Crawler(
+        str(tmp_path / "crawl"),
+        rate=1000,
+        max_attempts=2,
+        retry_delay=0.1,
+        transport=crawl_transport,
+    ) as c:
+        c.add("player", 28235)
+        start = time.monotonic()
+        errors = [r.error for r in c.crawl()]
+
+        # the second attempt waited for the retry delay
+        assert time.monotonic() - start >= 0.1
+        assert [type(e) for e in errors] == [PyCricinfoException] * 2
+        assert crawl_transport.requests.count(url) == 2
+        assert c.counts() == {"failed": 1}
+
+        # an entity waiting to be retried isn't taken before it is due
+        c.state.failed(("player", "28235"), errors[0], retry=True, delay=60)
+        assert c.state.pop(1) == []
+        assert c.state.until_ready() > 59
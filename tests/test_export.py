@@ -0,0 +1,137 @@
+import io
+import json
+import weakref
+from datetime import date, datetime
+
+import pytest
+
+from pycricinfo import Match
+from pycricinfo.export import (
+    ScorecardColumns,
+    _json_default,
+    ndjson_lines,
+    scorecard_rows,
+    write_ndjson,
+    write_parquet,
+)
+
+
+def test_scorecard_rows(match_transport):
+    rows = list(scorecard_rows(Match(1216509, transport=match_transport)))
+
+    tables = [table for table, _ in rows]
+    assert tables.count("innings") == 2
+    assert tables.count("batting") == 4
+    assert tables.count("bowling") == 3
+
+    table, row = rows[1]
+    assert table == "batting"
+    assert row["match_id"] == 1216509
+    assert row["season_id"] == 2020
+    assert row["format"] == "Twenty20"
+    assert row["innings"] == 1
+    assert row["name"] == "Faf du Plessis"
+    assert row["fow_wickets"] == 3
+
+
+def test_write_ndjson(match_transport):
+    m = Match(1216509, transport=match_transport)
+    m.compact()
+
+    out = io.StringIO()
+    assert write_ndjson([m, m], out) == 18
+
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["table"] for r in rows[:3]] == ["innings", "batting", "batting"]
+    assert rows[1]["name"] == "Faf du Plessis"
+    assert rows[1]["date"] == "2020-10-17T18:00:00"
+    assert rows[8]["table"] == "bowling" and rows[8]["wickets"] == 1
+
+
+def test_ndjson_lines_streams(match_transport):
+    loaded = []
+
+    def matches():
+        for _ in range(3):
+            loaded.append(Match(1216509, transport=match_transport))
+            yield loaded[-1]
+
+    lines = ndjson_lines(matches(), tables=["innings"])
+    assert json.loads(next(lines))["innings"] == 1
+    # only the first match has been loaded
+    assert len(loaded) == 1
+    assert len(list(lines)) == 5
+
+
+def test_to_numpy(match_transport):
+    np = pytest.importorskip("numpy")
+
+    m = Match(1216509, transport=match_transport)
+    arrays = ScorecardColumns([m, m]).to_numpy()
+
+    batting = arrays["batting"]
+    assert len(batting) == 8
+    assert batting["runs"].dtype == np.int64
+    assert batting["runs"].sum() == 2 * (58 + 3 + 0 + 101)
+    assert batting["name"][3] == "Shikhar Dhawan"
+    assert arrays["innings"]["overs"][1] == 19.1
+    assert arrays["bowling"]["ground_id"][0] == 56441
+
+
+def test_write_parquet(tmp_path, match_transport):
+    pytest.importorskip("pyarrow")
+    import pyarrow.dataset as ds
+
+    m = Match(1216509, transport=match_transport)
+    batches = ScorecardColumns([m]).to_arrow()
+    assert batches["bowling"].num_rows == 3
+    assert batches["batting"].schema.field("sr").type == "double"
+
+    write_parquet([m], str(tmp_path), chunk_rows=1)
+
+    assert (tmp_path / "batting" / "season_id=2020" / "format_id=6").is_dir()
+    batting = ds.dataset(
+        str(tmp_path / "batting"), format="parquet", partitioning="hive"
+    ).to_table()
+    assert batting.num_rows == 4
+    assert sorted(batting.column("runs").to_pylist()) == [0, 3, 58, 101]
+
+
+def test_write_parquet_streams(tmp_path, match_transport):
+    pytest.importorskip("pyarrow")
+    import pyarrow.dataset as ds
+
+    loaded = []
+
+    def matches():
+        for _ in range(3):
+            # matches aren't held until a chunk is written, only the last one is left
+            assert sum(ref() is not None for ref in loaded) <= 1
+            m = Match(1216509, transport=match_transport)
+            loaded.append(weakref.ref(m))
+            yield m
+            del m
+
+    # each match has 9 rows, so the first two are written together
+    write_parquet(matches(), str(tmp_path), partition_by=(), chunk_rows=18)
+
+    dataset = ds.dataset(str(tmp_path / "batting"), format="parquet")
+    assert len(dataset.files) == 2
+    assert dataset.to_table().num_rows == 12
+
+
+def test_json_default(match_transport):
+    m = Match(1216509, transport=match_transport)
+    m.compact()
+    entry = m.match_stats["all_innings"][0]["batting"][0]
+
+    assert _json_default(entry) == dict(entry)
+    assert _json_default(datetime(2020, 10, 17, 18)) == "2020-10-17T18:00:00"
+    assert _json_default(date(2020, 10, 17)) == "2020-10-17"
+    with pytest.raises(TypeError):
+        json.dumps({"value": object()}, default=_json_default)
+
+    np = pytest.importorskip("numpy")
+    assert json.dumps([np.int64(3), np.float32(0.5)], default=_json_default) == (
+        "[3, 0.5]"
+    )
@@ -1,4 +1,13 @@
-from pycricinfo import LiveScores
+import asyncio
+import json
+import zlib
+
+import pytest
+
+from pycricinfo import LiveScores, PageNotFoundException, PyCricinfoException
+from pycricinfo.livescores import MATCH_STATES, LiveScoresWatcher
+from pycricinfo.scheduler import RequestScheduler, set_scheduler
+from pycricinfo.transport import Response, Transport
 
 
 def test_livescores():
@@ -6,3 +15,166 @@ def test_livescores():
     assert isinstance(ls.html, str)
     assert isinstance(ls.live_matches, list)
     assert isinstance(ls.embedded_json, dict)
+
+
+def test_match_states():
+    # the fields read from the match events on the real page
+    states = LiveScores().match_states
+    assert states
+    for state in states.values():
+        assert state.state in MATCH_STATES
+        assert state.scores and all(name for name, _ in state.scores)
+
+
+def make_scores_html(leagues):
+    """
+    A live scores page with leagues of {match id: (state, [scores])}
+    """
+    data = {
+        "props": {
+            "pageProps": {
+                "data": {
+                    "content": {
+                        "leagueEvents": [
+                            {
+                                "name": name,
+                                "matchEvents": [
+                                    {
+                                        "id": str(id),
+                                        "state": state,
+                                        "statusText": f"Match {id} is {state}",
+                                        "competitors": [
+                                            {"name": f"Team {i}", "score": score}
+                                            for i, score in enumerate(scores)
+                                        ],
+                                    }
+                                    for id, (state, scores) in matches.items()
+                                ],
+                            }
+                            for name, matches in leagues.items()
+                        ]
+                    }
+                }
+            }
+        }
+    }
+    return (
+        '<html><script id="__NEXT_DATA__" type="application/json">'
+        f"{json.dumps(data)}</script></html>"
+    )
+
+
+class PagesTransport(Transport):
+    """
+    Serves a sequence of versions of a page, answering 304 when the etag matches
+    """
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.headers = []
+
+    def request(self, url, headers=None):
+        self.headers.append(headers or {})
+        page = self.pages.pop(0) if len(self.pages) > 1 else self.pages[0]
+        etag = f'"{zlib.crc32(page.encode("utf-8"))}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return Response(url, 304, {"ETag": etag})
+        return Response(url, 200, {"ETag": etag}, page.encode("utf-8"))
+
+
+def test_watch_yields_changes_across_leagues(monkeypatch):
+    monkeypatch.setattr("pycricinfo.livescores.time.sleep", lambda seconds: None)
+
+    first = make_scores_html(
+        {"IPL": {1: ("in", ["120/2", None])}, "BBL": {2: ("pre", [None, None])}}
+    )
+    second = make_scores_html(
+        {"IPL": {1: ("post", ["180/5", "181/3"])}, "BBL": {2: ("in", ["4/0", None])}}
+    )
+    transport = PagesTransport([first, first, second])
+
+    ls = LiveScores(transport=transport)
+    diffs = list(ls.watch(interval=1, backoff=2, polls=4))
+
+    assert len(diffs) == 2
+    assert diffs[0].started == [1]
+    assert set(diffs[0].matches) == {1, 2}
+
+    assert diffs[1].started == [2]
+    assert diffs[1].finished == [1]
+    assert [change.id for change in diffs[1].scores] == [1, 2]
+    assert diffs[1].scores[0].after.scores[1] == ("Team 1", "181/3")
+
+    # the page held by the object is kept up to date
+    assert ls.match_states[1].state == "post"
+    etag = f'"{zlib.crc32(first.encode("utf-8"))}"'
+    assert transport.headers[:2] == [{}, {"If-None-Match": etag}]
+
+
+def test_watch_backs_off_when_unchanged():
+    page = make_scores_html({"IPL": {1: ("in", ["1/0"])}})
+    watcher = LiveScoresWatcher(
+        LiveScores(transport=PagesTransport([page])),
+        interval=10,
+        max_interval=30,
+        backoff=2,
+    )
+
+    assert watcher.poll().started == [1]
+    assert watcher.delay == 10
+    assert watcher.poll() is None
+    assert watcher.delay == 20
+    assert watcher.poll() is None
+    assert watcher.delay == 30
+
+
+def test_awatch():
+    page = make_scores_html({"IPL": {1: ("in", ["1/0"])}})
+    ls = LiveScores(transport=PagesTransport([page]))
+
+    async def watch():
+        return [diff async for diff in ls.awatch(interval=0, polls=2)]
+
+    diffs = asyncio.run(watch())
+    assert len(diffs) == 1
+    assert diffs[0].started == [1]
+
+
+def test_livescores_errors(static_transport):
+    ls = LiveScores(transport=static_transport)
+    with pytest.raises(PageNotFoundException):
+        ls.html
+
+    static_transport.routes[ls.url] = (403, {}, "")
+    with pytest.raises(PyCricinfoException) as e:
+        LiveScoresWatcher(ls).poll()
+    assert e.value.expression == 403
+
+
+def test_missing_match_states():
+    ls = LiveScores(transport=PagesTransport(["<html></html>"]))
+    with pytest.warns(RuntimeWarning):
+        assert ls.match_states == {}
+    with pytest.warns(RuntimeWarning):
+        assert ls.live_matches == []
+
+    # a page without the matches doesn't stop the watch
+    page = make_scores_html({"IPL": {1: ("in", ["1/0"])}})
+    ls = LiveScores(transport=PagesTransport(["<html></html>", page]))
+    with pytest.warns(RuntimeWarning):
+        diffs = list(ls.watch(interval=0, polls=2))
+    assert [diff.started for diff in diffs] == [[], [1]]
+    assert diffs[1].matches[1].status == "Match 1 is in"
+
+
+def test_poll_rate_limited(static_transport):
+    set_scheduler(RequestScheduler(backoff=0, retries=1))
+    try:
+        ls = LiveScores(transport=static_transport)
+        static_transport.routes[ls.url] = (429, {}, "")
+        with pytest.raises(PyCricinfoException) as e:
+            LiveScoresWatcher(ls).poll()
+        assert e.value.expression == 429
+        assert static_transport.requests == [ls.url] * 2
+    finally:
+        set_scheduler(None)
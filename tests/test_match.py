@@ -1,10 +1,15 @@
+import json
 import random
 from datetime import datetime
 from pathlib import Path
 
 import pytest
+from helpers import make_match_html, make_match_json
 
 from pycricinfo import Match, PageNotFoundException, Player
+from pycricinfo.cache import DiskCache
+from pycricinfo.match import BattingEntry, MatchRefresh
+from pycricinfo.transport import PooledTransport
 
 
 def test_test_match():
@@ -202,3 +207,213 @@ def test_all_innings():
     assert m._all_innings[0]["bowling"][1]["sixes"] == 2
     assert m._all_innings[0]["bowling"][3]["overs"] == 4.0
     assert m._all_innings[0]["bowling"][3]["overs"] == 4
+
+
+def test_fetch_many(match_transport):
+
+    results = list(
+        Match.fetch_many([1216509, 123], workers=2, transport=match_transport)
+    )
+
+    assert len(results) == 2
+    loaded = {r.id: r for r in results}
+
+    assert loaded[1216509].error is None
+    assert (
+        loaded[1216509].page.match_stats["all_innings"][0]["bowling"][0]["wickets"] == 2
+    )
+
+    assert loaded[123].page is None
+    assert isinstance(loaded[123].error, PageNotFoundException)
+
+
+def test_fetch_many_lazily(match_transport):
+    read = []
+
+    def ids():
+        for id in range(1000):
+            read.append(id)
+            yield 1216509
+
+    results = Match.fetch_many(ids(), workers=2, transport=match_transport)
+    assert next(results).error is None
+    results.close()
+
+    # only enough ids to keep the threads busy were read
+    assert len(read) <= 5
+
+
+def test_parse_many(tmp_path):
+    sources = []
+    for id in range(1, 8):
+        html, json_file = tmp_path / f"{id}.html", tmp_path / f"{id}.json"
+        html.write_text(make_match_html(id))
+        json_file.write_text(json.dumps(make_match_json()))
+        sources.append((str(html), str(json_file)))
+    sources.insert(3, (str(tmp_path / "missing.html"), str(tmp_path / "missing.json")))
+
+    results = list(Match.parse_many(sources, processes=2, chunk_size=3))
+
+    assert [r.source for r in results] == sources
+    assert [r.id for r in results] == [1, 2, 3, None, 4, 5, 6, 7]
+    assert isinstance(results[3].error, FileNotFoundError)
+    assert set(results[0].data) == {"teams", "match_stats"}
+    assert results[0].data["match_stats"]["all_innings"][1]["batting"][1]["runs"] == 101
+
+    unordered = Match.parse_many(
+        sources, properties=["result"], processes=2, chunk_size=2, ordered=False
+    )
+    assert sorted((r.source, r.data) for r in unordered if r.error is None) == [
+        (source, {"result": "Delhi Capitals won by 5 wickets"})
+        for source in sorted(sources)
+        if "missing" not in source[0]
+    ]
+
+
+def test_compact(match_transport):
+    m = Match(1216509, transport=match_transport)
+    stats = m.match_stats
+
+    report = m.compact()
+
+    assert report.id == 1216509
+    assert report.after < report.before
+    assert report.after == m.memory_usage()
+    for name in ("html", "json", "soup", "embedded_json", "_all_innings"):
+        assert name not in m.__dict__
+    assert m.result == "Delhi Capitals won by 5 wickets"
+    assert m.ground == {"id": 56441, "name": "Melbourne Cricket Ground"}
+
+    batting = m.match_stats["all_innings"][1]["batting"][1]
+    assert isinstance(batting, BattingEntry)
+    assert not hasattr(batting, "__dict__")
+    assert batting["runs"] == 101
+    assert dict(batting) == stats["all_innings"][1]["batting"][1]
+    assert m.match_stats == stats
+
+
+def test_lean(match_transport, monkeypatch):
+    monkeypatch.setattr(Match, "lean", True)
+
+    [result] = Match.fetch_many([1216509], transport=match_transport)
+
+    assert "html" not in result.page.__dict__
+    assert result.page.match_stats["all_innings"][0]["bowling"][0]["wickets"] == 2
+
+
+def test_player_index(match_transport):
+    m = Match(1216509, transport=match_transport)
+
+    assert m.player_index[28081]["name"] == "MS Dhoni"
+    assert m.player_index[28081]["team_id"] == 4343
+    assert m.player_index[28081]["team_name"] == "Chennai Super Kings"
+    assert len(m.player_index) == 6
+
+    innings = m.match_stats["all_innings"]
+    assert [b["name"] for b in innings[0]["batting"]] == ["Faf du Plessis", "MS Dhoni"]
+    # bowlers are only named if they played for the bowling team
+    assert [b["name"] for b in innings[0]["bowling"]] == [
+        "Kagiso Rabada",
+        "Prithvi Shaw",
+    ]
+    assert [b["name"] for b in innings[1]["bowling"]] == ["Deepak Chahar"]
+
+
+def test_refresh(match_transport):
+    url = "https://www.espncricinfo.com/matches/engine/match/1216509"
+    live = make_match_json("current")
+    live["live"]["status"] = "Delhi Capitals need 10 runs from 5 balls"
+    match_transport.add_json(f"{url}.json", live)
+
+    m = Match(1216509, transport=match_transport)
+    assert m.status == "current"
+    assert m.result == "Delhi Capitals need 10 runs from 5 balls"
+    teams = m.teams
+    m.match_stats
+
+    # nothing has changed so the html isn't refetched
+    requests = len(match_transport.requests)
+    assert m.refresh() == MatchRefresh([], [])
+    assert match_transport.requests[requests:] == [f"{url}.json"]
+
+    match_transport.add_json(f"{url}.json", make_match_json("complete"))
+    requests = len(match_transport.requests)
+    refresh = m.refresh()
+    assert match_transport.requests[requests:] == [f"{url}.json", f"{url}.html"]
+    # the html was refetched but is the same
+    assert refresh.payloads == ["json"]
+    assert refresh.properties == ["result", "status"]
+    assert m.status == "complete"
+    assert m.result == "Delhi Capitals won by 5 wickets"
+    assert m.teams is teams
+
+
+def test_refresh_not_modified(local_server):
+    body = json.dumps(make_match_json("current")).encode("utf-8")
+    path = "/matches/engine/match/1216509.json"
+    local_server.routes[path] = (
+        200,
+        {"Content-Type": "application/json", "ETag": '"v1"'},
+        body,
+    )
+
+    m = Match(1216509, transport=PooledTransport())
+    m.json_url = f"{local_server.url}{path}"
+    m.__dict__["json"] = make_match_json("current")
+
+    assert not m.refresh().changed
+    assert not m.refresh().changed
+    assert local_server.requests[-1][1]["If-None-Match"] == '"v1"'
+
+
+def test_refresh_lean(local_server, tmp_path):
+    paths = {
+        "html": "/matches/engine/match/1216509.html",
+        "json": "/matches/engine/match/1216509.json",
+    }
+    local_server.routes[paths["html"]] = (
+        200,
+        {"Content-Type": "text/html", "ETag": '"h1"'},
+        make_match_html(status="current").encode("utf-8"),
+    )
+    local_server.routes[paths["json"]] = (
+        200,
+        {"Content-Type": "application/json", "ETag": '"j1"'},
+        json.dumps(make_match_json("current")).encode("utf-8"),
+    )
+
+    m = Match(1216509, transport=PooledTransport())
+    m.url = f"{local_server.url}{paths['html']}"
+    m.json_url = f"{local_server.url}{paths['json']}"
+    m.cache = DiskCache(path=str(tmp_path))
+    m.lean = True
+    m._load()
+    assert "json" not in m.__dict__
+
+    # the dropped json is requested from the site rather than the cache, conditionally
+    local_server.routes[paths["json"]] = (304, {}, b"")
+    requests = len(local_server.requests)
+    assert m.refresh() == MatchRefresh([], [])
+    assert [path for path, _ in local_server.requests[requests:]] == [paths["json"]]
+    assert local_server.requests[-1][1]["If-None-Match"] == '"j1"'
+
+
+def test_refresh_compacted(match_transport):
+    url = "https://www.espncricinfo.com/matches/engine/match/1216509"
+    match_transport.add_json(f"{url}.json", make_match_json("current"))
+
+    m = Match(1216509, transport=match_transport)
+    m.lean = True
+    m.compact()
+    assert "json" in m._digests and "json" not in m.__dict__
+
+    # the refetched payloads are compared with the digests of the dropped ones
+    assert m.refresh() == MatchRefresh([], [])
+
+    live = make_match_json("current")
+    live["live"]["status"] = "Delhi Capitals need 10 runs from 5 balls"
+    match_transport.add_json(f"{url}.json", live)
+    assert m.refresh() == MatchRefresh(["json"], ["result"])
+    assert m.result == "Delhi Capitals need 10 runs from 5 balls"
+    assert "json" not in m.__dict__
+    assert m.refresh() == MatchRefresh([], [])
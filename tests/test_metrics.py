@@ -0,0 +1,70 @@
+import pytest
+
+from pycricinfo import Match, metrics
+from pycricinfo.cache import DiskCache
+from pycricinfo.metrics import Event, MetricsAggregator
+
+
+@pytest.fixture
+def aggregator():
+    aggregator = metrics.add_listener(MetricsAggregator())
+    yield aggregator
+    metrics.remove_listener(aggregator)
+
+
+def test_match_metrics(aggregator, match_transport, tmp_path):
+    Match.cache = DiskCache(str(tmp_path))
+    try:
+        Match(1216509, transport=match_transport).match_stats
+        Match(1216509, transport=match_transport).match_stats
+    finally:
+        Match.cache = None
+
+    host = "www.espncricinfo.com"
+    assert aggregator.counter("requests_total", host=host, status="200") == 2
+    assert aggregator.counter("response_bytes_total", host=host) > 0
+    assert aggregator.counter("cache_lookups_total", kind="complete", result="miss")
+    assert aggregator.counter("cache_lookups_total", kind="complete", result="hit")
+    assert aggregator.histogram("request_seconds", host=host).count == 2
+
+    for kind, stage in [("fetch", "json"), ("fetch", "html"), ("parse", "match_stats")]:
+        assert aggregator.histogram("stage_seconds", kind=kind, stage=stage).count == 2
+
+
+def test_prometheus_text():
+    aggregator = MetricsAggregator(buckets=(0.1, 1.0))
+    aggregator(Event("request", "example.com", duration=0.5, size=100, status=200))
+    aggregator(Event("retry", "example.com", error="ConnectionResetError"))
+    aggregator(Event("parse", "soup", duration=0.05))
+
+    text = aggregator.to_prometheus()
+    assert "# TYPE pycricinfo_requests_total counter" in text
+    assert 'pycricinfo_requests_total{host="example.com",status="200"} 1' in text
+    assert 'pycricinfo_response_bytes_total{host="example.com"} 100' in text
+    assert (
+        'pycricinfo_retries_total{host="example.com",reason="ConnectionResetError"} 1'
+        in text
+    )
+    assert 'pycricinfo_request_seconds_bucket{host="example.com",le="0.1"} 0' in text
+    assert 'pycricinfo_request_seconds_bucket{host="example.com",le="1"} 1' in text
+    assert 'pycricinfo_request_seconds_bucket{host="example.com",le="+Inf"} 1' in text
+    assert 'pycricinfo_stage_seconds_count{kind="parse",stage="soup"} 1' in text
+
+
+def test_disabled():
+    calls = []
+
+    @metrics.timed("parse", "test")
+    def parse():
+        calls.append(metrics.enabled())
+
+    parse()
+    assert calls == [False]
+
+
+def test_label_order():
+    aggregator = MetricsAggregator()
+    aggregator(Event("request", "example.com", duration=0.5, size=100, status=200))
+
+    assert aggregator.counter("requests_total", status="200", host="example.com") == 1
+    assert aggregator.histogram("request_seconds", host="example.com").count == 1
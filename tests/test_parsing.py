@@ -0,0 +1,107 @@
+import json
+
+import pytest
+from gazpacho import Soup
+from helpers import make_match_html
+
+from pycricinfo import LiveScores, Match, Team, livescores, match, team
+from pycricinfo.parsing import (
+    Table,
+    TableSchema,
+    extract_tables,
+    next_data_text,
+    select_json,
+)
+
+
+def test_next_data_text():
+    html = make_match_html()
+
+    text = next_data_text(html)
+    soup_text = Soup(html).find("script", attrs={"id": "__NEXT_DATA__"}, mode="first")
+    assert text == soup_text.text
+    assert next_data_text(html.encode("utf-8")) == text
+
+    assert next_data_text("<html><script>var a = 1;</script></html>") is None
+    assert next_data_text("") is None
+    assert (
+        next_data_text('<script id=\'__NEXT_DATA__\' type="x"> {"a": 1} </SCRIPT>')
+        == '{"a": 1}'
+    )
+
+
+def test_embedded_json_fallback(monkeypatch):
+    # when the fast path can't slice out the script the soup is searched instead
+    data = {"props": {"pageProps": {"data": {"content": {"innings": []}}}}}
+    html = (
+        '<html><script type="application/json" id="__NEXT_DATA__">'
+        f"{json.dumps(data)}</script></html>"
+    )
+
+    for module, page in (
+        (match, Match(1)),
+        (team, Team(1)),
+        (livescores, LiveScores()),
+    ):
+        monkeypatch.setattr(module, "next_data_text", lambda html: None)
+        page.__dict__["html"] = html
+        assert page.embedded_json == data
+        assert "soup" in page.__dict__
+
+
+def test_select_json():
+    doc = {
+        "props": {
+            "skipped": [{"a": 'x]y"z{', "b": [1, 2, {"c": None}]}, True, -1.5e3],
+            "pageProps": {"data": {"content": {"innings": [{"x": 1}, {"y": [2]}]}}},
+        }
+    }
+    path = ["props", "pageProps", "data", "content", "innings"]
+
+    for text in [json.dumps(doc), json.dumps(doc, indent=4)]:
+        assert select_json(text, path) == [{"x": 1}, {"y": [2]}]
+        assert select_json(text, path + [1, "y", 0]) == 2
+        assert select_json(text, ["props", "skipped", 2]) == -1500.0
+        with pytest.raises(KeyError):
+            select_json(text, ["props", "missing"])
+        with pytest.raises(IndexError):
+            select_json(text, path + [2])
+
+
+def test_match_innings_decoded_selectively(match_transport):
+    # by default the whole embedded json is decoded with json.loads
+    m = Match(1216509, transport=match_transport)
+    assert m.match_stats["all_innings"][0]["batting"][0]["runs"] == 58
+    assert "embedded_json" in m.__dict__
+
+    # a lean match only decodes the innings
+    m = Match(1216509, transport=match_transport)
+    m.lean = True
+    assert m.match_stats["all_innings"][0]["batting"][0]["runs"] == 58
+    assert "embedded_json" not in m.__dict__
+
+
+def test_extract_tables():
+    html = (
+        "<table class='other'><tr><td>skip</td></tr></table>"
+        '<table class="engineTable wide"><thead><tr><th title="record"></th>'
+        '<th title="catches taken">Ct</th><th>St</th></tr></thead><tbody>'
+        "<tr><td><b>Tests</b></td><td> 34 </td><td>-</td></tr>"
+        "<tr><td>ODIs</td><td><table><tr><td>nested</td></tr></table>54</td><td>0</td></tr>"
+        "</tbody></table>"
+    )
+
+    tables = extract_tables(html)
+    assert tables == [
+        Table(
+            headers=["record", "catches taken", "St"],
+            rows=[["Tests", "34", "-"], ["ODIs", "54", "0"]],
+        )
+    ]
+
+    schema = TableSchema({"catches taken": ("catches", int)})
+    assert schema.records(tables[0]) == {
+        "Tests": {"catches": 34, "St": "-"},
+        "ODIs": {"catches": 54, "St": "0"},
+    }
+    assert schema.convert("catches taken", "3") == ("catches", 3)
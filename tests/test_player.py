@@ -1,7 +1,10 @@
 import random
 from pathlib import Path
 
-from pycricinfo import Player
+from helpers import make_player_html
+
+from pycricinfo import PageNotFoundException, Player
+from pycricinfo.archive import ArchiveWriter
 
 
 def test_player():
@@ -57,3 +60,60 @@ def test_random_player(players):
     assert isinstance(p.name, str)
     assert isinstance(p.player_stats, dict)
     assert isinstance(p.batting_style, str)
+
+
+def test_player_profile(player_transport):
+    p = Player(6044, transport=player_transport)
+
+    assert p.name == "Dean Jones"
+    assert p.full_name == "Dean Mervyn Jones"
+    assert p.batting_style == "Right-hand bat"
+    assert p.bowling_style == "Right-arm offbreak"
+    assert p.born == "March 24, 1961, Coburg, Melbourne, Victoria"
+    assert p.playing_role == "Batsman"
+    assert p.teams == ["Australia", "Derbyshire", "Durham", "Victoria"]
+    assert p.player_info["Full name"] == "Dean Mervyn Jones"
+    assert p.player_stats["batting"]["Tests"]["balls"] == 7427
+
+
+def test_player_compact(player_transport):
+    p = Player(6044, transport=player_transport)
+    report = p.compact()
+
+    assert report.freed > 0
+    assert "html" not in p.__dict__ and "player_info_soup" not in p.__dict__
+    assert p.full_name == "Dean Mervyn Jones"
+    assert p.player_stats["batting"]["Tests"]["balls"] == 7427
+    assert player_transport.requests == [
+        "https://www.espncricinfo.com/ci/content/player/6044.html"
+    ]
+
+
+def test_player_stats_tables(tmp_path):
+    fielding = (
+        '<table class="engineTable"><thead><tr><th title="record"></th>'
+        '<th title="catches taken">Ct</th></tr></thead>'
+        "<tbody><tr><td>Tests</td><td>34</td></tr></tbody></table></body>"
+    )
+    html = tmp_path / "6044.html"
+    html.write_text(make_player_html().replace("</body>", fielding))
+
+    p = Player(6044, html_file=str(html))
+
+    assert p.player_stats["batting"]["ODIs"]["runs"] == 6068
+    assert p.player_stats["batting"]["Tests"]["hs"] == "216"
+    assert p.player_stats["bowling"]["ODIs"]["best bowling innings"] == "2/34"
+    assert p.player_stats["bowling"]["Tests"]["er"] == 2.46
+    assert p.player_stats["fielding"] == {"Tests": {"catches": 34}}
+
+
+def test_parse_many_archive(tmp_path, player_transport):
+    path = str(tmp_path / "players.pcia")
+    with ArchiveWriter(path) as writer:
+        Player(6044, transport=player_transport).to_archive(writer)
+
+    results = list(Player.parse_many([6044, 1], processes=1, archive=path))
+
+    assert results[0].data["name"] == "Dean Jones"
+    assert results[0].data["player_stats"]["batting"]["ODIs"]["runs"] == 6068
+    assert isinstance(results[1].error, PageNotFoundException)
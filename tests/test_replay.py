@@ -0,0 +1,88 @@
+import time
+
+import pytest
+from helpers import make_match_html, make_match_json
+
+from pycricinfo import Match, PyCricinfoException
+from pycricinfo.replay import (
+    Cassette,
+    RecordingTransport,
+    ReplayTransport,
+    StandInServer,
+    StandInTransport,
+)
+from pycricinfo.transport import Response
+
+URL = "https://www.espncricinfo.com/matches/engine/match/1216509"
+
+
+@pytest.fixture
+def cassette(tmp_path, match_transport):
+    """
+    A cassette recorded from loading match 1216509
+    """
+    path = str(tmp_path / "match.cassette")
+    with RecordingTransport(path, transport=match_transport) as transport:
+        Match(1216509, transport=transport).match_stats
+    return path
+
+
+def test_replay(cassette):
+    transport = ReplayTransport(cassette)
+    assert sorted(transport.cassette.urls) == [f"{URL}.html", f"{URL}.json"]
+
+    m = Match(1216509, transport=transport)
+    assert m.json == make_match_json()
+    assert m.html == make_match_html()
+    assert m.match_stats["all_innings"][1]["batting"][1]["name"] == "Shikhar Dhawan"
+
+    with pytest.raises(PyCricinfoException):
+        Match(1, transport=transport).html
+
+
+def test_replay_in_order(tmp_path, static_transport):
+    path = str(tmp_path / "scores.cassette")
+    url = "https://www.espncricinfo.com/scores"
+
+    with RecordingTransport(path, transport=static_transport) as transport:
+        for page in ["first", "second"]:
+            static_transport.add_html(url, page)
+            transport.request(url)
+
+    cassette = Cassette(path)
+    assert [cassette.next(url).text for _ in range(3)] == ["first", "second", "second"]
+    cassette.rewind()
+    assert cassette.next(url).text == "first"
+
+
+def test_stand_in_server(cassette):
+    with StandInServer(cassette, latency=0.05) as server:
+        transport = StandInTransport(server.url)
+
+        start = time.perf_counter()
+        m = Match(1216509, transport=transport)
+        assert m.match_stats["all_innings"][0]["bowling"][0]["name"] == "Kagiso Rabada"
+        assert time.perf_counter() - start >= 0.1
+        assert server.requests == 2
+
+        response = transport.request("https://www.espncricinfo.com/missing")
+        assert response.status == 404
+        assert response.url == "https://www.espncricinfo.com/missing"
+
+        transport.close()
+
+
+def test_stand_in_errors(cassette):
+    with StandInServer(cassette, error_rate=1.0, error_status=429) as server:
+        response = StandInTransport(server.url).request(f"{URL}.json")
+        assert isinstance(response, Response)
+        assert response.status == 429
+
+
+def test_stand_in_rate_limit(cassette):
+    with StandInServer(cassette, rate_limit=2) as server:
+        transport = StandInTransport(server.url)
+        statuses = [transport.request(f"{URL}.json").status for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        assert server.limited == 1
+        transport.close()
@@ -0,0 +1,97 @@
+import http.client
+import socket
+
+import pytest
+
+from pycricinfo import Player, PyCricinfoException
+from pycricinfo.scheduler import RequestScheduler, TokenBucket, set_scheduler
+from pycricinfo.transport import Response, Transport
+
+
+class FlakyTransport(Transport):
+    """
+    Returns the statuses given in turn, raising any that are exceptions
+    """
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.requests = 0
+
+    def request(self, url, headers=None):
+        self.requests += 1
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        if isinstance(status, Exception):
+            raise status
+        return Response(url, status, {"Content-Type": "text/html"}, b"<html></html>")
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = RequestScheduler(rate=100, burst=100, backoff=0, retries=3)
+    set_scheduler(scheduler)
+    yield scheduler
+    set_scheduler(None)
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=10, burst=2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:2] == [0, 0]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+    assert waits[3] == pytest.approx(0.2, abs=0.01)
+
+
+def test_retries_and_adapts_rate(scheduler):
+    url = "https://www.espncricinfo.com/"
+    transport = FlakyTransport(429, ConnectionResetError(), 200)
+
+    response = scheduler.request(url, transport=transport)
+    assert response.status == 200
+    assert transport.requests == 3
+    # halved twice then nudged back up
+    assert scheduler.bucket(url).rate == pytest.approx(25 + 1 / 25)
+
+
+def test_gives_up_after_retries(scheduler):
+    url = "https://www.espncricinfo.com/"
+
+    transport = FlakyTransport(503)
+    assert scheduler.request(url, transport=transport).status == 503
+    assert transport.requests == 4
+
+    with pytest.raises(ConnectionResetError):
+        scheduler.request(url, transport=FlakyTransport(ConnectionResetError()))
+
+    assert scheduler.bucket(url).rate == scheduler.min_rate
+
+
+def test_retries_only_transient_errors(scheduler):
+    url = "https://www.espncricinfo.com/"
+
+    transport = FlakyTransport(socket.timeout(), http.client.IncompleteRead(b""), 200)
+    assert scheduler.request(url, transport=transport).status == 200
+    assert transport.requests == 3
+
+    transport = FlakyTransport(socket.gaierror())
+    with pytest.raises(socket.gaierror):
+        scheduler.request(url, transport=transport)
+    assert transport.requests == 1
+
+
+def test_retry_after():
+    scheduler = RequestScheduler(backoff=0, max_backoff=10)
+    response = Response("", 429, {"Retry-After": "3"})
+    assert scheduler.delay(0, response) == 3
+    assert scheduler.delay(0, Response("", 429, {"Retry-After": "120"})) == 10
+
+
+def test_error_page_not_cached(scheduler):
+    p = Player(6044, transport=FlakyTransport(500))
+    with pytest.raises(PyCricinfoException):
+        p.html
+    assert "html" not in p.__dict__
+
+
+def test_token_bucket_try_acquire():
+    bucket = TokenBucket(rate=1, burst=2)
+    assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
@@ -1,6 +1,8 @@
 from pathlib import Path
 
-from pycricinfo import Series
+import pytest
+
+from pycricinfo import PageNotFoundException, PyCricinfoException, Series
 
 
 def test_series():
@@ -101,3 +103,41 @@ def test_get_season_matches():
         1237181,
     ]
     assert set(s.get_season_matches(2020)) == set(all_2020_games)
+
+
+def _add_paged_feed(transport, url, ids, page_size=2):
+    pages = [ids[i:][:page_size] for i in range(0, len(ids), page_size)]
+    for index, page in enumerate(pages, start=1):
+        transport.add_json(
+            url if index == 1 else f"{url}?page={index}",
+            {
+                "pageIndex": index,
+                "pageCount": len(pages),
+                "items": [{"$ref": f"{url}{id}"} for id in page],
+            },
+        )
+
+
+def test_paged_matches(static_transport):
+    s = Series(8048, transport=static_transport)
+
+    _add_paged_feed(static_transport, f"{s.json_url}seasons/", [2018, 2019, 2020])
+    season_matches = {2018: [1, 2, 3, 4, 5], 2019: [6], 2020: [7, 8, 9]}
+    for season, ids in season_matches.items():
+        _add_paged_feed(static_transport, f"{s.json_url}seasons/{season}/events/", ids)
+
+    assert s.seasons == [2018, 2019, 2020]
+    assert s.get_season_matches(2018) == [1, 2, 3, 4, 5]
+    assert set(s.iter_matches(workers=3)) == set(range(1, 10))
+    assert s.all_matches == list(range(1, 10))
+
+
+def test_feed_errors(static_transport):
+    s = Series(1, transport=static_transport)
+    with pytest.raises(PageNotFoundException):
+        s.json
+
+    static_transport.routes[f"{s.json_url}seasons/"] = (403, {}, "")
+    with pytest.raises(PyCricinfoException) as e:
+        s.seasons
+    assert e.value.expression == 403
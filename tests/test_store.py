@@ -0,0 +1,105 @@
+from datetime import datetime
+
+import pytest
+
+from pycricinfo import Match, Player
+from pycricinfo.store import Store
+
+
+@pytest.fixture
+def store(match_transport):
+    store = Store()
+    store.add(Match(1216509, transport=match_transport))
+    yield store
+    store.close()
+
+
+def _count(store, table):
+    return store.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_store_match(store, match_transport):
+    m = store.match(1216509)
+    assert m["date"] == "2020-10-17T18:00:00"
+    assert m["series"] == "Indian Premier League"
+    assert m["season"] == "2020/21"
+    assert m["format"] == "Twenty20"
+    assert m["ground"] == "Melbourne Cricket Ground"
+    assert m["teams"] == [
+        {"id": 4344, "name": "Delhi Capitals"},
+        {"id": 4343, "name": "Chennai Super Kings"},
+    ]
+    assert store.match(1) is None
+
+    counts = {t: _count(store, t) for t in ("innings", "batting", "bowling", "players")}
+    assert counts == {"innings": 2, "batting": 4, "bowling": 3, "players": 6}
+
+    # adding a match again replaces it
+    store.add_match(Match(1216509, transport=match_transport))
+    assert {t: _count(store, t) for t in counts} == counts
+
+
+def test_store_queries(store):
+    innings = store.player_innings(28235, format="Twenty20")
+    assert [(i["match_id"], i["runs"], i["name"]) for i in innings] == [
+        (1216509, 101, "Shikhar Dhawan")
+    ]
+    assert innings[0]["captain"] is False
+    assert store.player_innings(28235, format="Test") == []
+
+    bowling = store.player_bowling(550215, season=2020)
+    assert [(b["innings"], b["wickets"], b["runs"]) for b in bowling] == [(1, 2, 33)]
+
+    assert [m["match_id"] for m in store.matches(ground=56441)] == [1216509]
+    assert [m["match_id"] for m in store.matches(season="2020/21", team=4343)] == [
+        1216509
+    ]
+    assert store.matches(ground="Lord's") == []
+    assert store.matches(start=datetime(2021, 1, 1)) == []
+
+
+def test_store_incremental(store, static_transport):
+    # stored matches are skipped without being fetched
+    assert store.add_matches([1216509], update=False) == 0
+    assert sorted(static_transport.requests) == [
+        "https://www.espncricinfo.com/matches/engine/match/1216509.html",
+        "https://www.espncricinfo.com/matches/engine/match/1216509.json",
+    ]
+
+
+def test_store_player(store, player_transport):
+    p = Player(6044, transport=player_transport)
+    assert not store.has_player(6044)
+    store.add(p)
+    store.add(p)
+
+    stored = store.player(6044)
+    assert stored["full_name"] == "Dean Mervyn Jones"
+    assert stored["teams"] == ["Australia", "Derbyshire", "Durham", "Victoria"]
+    assert stored["player_stats"] == p.player_stats
+    assert store.has_player(6044)
+
+    # players only seen in a match have a name but no profile
+    assert store.player(28235)["name"] == "Shikhar Dhawan"
+    assert not store.has_player(28235)
+    assert store.add_players([6044], update=False) == 0
+
+
+def test_store_seasons(store, match_transport):
+    # a season that starts in the same year is kept apart
+    match = Match(1216509, transport=match_transport)
+    match.id = 1216510
+    match.__dict__["season"] = {"id": 2020, "name": "2020"}
+    store.add_match(match)
+
+    assert store.match(1216509)["season"] == "2020/21"
+    assert store.match(1216510)["season"] == "2020"
+    assert [m["match_id"] for m in store.matches(season="2020")] == [1216510]
+    assert [m["match_id"] for m in store.matches(season=2020)] == [1216509, 1216510]
+
+
+def test_store_filters(store):
+    with pytest.raises(ValueError):
+        store.player_innings(28235, team_id=4343)
+    with pytest.raises(ValueError):
+        store.player_bowling(550215, **{"1 OR 1": 1})
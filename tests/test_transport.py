@@ -0,0 +1,53 @@
+import pytest
+from gazpacho.utils import HTTPError
+
+from pycricinfo import Match
+from pycricinfo.transport import PooledTransport, Response, Transport
+
+
+def test_pooled_transport_keep_alive(local_server):
+    local_server.routes["/page.html"] = (
+        200,
+        {"Content-Type": "text/html"},
+        b"<html>" + b"x" * 1000 + b"</html>",
+    )
+
+    with PooledTransport(pool_size=2) as t:
+        for _ in range(5):
+            assert t.get(f"{local_server.url}/page.html").startswith("<html>")
+
+    assert len(local_server.requests) == 5
+    assert local_server.connections == 1
+    assert "gzip" in local_server.requests[0][1]["Accept-Encoding"]
+
+
+def test_pooled_transport_json_and_redirect(local_server):
+    local_server.routes["/old"] = (301, {"Location": "/new.json"}, b"")
+    local_server.routes["/new.json"] = (
+        200,
+        {"Content-Type": "application/json; charset=utf-8"},
+        b'{"name": "Sheffield Shield"}',
+    )
+
+    t = PooledTransport()
+    assert t.get(f"{local_server.url}/old") == {"name": "Sheffield Shield"}
+
+    response = t.request(f"{local_server.url}/missing")
+    assert response.status == 404
+    with pytest.raises(HTTPError):
+        t.get(f"{local_server.url}/missing")
+
+
+def test_custom_transport():
+    class StaticTransport(Transport):
+        def request(self, url, headers=None):
+            return Response(
+                url,
+                200,
+                {"Content-Type": "application/json"},
+                b'{"description": "A match", "match": {"match_status": "complete"}}',
+            )
+
+    m = Match(1, transport=StaticTransport())
+    assert m.name == "A match"
+    assert m.status == "complete"